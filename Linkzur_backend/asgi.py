@@ -2,6 +2,22 @@
 ASGI config for Linkzur_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Long-lived endpoints such as ``api/notifications/stream/`` are async views and
+WebSocket connections (``ws/conversations/<id>/``) are handled by
+``linkzur_app.websockets``; both need this entry point, everything else goes
+to Django.
+
+Deploy with uvicorn (in requirements.txt) instead of gunicorn's WSGI workers.
+Live events cross workers through Redis, so several workers need REDIS_URL
+(which selects utils.pubsub.RedisBroker)::
+
+    REDIS_URL=redis://localhost:6379/0 \
+        uvicorn Linkzur_backend.asgi:application --host 0.0.0.0 --port 8000 --workers 4
+
+Without REDIS_URL the in-process broker is used and only a single worker
+(no --workers) delivers every notification and chat message.
+
+Under WSGI the notification stream answers 501 and WebSockets are not served.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -13,4 +29,16 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Linkzur_backend.settings')
 
-application = get_asgi_application()
+# Set up Django before importing anything that touches models.
+django_application = get_asgi_application()
+
+from linkzur_app.utils.suggest import warm_index  # noqa: E402
+from linkzur_app.websockets import websocket_application  # noqa: E402
+
+warm_index()
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "websocket":
+        return await websocket_application(scope, receive, send)
+    return await django_application(scope, receive, send)
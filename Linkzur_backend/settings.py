@@ -35,6 +35,15 @@ CORS_ALLOW_CREDENTIALS = True  # optional but often useful
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# How linkzur_app.media hands files off (after access checks):
+#   "nginx"  → X-Accel-Redirect to MEDIA_ACCEL_PREFIX, an `internal` location aliased to MEDIA_ROOT
+#   "apache" → X-Sendfile
+#   ""       → served by Django itself
+MEDIA_SENDFILE_BACKEND = os.getenv("MEDIA_SENDFILE_BACKEND", "")
+MEDIA_ACCEL_PREFIX = os.getenv("MEDIA_ACCEL_PREFIX", "/protected-media/")
+# Lifetime of the per-user signed links emitted for private files.
+SIGNED_MEDIA_MAX_AGE = int(os.getenv("SIGNED_MEDIA_MAX_AGE", 30 * 60))
+
 INSTALLED_APPS = [
     'django.contrib.admin',
     'django.contrib.auth',
@@ -63,6 +72,9 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+
+    'linkzur_app.middleware.NotificationBatchMiddleware',
+    'linkzur_app.middleware.ReplicaStickinessMiddleware',
 ]
 
 ROOT_URLCONF = 'Linkzur_backend.urls'
@@ -86,16 +98,117 @@ TEMPLATES = [
 WSGI_APPLICATION = 'Linkzur_backend.wsgi.application'
 
 
-DATABASES = {
-    'default': {
+# =============================
+# DATABASE
+# =============================
+# DB_ENGINE=postgres for production (several gunicorn workers writing at
+# once); the SQLite profile stays the default for local work.
+DB_ENGINE = os.getenv("DB_ENGINE", "sqlite")
+
+if DB_ENGINE == "postgres":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv("DB_NAME", "linkzur"),
+            'USER': os.getenv("DB_USER", "linkzur"),
+            'PASSWORD': os.getenv("DB_PASSWORD", ""),
+            'HOST': os.getenv("DB_HOST", "127.0.0.1"),
+            'PORT': os.getenv("DB_PORT", "5432"),
+            # Reuse a connection across requests instead of reconnecting
+            # each time; health checks drop ones the server has closed.
+            'CONN_MAX_AGE': int(os.getenv("DB_CONN_MAX_AGE", 60)),
+            'CONN_HEALTH_CHECKS': True,
+            "OPTIONS": {
+                "connect_timeout": int(os.getenv("DB_CONNECT_TIMEOUT", 5)),
+            },
+        }
+    }
+
+    # psycopg's pool (needs psycopg[pool]) replaces persistent connections;
+    # Django refuses CONN_MAX_AGE > 0 when it is enabled. Size it per
+    # worker process: max_size × gunicorn workers must fit max_connections.
+    if os.getenv("DB_POOL", "False") == "True":
+        DATABASES['default']['CONN_MAX_AGE'] = 0
+        DATABASES['default']['OPTIONS']['pool'] = {
+            "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+            "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+            "timeout": int(os.getenv("DB_POOL_TIMEOUT", 10)),
+        }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv("DB_NAME", str(BASE_DIR / 'db.sqlite3')),
+            "OPTIONS": {
+                "timeout": 30,
+                # Take the write lock at BEGIN. With deferred transactions a
+                # reader upgrading to writer fails with "database is locked"
+                # straight away instead of waiting out the timeout.
+                "transaction_mode": "IMMEDIATE",
+            },
+        }
+    }
+
+# Read replica: catalog and dashboard views marked @read_from_replica read
+# from it (linkzur_app.routers). Locally, DB_REPLICA_NAME points at a second
+# SQLite file refreshed with `manage.py sync_sqlite_replica`.
+if DB_ENGINE == "postgres" and os.getenv("DB_REPLICA_HOST"):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'HOST': os.getenv("DB_REPLICA_HOST"),
+        'PORT': os.getenv("DB_REPLICA_PORT", DATABASES['default']['PORT']),
+        "OPTIONS": dict(DATABASES['default']['OPTIONS']),
+        "TEST": {"MIRROR": "default"},
+    }
+elif DB_ENGINE != "postgres" and os.getenv("DB_REPLICA_NAME"):
+    DATABASES['replica'] = {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
-        "OPTIONS": {
-            "timeout": 30,
-        },
+        'NAME': os.getenv("DB_REPLICA_NAME"),
+        "OPTIONS": {"timeout": 30},
+        "TEST": {"MIRROR": "default"},
     }
+
+if 'replica' in DATABASES:
+    DATABASE_ROUTERS = ['linkzur_app.routers.ReplicaRouter']
+
+# How long after a write a user's reads stay on the primary. Must cover
+# replication lag; needs a cache shared by all workers to work across them.
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", 5))
+
+# Applied to every new SQLite connection (linkzur_app.signals). WAL lets
+# readers run alongside the single writer; NORMAL only syncs at checkpoints,
+# which is still safe against application crashes in WAL mode.
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", -64000)),  # negative = KiB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+    "temp_store": "MEMORY",
 }
 
+# =============================
+# CACHE
+# =============================
+# Per-process memory by default; set REDIS_URL in production so all
+# gunicorn workers share it. Caches that other workers must see retired
+# (product pages, review eligibility) are skipped on a per-process backend
+# (utils.shared_cache).
+REDIS_URL = os.getenv("REDIS_URL", "")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+            "LOCATION": os.getenv("CACHE_LOCATION", ""),
+        }
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator'},
     {'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator'},
@@ -162,3 +275,25 @@ EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER", "contact@linkzur.com")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "linkzur@linkzur.com")
+
+
+# =============================
+# REALTIME (notification stream)
+# =============================
+# Dotted path to a linkzur_app.utils.pubsub.Broker implementation.
+# The in-process broker only reaches clients connected to the same worker,
+# so it is only the default when there is no REDIS_URL (one local worker).
+REALTIME_BROKER = os.getenv(
+    "REALTIME_BROKER",
+    "linkzur_app.utils.pubsub.RedisBroker" if REDIS_URL else "linkzur_app.utils.pubsub.InProcessBroker",
+)
+
+
+# =============================
+# CHUNKED UPLOADS
+# =============================
+# Partial uploads live here until complete; keep it outside MEDIA_ROOT so
+# half-written files are never served.
+CHUNKED_UPLOAD_DIR = os.getenv("CHUNKED_UPLOAD_DIR", str(BASE_DIR / "upload_tmp"))
+CHUNKED_UPLOAD_MAX_SIZE = int(os.getenv("CHUNKED_UPLOAD_MAX_SIZE", 50 * 1024 * 1024))
+CHUNKED_UPLOAD_MAX_CHUNK = int(os.getenv("CHUNKED_UPLOAD_MAX_CHUNK", 8 * 1024 * 1024))
@@ -3,7 +3,8 @@ from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from django.views.generic import TemplateView
-from django.views.static import serve
+
+from linkzur_app.media import serve_media
 
 
 
@@ -14,15 +15,14 @@ urlpatterns = [
 
 ]
 
-# ✅ Serve media in production when DEBUG=False
+# ✅ Media: access checks for private files, then sendfile / proxy offload
 urlpatterns += [
-    re_path(r'^media/(?P<path>.*)$', serve, {'document_root': settings.MEDIA_ROOT}),
+    re_path(r'^media/(?P<path>.*)$', serve_media),
 ]
 
-# ✅ Serve static+media in local development only
+# ✅ Serve static in local development only
 if settings.DEBUG:
     urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
 
 
 urlpatterns += [
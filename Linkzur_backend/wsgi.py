@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Linkzur_backend.settings')
 
 application = get_wsgi_application()
+
+from linkzur_app.utils.suggest import warm_index  # noqa: E402
+
+warm_index()
@@ -3,9 +3,10 @@ from django.contrib.auth.admin import UserAdmin
 
 from .models import (
     CustomUser, BuyerProfile, SellerProfile, Product, ProductVariant,
-    CartItem, WishlistItem, Order, OrderItem, Notification,
+    CartItem, WishlistItem, Order, OrderItem, OrderEvent, Notification, NotificationPreference,
     Payment, QuotationRequest, Quotation, ProductConversation,
-    ProductMessage, Review, Invoice, PendingUser
+    ProductMessage, Review, Invoice, PendingUser, OutgoingEmail, UploadSession,
+    ImageImportJob, ProductStats,
 )
 
 # Import reusable email helpers
@@ -103,14 +104,24 @@ class OrderItemInline(admin.TabularInline):
     extra = 0
 
 
+class OrderEventInline(admin.TabularInline):
+    model = OrderEvent
+    extra = 0
+    can_delete = False
+    readonly_fields = ("event_type", "from_status", "to_status", "actor", "note", "created_at")
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
 # ================================
 # Order Admin
 # ================================
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ("id", "buyer", "status", "total_price", "created_at")
+    list_display = ("id", "buyer", "seller", "status", "total_price", "created_at")
     list_filter = ("status", "created_at")
-    search_fields = ("buyer__email",)
-    inlines = [OrderItemInline]
+    search_fields = ("buyer__email", "seller__email")
+    inlines = [OrderItemInline, OrderEventInline]
 
 
 # ================================
@@ -130,10 +141,47 @@ class ProductMessageInline(admin.TabularInline):
 
 
 class ProductConversationAdmin(admin.ModelAdmin):
-    list_display = ("id", "order", "product", "buyer", "seller", "created_at")
+    list_display = ("id", "order", "product", "buyer", "seller", "last_message_at", "created_at")
     inlines = [ProductMessageInline]
 
 
+# ================================
+# Upload Session Admin
+# ================================
+class UploadSessionAdmin(admin.ModelAdmin):
+    list_display = ("id", "user", "purpose", "target_id", "filename", "received_bytes", "total_size", "status", "updated_at")
+    list_filter = ("purpose", "status")
+    search_fields = ("user__email", "filename")
+
+
+# ================================
+# Image Import Admin
+# ================================
+class ImageImportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "seller", "original_name", "status", "attached_count", "failed_count", "created_at", "finished_at")
+    list_filter = ("status",)
+    search_fields = ("seller__email", "original_name")
+
+
+# ================================
+# Product Stats Admin
+# ================================
+class ProductStatsAdmin(admin.ModelAdmin):
+    list_display = ("product", "views", "cart_adds", "wishlist_adds", "units_sold", "updated_at")
+    ordering = ("-popularity",)
+    search_fields = ("product__name", "product__ref_no")
+    raw_id_fields = ("product",)
+
+
+# ================================
+# Outgoing Email Admin
+# ================================
+class OutgoingEmailAdmin(admin.ModelAdmin):
+    list_display = ("id", "to_email", "subject", "status", "attempts", "created_at", "sent_at")
+    list_filter = ("status",)
+    search_fields = ("to_email", "subject")
+
+
 # ================================
 # Registering ALL MODELS
 # ================================
@@ -146,6 +194,7 @@ admin.site.register(CartItem)
 admin.site.register(WishlistItem)
 admin.site.register(Order, OrderAdmin)
 admin.site.register(Notification)
+admin.site.register(NotificationPreference)
 admin.site.register(Payment)
 admin.site.register(QuotationRequest)
 admin.site.register(Quotation, QuotationAdmin)
@@ -153,4 +202,7 @@ admin.site.register(ProductConversation, ProductConversationAdmin)
 admin.site.register(Review)
 admin.site.register(Invoice)
 admin.site.register(PendingUser)
-
+admin.site.register(OutgoingEmail, OutgoingEmailAdmin)
+admin.site.register(UploadSession, UploadSessionAdmin)
+admin.site.register(ImageImportJob, ImageImportJobAdmin)
+admin.site.register(ProductStats, ProductStatsAdmin)
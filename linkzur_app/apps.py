@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class LinkzurAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'linkzur_app'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Max, Q
+
+from linkzur_app.models import ProductConversation, ProductMessage
+from linkzur_app.utils.chat import message_preview, seed_read_pointers
+
+
+class Command(BaseCommand):
+    help = "Recompute last-message and unread-count columns on conversations."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        last_id = 0
+        total = 0
+        while True:
+            ids = list(
+                ProductConversation.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            # Unread counts below are measured from the read pointers, so
+            # bring over the legacy is_read flags first.
+            seed_read_pointers(ids)
+            convs = list(ProductConversation.objects.filter(id__in=ids).order_by("id"))
+            latest_ids = (
+                ProductMessage.objects.filter(conversation_id__in=ids)
+                .values("conversation_id")
+                .annotate(last=Max("id"))
+                .values_list("last", flat=True)
+            )
+            latest = {
+                m.conversation_id: m
+                for m in ProductMessage.objects.filter(id__in=list(latest_ids))
+            }
+
+            for conv in convs:
+                unread = conv.messages.aggregate(
+                    buyer=Count("id", filter=Q(id__gt=conv.buyer_last_read_id) & ~Q(sender_id=conv.buyer_id)),
+                    seller=Count("id", filter=Q(id__gt=conv.seller_last_read_id) & ~Q(sender_id=conv.seller_id)),
+                )
+                conv.buyer_unread_count = unread["buyer"]
+                conv.seller_unread_count = unread["seller"]
+
+                msg = latest.get(conv.id)
+                conv.last_message_at = msg.created_at if msg else conv.created_at
+                conv.last_message_preview = message_preview(msg) if msg else ""
+
+            ProductConversation.objects.bulk_update(convs, [
+                "last_message_at", "last_message_preview",
+                "buyer_unread_count", "seller_unread_count",
+            ])
+            total += len(convs)
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Updated {total} conversations."))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
+
+from linkzur_app.models import Order, OrderItem
+
+
+class Command(BaseCommand):
+    help = "Populate Order.seller for orders created before the field existed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        # place_order creates one order per seller, so any item's product
+        # seller is the order's seller.
+        item_seller = (
+            OrderItem.objects.filter(order=OuterRef("pk"))
+            .order_by("id")
+            .values("product__seller")[:1]
+        )
+
+        last_id = 0
+        total = 0
+        while True:
+            ids = list(
+                Order.objects.filter(seller__isnull=True, id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            total += Order.objects.filter(id__in=ids).update(seller=Subquery(item_seller))
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {total} orders without a seller."))
@@ -0,0 +1,155 @@
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections, connections, transaction
+
+from linkzur_app.utils.db import apply_sqlite_pragmas
+
+TABLE = "benchmark_db_writes"
+
+# The SQLite settings this project used before SQLITE_PRAGMAS.
+LEGACY_PRAGMAS = {"journal_mode": "DELETE", "synchronous": "FULL"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure write throughput with concurrent writers. Each write is a short "
+        "transaction (a read, then an insert) like placing an order. Runs against "
+        "--database, or with --sqlite-compare against scratch SQLite files with the "
+        "legacy and the tuned PRAGMAs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=8)
+        parser.add_argument("--writes", type=int, default=200, help="Writes per worker.")
+        parser.add_argument("--database", default="default")
+        parser.add_argument("--sqlite-compare", action="store_true")
+
+    def handle(self, *args, **options):
+        workers, writes = options["workers"], options["writes"]
+
+        if options["sqlite_compare"]:
+            with tempfile.TemporaryDirectory() as tmp:
+                for label, pragmas in (("legacy", LEGACY_PRAGMAS), ("tuned", settings.SQLITE_PRAGMAS)):
+                    path = os.path.join(tmp, f"{label}.sqlite3")
+                    self._report(label, self._run(_sqlite_writer(path, pragmas), workers, writes))
+            return
+
+        alias = options["database"]
+        with connections[alias].cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+            _create_table(cursor, connections[alias].vendor)
+        try:
+            label = f"{alias} ({connections[alias].vendor})"
+            self._report(label, self._run(_django_writer(alias), workers, writes))
+        finally:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+    def _run(self, writer, workers, writes):
+        latencies, errors = [], []
+        lock = threading.Lock()
+        start_gate = threading.Barrier(workers)
+
+        def work(worker_id):
+            start_gate.wait()
+            local, failed = writer(worker_id, writes)
+            with lock:
+                latencies.extend(local)
+                errors.extend(failed)
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(workers)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return latencies, errors, time.perf_counter() - started
+
+    def _report(self, label, result):
+        latencies, errors, elapsed = result
+        latencies.sort()
+        done = len(latencies)
+        p95 = latencies[int(done * 0.95) - 1] if done else 0
+        self.stdout.write(
+            f"{label:<20} {done / elapsed:8.0f} writes/s   "
+            f"p50 {statistics.median(latencies or [0]) * 1000:6.1f} ms   "
+            f"p95 {p95 * 1000:6.1f} ms   "
+            f"failed {len(errors)}"
+        )
+        if errors:
+            self.stdout.write(self.style.WARNING(f"  first error: {errors[0]}"))
+
+
+def _create_table(cursor, vendor):
+    pk = "SERIAL PRIMARY KEY" if vendor == "postgresql" else "INTEGER PRIMARY KEY"
+    cursor.execute(f"CREATE TABLE {TABLE} (id {pk}, worker INTEGER NOT NULL, seq INTEGER NOT NULL)")
+
+
+def _write(cursor, worker_id, placeholder):
+    # Read, then write, in one transaction.
+    cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {TABLE}")
+    seq = cursor.fetchone()[0]
+    cursor.execute(f"INSERT INTO {TABLE} (worker, seq) VALUES ({placeholder}, {placeholder})", [worker_id, seq])
+
+
+def _django_writer(alias):
+    def writer(worker_id, writes):
+        latencies, errors = [], []
+        try:
+            for _ in range(writes):
+                started = time.perf_counter()
+                try:
+                    with transaction.atomic(using=alias), connections[alias].cursor() as cursor:
+                        _write(cursor, worker_id, "%s")
+                except OperationalError as e:
+                    errors.append(str(e))
+                    continue
+                latencies.append(time.perf_counter() - started)
+        finally:
+            # Each thread has its own connection; don't leak it.
+            connections[alias].close()
+            close_old_connections()
+        return latencies, errors
+
+    return writer
+
+
+def _sqlite_writer(path, pragmas):
+    # Same connection setup as the Django profile: 30s busy timeout and
+    # BEGIN IMMEDIATE, with only the PRAGMAs differing between runs.
+    conn = sqlite3.connect(path)
+    apply_sqlite_pragmas(conn.cursor(), pragmas)
+    _create_table(conn.cursor(), "sqlite")
+    conn.commit()
+    conn.close()
+
+    def writer(worker_id, writes):
+        latencies, errors = [], []
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        apply_sqlite_pragmas(conn.cursor(), pragmas)
+        try:
+            for _ in range(writes):
+                started = time.perf_counter()
+                cursor = conn.cursor()
+                try:
+                    cursor.execute("BEGIN IMMEDIATE")
+                    _write(cursor, worker_id, "?")
+                    cursor.execute("COMMIT")
+                except sqlite3.OperationalError as e:
+                    if conn.in_transaction:
+                        conn.rollback()
+                    errors.append(str(e))
+                    continue
+                latencies.append(time.perf_counter() - started)
+        finally:
+            conn.close()
+        return latencies, errors
+
+    return writer
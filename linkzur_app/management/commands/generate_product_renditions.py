@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from linkzur_app.models import Product
+from linkzur_app.utils.images import needs_renditions, process_product_image
+
+
+class Command(BaseCommand):
+    help = "Build resized WebP/JPEG renditions for product images that lack current ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Rebuild even if renditions look current.")
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        last_id = 0
+        processed = 0
+        while True:
+            batch = list(
+                Product.objects.filter(id__gt=last_id)
+                .exclude(image="")
+                .exclude(image__isnull=True)
+                .order_by("id")
+                .only("id", "image", "image_renditions")[:batch_size]
+            )
+            if not batch:
+                break
+
+            for product in batch:
+                if options["all"] or needs_renditions(product):
+                    process_product_image(product.id)
+                    processed += 1
+            last_id = batch[-1].id
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} product images."))
@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from linkzur_app.models import Product
+from linkzur_app.utils.suggest import bump_index_version
+from linkzur_app.utils.identifiers import normalize_cas, normalize_hsn
+
+
+class Command(BaseCommand):
+    help = (
+        "Rewrite existing CAS numbers and HSN codes in canonical form so the "
+        "indexed exact/prefix searches find them. Invalid values are listed, "
+        "not changed."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true")
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        changed, invalid, batch = 0, [], []
+
+        rows = (
+            Product.objects.exclude(cas_no__isnull=True, hsn__isnull=True)
+            .only("id", "ref_no", "cas_no", "hsn")
+            .iterator(chunk_size=options["batch_size"])
+        )
+        for product in rows:
+            dirty = False
+            for field, normalize in (("cas_no", normalize_cas), ("hsn", normalize_hsn)):
+                value = getattr(product, field)
+                if not value or not value.strip():
+                    if value is not None:
+                        setattr(product, field, None)
+                        dirty = True
+                    continue
+                try:
+                    normalized = normalize(value)
+                except ValueError as e:
+                    invalid.append(f"#{product.id} {product.ref_no} {field}={value!r}: {e}")
+                    continue
+                if normalized != value:
+                    setattr(product, field, normalized)
+                    dirty = True
+
+            if dirty:
+                changed += 1
+                batch.append(product)
+            if len(batch) >= options["batch_size"]:
+                self._save(batch, options["dry_run"])
+                batch = []
+        self._save(batch, options["dry_run"])
+
+        for line in invalid:
+            self.stdout.write(self.style.WARNING(line))
+        verb = "Would normalize" if options["dry_run"] else "Normalized"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {changed} products; {len(invalid)} invalid identifiers left as they are."
+        ))
+
+    def _save(self, batch, dry_run):
+        if batch and not dry_run:
+            now = timezone.now()
+            for product in batch:
+                product.updated_at = now
+            Product.objects.bulk_update(batch, ["cas_no", "hsn", "updated_at"])
+            # bulk_update sends no post_save; let running suggest indexes rebuild.
+            bump_index_version()
@@ -0,0 +1,33 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from linkzur_app.models import UploadSession
+from linkzur_app.utils.uploads import _remove_temp
+
+
+class Command(BaseCommand):
+    help = "Abandon stale chunked uploads, delete their temp files and old session rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(hours=options["hours"])
+
+        stale = UploadSession.objects.filter(status__in=("open", "completing"), updated_at__lt=cutoff)
+        abandoned = 0
+        for session in stale.iterator():
+            _remove_temp(session)
+            abandoned += 1
+        stale.update(status="aborted")
+
+        deleted, _ = (
+            UploadSession.objects.exclude(status__in=("open", "completing"))
+            .filter(updated_at__lt=cutoff).delete()
+        )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Abandoned {abandoned} stale uploads; deleted {deleted} old sessions."
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from linkzur_app.utils.product_stats import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute ProductStats counters and popularity from cart, wishlist and "
+        "completed-order rows, creating missing rows. Run once after deploying "
+        "ProductStats, or to re-base scores."
+    )
+
+    def handle(self, *args, **options):
+        count = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt stats for {count} products."))
@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from linkzur_app.models import ImageImportJob
+from linkzur_app.utils.image_import import run_job
+
+
+class Command(BaseCommand):
+    help = "Process queued image import jobs (e.g. ones lost to a worker restart)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--stale-minutes", type=int, default=60,
+            help="Requeue jobs stuck in 'running' for longer than this.",
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(minutes=options["stale_minutes"])
+        requeued = ImageImportJob.objects.filter(
+            status="running", finished_at__isnull=True, created_at__lt=cutoff
+        ).update(status="pending", processed_entries=0, attached_count=0, failed_count=0, report=[])
+
+        ran = 0
+        for job_id in ImageImportJob.objects.filter(status="pending").order_by("id").values_list("id", flat=True):
+            run_job(job_id)
+            ran += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Ran {ran} image import jobs ({requeued} requeued)."))
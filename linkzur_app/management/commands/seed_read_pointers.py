@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from linkzur_app.models import ProductConversation
+from linkzur_app.utils.chat import seed_read_pointers
+
+
+class Command(BaseCommand):
+    help = (
+        "Set conversation read pointers from the legacy ProductMessage.is_read "
+        "flags. Run before backfill_conversation_summaries and before dropping is_read."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+
+        last_id = 0
+        total = 0
+        while True:
+            ids = list(
+                ProductConversation.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+
+            total += seed_read_pointers(ids)
+            last_id = ids[-1]
+
+        self.stdout.write(self.style.SUCCESS(f"Seeded read pointers on {total} conversations."))
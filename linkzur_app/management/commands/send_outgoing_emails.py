@@ -0,0 +1,35 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.utils import timezone
+
+from linkzur_app.models import OutgoingEmail
+from linkzur_app.utils.email_outbox import dispatch_pending, release
+
+
+class Command(BaseCommand):
+    help = "Send queued emails (run from cron to retry failures and recover stuck rows)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=100)
+        parser.add_argument(
+            "--stale-minutes", type=int, default=15,
+            help="Rows claimed for sending longer ago than this are requeued.",
+        )
+
+    def handle(self, *args, **options):
+        stale_before = timezone.now() - timedelta(minutes=options["stale_minutes"])
+        # Rows without claimed_at were claimed before the column existed.
+        requeued = release(OutgoingEmail.objects.filter(
+            Q(claimed_at__lt=stale_before) | Q(claimed_at__isnull=True), status="sending",
+        ))
+
+        total = 0
+        while True:
+            sent = dispatch_pending(options["batch_size"])
+            if not sent:
+                break
+            total += sent
+
+        self.stdout.write(self.style.SUCCESS(f"Requeued {requeued}, sent {total} emails."))
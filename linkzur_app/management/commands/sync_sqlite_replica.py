@@ -0,0 +1,32 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from linkzur_app.utils.db import REPLICA_ALIAS
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the SQLite primary into the SQLite replica file (DB_REPLICA_NAME). "
+        "Local stand-in for replication, for checking read routing."
+    )
+
+    def handle(self, *args, **options):
+        primary = settings.DATABASES["default"]
+        replica = settings.DATABASES.get(REPLICA_ALIAS)
+        if replica is None:
+            raise CommandError("No replica configured; set DB_REPLICA_NAME.")
+        if "sqlite3" not in primary["ENGINE"] or "sqlite3" not in replica["ENGINE"]:
+            raise CommandError("Both databases must be SQLite.")
+
+        # The backup API takes a consistent snapshot while the app keeps running.
+        source = sqlite3.connect(str(primary["NAME"]))
+        target = sqlite3.connect(str(replica["NAME"]))
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+
+        self.stdout.write(self.style.SUCCESS(f"Replica {replica['NAME']} refreshed from {primary['NAME']}."))
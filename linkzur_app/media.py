@@ -0,0 +1,299 @@
+"""
+Delivery of user-uploaded files under MEDIA_URL.
+
+Private files (invoices, quotations, chat attachments, seller KYC documents)
+are checked against the database before anything is sent. The bytes then go
+out one of three ways, chosen by settings.MEDIA_SENDFILE_BACKEND:
+
+    "nginx"   → X-Accel-Redirect to MEDIA_ACCEL_PREFIX (an `internal` location)
+    "apache"  → X-Sendfile with the absolute path (mod_xsendfile / lighttpd)
+    ""        → FileResponse from this process (wsgi.file_wrapper → sendfile),
+                with Range, ETag and conditional request handling
+
+Browsers cannot attach an Authorization header to <img>/<a> requests, so
+serializers hand out private URLs from signed_media_url(): a ?sig= bound to
+the file path and the user, valid for SIGNED_MEDIA_MAX_AGE. API clients may
+send a Bearer header instead.
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote, urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_http_methods
+
+from .models import Invoice, ProductMessage, Quotation, SellerProfile
+from .utils.realtime import authenticate_token
+
+STREAM_BLOCK_SIZE = 64 * 1024
+
+# Names carrying a content hash (e.g. product renditions) never change, so
+# they can be cached forever.
+CONTENT_HASH_RE = re.compile(r"[.-]([0-9a-f]{16,64})\.[A-Za-z0-9]+$")
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+PUBLIC_MAX_AGE = 60 * 60
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+# ============================================
+# ACCESS CONTROL
+# ============================================
+def _can_read_invoice(user, name):
+    return Invoice.objects.filter(pdf_file=name).filter(Q(buyer=user) | Q(seller=user)).exists()
+
+
+def _can_read_quotation(user, name):
+    return Quotation.objects.filter(file=name).filter(
+        Q(request__buyer=user) | Q(request__seller=user)
+    ).exists()
+
+
+def _can_read_chat_attachment(user, name):
+    return ProductMessage.objects.filter(attachment=name).filter(
+        Q(conversation__buyer=user) | Q(conversation__seller=user)
+    ).exists()
+
+
+def _can_read_seller_document(user, name):
+    return SellerProfile.objects.filter(user=user).filter(
+        Q(business_document=name) | Q(gst_certificate=name)
+    ).exists()
+
+
+# Path prefix (an upload_to directory) → rule. Anything else is public.
+PRIVATE_PREFIXES = {
+    "invoices/": _can_read_invoice,
+    "quotations/": _can_read_quotation,
+    "chat_attachments/": _can_read_chat_attachment,
+    "seller_documents/": _can_read_seller_document,
+    "seller_gst_docs/": _can_read_seller_document,
+}
+
+
+def _private_rule(name):
+    for prefix, rule in PRIVATE_PREFIXES.items():
+        if name.startswith(prefix):
+            return rule
+    return None
+
+
+# ============================================
+# SIGNED URLS
+# ============================================
+def _signer(name):
+    # The path is part of the salt, so a signature only opens its own file.
+    return signing.TimestampSigner(salt=f"linkzur.media:{name}")
+
+
+def signed_media_url(name, user, request=None):
+    """
+    URL for a stored file. Private files get a ?sig= letting `user` fetch
+    them without headers for SIGNED_MEDIA_MAX_AGE; the access rule is still
+    checked when the link is used.
+    """
+    url = default_storage.url(name)
+    if user is not None and user.is_authenticated and _private_rule(name) is not None:
+        url = f"{url}?{urlencode({'sig': _signer(name).sign(str(user.pk))})}"
+    return request.build_absolute_uri(url) if request else url
+
+
+def _signed_user(request, name):
+    sig = request.GET.get("sig")
+    if not sig:
+        return None
+    try:
+        user_id = _signer(name).unsign(sig, max_age=settings.SIGNED_MEDIA_MAX_AGE)
+    except signing.BadSignature:  # includes SignatureExpired
+        return None
+    return get_user_model().objects.filter(pk=user_id, is_active=True).first()
+
+
+def _media_user(request, name):
+    if request.user.is_authenticated:
+        return request.user
+    header = request.headers.get("Authorization", "")
+    if header.startswith("Bearer "):
+        return authenticate_token(header.split(" ", 1)[1])
+    return _signed_user(request, name)
+
+
+# ============================================
+# RESPONSE HELPERS
+# ============================================
+def _etag(name, stat):
+    match = CONTENT_HASH_RE.search(name)
+    if match:
+        return f'"{match.group(1)}"'
+    return f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+
+
+def _cache_control(name, private):
+    if private:
+        # Shared caches must not keep it; the browser revalidates via ETag.
+        return "private, no-cache"
+    if CONTENT_HASH_RE.search(name):
+        return f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    return f"public, max-age={PUBLIC_MAX_AGE}"
+
+
+def _not_modified(request, etag, mtime):
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match is not None:
+        return if_none_match.strip() == "*" or etag in [t.strip() for t in if_none_match.split(",")]
+    since = parse_http_date_safe(request.headers.get("If-Modified-Since") or "")
+    return since is not None and int(mtime) <= since
+
+
+def _byte_range(request, size, etag):
+    """
+    (start, end) for a single satisfiable Range header, None to send the
+    whole file, or "invalid" for 416. Multi-range requests get the whole file.
+    """
+    header = request.headers.get("Range")
+    if not header:
+        return None
+    if_range = request.headers.get("If-Range")
+    if if_range is not None and if_range.strip() != etag:
+        return None
+
+    match = RANGE_RE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+
+    if not first:
+        # Suffix range: the last N bytes.
+        length = int(last)
+        if length == 0:
+            return "invalid"
+        return max(size - length, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return "invalid"
+    return start, end
+
+
+class _RangeFile:
+    """
+    Read at most `length` bytes from `fh`, starting at its current position.
+    """
+
+    def __init__(self, fh, length):
+        self.fh = fh
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b""
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.fh.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.fh.close()
+
+
+def _offload(name, full_path, backend):
+    response = HttpResponse()
+    if backend == "nginx":
+        prefix = getattr(settings, "MEDIA_ACCEL_PREFIX", "/protected-media/")
+        response["X-Accel-Redirect"] = prefix.rstrip("/") + "/" + quote(name)
+    else:
+        response["X-Sendfile"] = full_path
+    # Let the proxy pick the type from the file it serves.
+    del response["Content-Type"]
+    return response
+
+
+# ============================================
+# VIEW
+# ============================================
+@require_http_methods(["GET", "HEAD"])
+def serve_media(request, path):
+    name = path.lstrip("/")
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, name)
+    except SuspiciousFileOperation:
+        raise Http404("File not found")
+
+    rule = _private_rule(name)
+    if rule is not None:
+        user = _media_user(request, name)
+        if user is None:
+            return HttpResponse(status=401)
+        if not user.is_staff and not rule(user, name):
+            # Same answer as a missing file; don't reveal what exists.
+            raise Http404("File not found")
+
+    try:
+        stat = os.stat(full_path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise Http404("File not found")
+    if not os.path.isfile(full_path):
+        raise Http404("File not found")
+
+    etag = _etag(name, stat)
+    cache_control = _cache_control(name, private=rule is not None)
+
+    backend = getattr(settings, "MEDIA_SENDFILE_BACKEND", "")
+    if backend:
+        response = _offload(name, full_path, backend)
+        response["Cache-Control"] = cache_control
+        return response
+
+    if _not_modified(request, etag, stat.st_mtime):
+        response = HttpResponseNotModified()
+        response["ETag"] = etag
+        response["Cache-Control"] = cache_control
+        return response
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+    byte_range = _byte_range(request, stat.st_size, etag)
+
+    if byte_range == "invalid":
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{stat.st_size}"
+        return response
+
+    if request.method == "HEAD":
+        response = HttpResponse(content_type=content_type)
+        response["Content-Length"] = stat.st_size
+    elif byte_range is None:
+        response = FileResponse(open(full_path, "rb"), content_type=content_type)
+    else:
+        start, end = byte_range
+        fh = open(full_path, "rb")
+        fh.seek(start)
+        response = FileResponse(_RangeFile(fh, end - start + 1), content_type=content_type)
+        response.status_code = 206
+        response["Content-Length"] = end - start + 1
+        response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+
+    if isinstance(response, FileResponse):
+        response.block_size = STREAM_BLOCK_SIZE
+    if encoding:
+        response["Content-Encoding"] = encoding
+    response["Accept-Ranges"] = "bytes"
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(stat.st_mtime)
+    response["Cache-Control"] = cache_control
+    if rule is not None:
+        response["X-Content-Type-Options"] = "nosniff"
+    return response
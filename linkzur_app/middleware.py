@@ -0,0 +1,47 @@
+import logging
+
+from .utils.db import mark_recent_write
+from .utils.notifications import begin_batch, end_batch
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationBatchMiddleware:
+    """
+    Collects notifications queued while handling a request and writes them
+    in one batch after the view returns.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = begin_batch()
+        try:
+            return self.get_response(request)
+        finally:
+            try:
+                end_batch(token)
+            except Exception as e:
+                # The response is already built and the view's own writes
+                # stand; a failed notification flush must not turn it into a 500.
+                logger.error(f"❌ Notification batch flush failed for {request.path}: {e}")
+
+
+class ReplicaStickinessMiddleware:
+    """
+    After a user's write request, keep their reads on the primary for a
+    short window (see utils.db.read_from_replica).
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        # DRF copies the JWT user back onto the Django request.
+        if request.method not in self.SAFE_METHODS and response.status_code < 400:
+            mark_recent_write(getattr(request, "user", None))
+        return response
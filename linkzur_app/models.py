@@ -1,9 +1,10 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.db import models
 from django.conf import settings
-from django.core.validators import FileExtensionValidator
+from django.core.validators import FileExtensionValidator, MaxValueValidator, MinValueValidator
 from django.utils import timezone
 from datetime import timedelta
+import uuid
 from django.db import models
 from django.conf import settings
 from django.db.models import JSONField
@@ -216,11 +217,16 @@ class Product(models.Model):
     ref_no = models.CharField(max_length=100)
     description = models.TextField(blank=True, null=True)
     category = models.CharField(max_length=50, choices=CATEGORY_CHOICES)
+    # Digits only (utils.identifiers.normalize_hsn); searched by prefix.
     hsn = models.CharField(max_length=20, blank=True, null=True)
     gst = models.DecimalField(max_digits=5, decimal_places=2, default=0)
     brand = models.CharField(max_length=255)
+    # Canonical, check-digit-verified CAS number (utils.identifiers.normalize_cas).
     cas_no = models.CharField(max_length=50, blank=True, null=True)
     image = models.ImageField(upload_to="product_images/", null=True, blank=True)
+    # Resized WebP/JPEG copies of `image`, built by utils.images:
+    # {"source": <image name>, "thumb"|"card"|"detail": {"width", "height", "webp", "jpeg"}}
+    image_renditions = JSONField(default=dict, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -229,6 +235,12 @@ class Product(models.Model):
         unique_together = ("seller", "ref_no")
         indexes = [
             models.Index(fields=["seller", "ref_no"]),
+            models.Index(fields=["ref_no"]),
+            # Pattern opclass so Postgres can answer LIKE 'prefix%' (and =)
+            # from the index under a non-C collation; other backends
+            # ignore the opclass.
+            models.Index(fields=["hsn"], name="product_hsn_pattern_idx", opclasses=["varchar_pattern_ops"]),
+            models.Index(fields=["cas_no"], name="product_cas_pattern_idx", opclasses=["varchar_pattern_ops"]),
         ]
 
     def __str__(self):
@@ -310,6 +322,16 @@ class Order(models.Model):
         related_name="orders"
     )
 
+    # place_order creates one order per seller, so the seller is stored on the
+    # order itself instead of being derived through items -> product -> seller.
+    seller = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="received_orders",
+        null=True,
+        blank=True,
+    )
+
     address = models.TextField(blank=True, null=True)
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
@@ -322,6 +344,13 @@ class Order(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["seller", "status", "-created_at"]),
+            models.Index(fields=["seller", "-created_at"]),
+            models.Index(fields=["buyer", "status"]),
+        ]
+
     def __str__(self):
         return f"Order #{self.id} by {self.buyer.email}"
 
@@ -340,6 +369,43 @@ class OrderItem(models.Model):
         return f"{self.product.name}{variant_label} x {self.quantity}"
 
 
+class OrderEvent(models.Model):
+    """
+    Append-only order history: status transitions, delivery OTP activity and
+    invoice uploads. Rows are never updated; the timeline is a range scan on
+    (order, created_at).
+    """
+    EVENT_TYPES = [
+        ("placed", "Order placed"),
+        ("status_changed", "Status changed"),
+        ("otp_sent", "Delivery OTP sent"),
+        ("otp_verified", "Delivery OTP verified"),
+        ("invoice_uploaded", "Invoice uploaded"),
+    ]
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="events")
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPES)
+    from_status = models.CharField(max_length=20, blank=True, default="")
+    to_status = models.CharField(max_length=20, blank=True, default="")
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="order_events",
+    )
+    note = models.CharField(max_length=255, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["order", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"Order #{self.order_id} {self.event_type} at {self.created_at}"
+
+
 # ------------------------
 # Notifications
 # ------------------------
@@ -349,14 +415,156 @@ class Notification(models.Model):
         on_delete=models.CASCADE,
         related_name="notifications"
     )
+    kind = models.CharField(max_length=50, blank=True, default="")
     message = models.TextField()
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["user", "-created_at"]),
+            models.Index(fields=["user", "is_read"]),
+        ]
+
     def __str__(self):
         return f"Notification for {self.user.email} - {self.message[:30]}"
 
 
+class NotificationPreference(models.Model):
+    """
+    Per-user delivery settings read by utils.notifications. Users without a
+    row get everything.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="notification_preference"
+    )
+    in_app_enabled = models.BooleanField(default=True)
+    email_enabled = models.BooleanField(default=True)
+    muted_kinds = JSONField(default=list, blank=True)
+
+    def __str__(self):
+        return f"NotificationPreference({self.user.email})"
+
+
+# ------------------------
+# Outgoing email queue
+# ------------------------
+class OutgoingEmail(models.Model):
+    """
+    Emails queued by request handlers and sent by utils.email_outbox,
+    so SMTP latency and failures stay out of the request.
+    """
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("sending", "Sending"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    ]
+
+    to_email = models.EmailField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    # When a dispatcher last moved the row to "sending"; stuck rows are
+    # requeued by this, not by their age.
+    claimed_at = models.DateTimeField(blank=True, null=True)
+    sent_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+            models.Index(fields=["status", "claimed_at"]),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} → {self.to_email} ({self.status})"
+
+
+# ------------------------
+# Chunked uploads
+# ------------------------
+class UploadSession(models.Model):
+    """
+    A resumable upload in progress. Chunks are appended to a temp file
+    outside MEDIA_ROOT (see utils.uploads); on completion the file is moved
+    into storage and attached to its target.
+    """
+    PURPOSE_CHOICES = [
+        ("chat_attachment", "Chat attachment"),
+        ("quotation", "Quotation"),
+        ("invoice", "Invoice"),
+    ]
+    STATUS_CHOICES = [
+        ("open", "Open"),
+        ("completing", "Completing"),
+        ("complete", "Complete"),
+        ("aborted", "Aborted"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="upload_sessions")
+    purpose = models.CharField(max_length=20, choices=PURPOSE_CHOICES)
+    target_id = models.PositiveBigIntegerField()
+    filename = models.CharField(max_length=255)
+    total_size = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    received_bytes = models.PositiveBigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="open")
+    result = JSONField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "updated_at"]),
+        ]
+
+    def __str__(self):
+        return f"Upload {self.id} ({self.purpose}, {self.received_bytes}/{self.total_size})"
+
+
+# ------------------------
+# Catalog image imports
+# ------------------------
+class ImageImportJob(models.Model):
+    """
+    A seller's ZIP of product images, matched to products by ref_no and
+    processed in the background by utils.image_import.
+    """
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("done", "Done"),
+        ("failed", "Failed"),
+    ]
+
+    seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="image_import_jobs")
+    archive_path = models.CharField(max_length=500)
+    original_name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    total_entries = models.PositiveIntegerField(default=0)
+    processed_entries = models.PositiveIntegerField(default=0)
+    attached_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    report = JSONField(default=list, blank=True)
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["seller", "-created_at"]),
+        ]
+
+    def __str__(self):
+        return f"Image import #{self.id} by {self.seller.email} ({self.status})"
+
+
 # ------------------------
 # Payment (Paytm)
 # ------------------------
@@ -435,8 +643,36 @@ class ProductConversation(models.Model):
     seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="seller_conversations")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Read state per participant: every message with id <= this has been seen.
+    buyer_last_read_id = models.PositiveBigIntegerField(default=0)
+    seller_last_read_id = models.PositiveBigIntegerField(default=0)
+
+    # Inbox summary, kept current by utils.chat so listing needs no joins.
+    last_message_at = models.DateTimeField(default=timezone.now)
+    last_message_preview = models.CharField(max_length=140, blank=True, default="")
+    buyer_unread_count = models.PositiveIntegerField(default=0)
+    seller_unread_count = models.PositiveIntegerField(default=0)
+
     class Meta:
         unique_together = ("order", "product", "buyer", "seller")
+        indexes = [
+            models.Index(fields=["buyer", "-last_message_at"]),
+            models.Index(fields=["seller", "-last_message_at"]),
+        ]
+
+    def last_read_field(self, user) -> str:
+        return "buyer_last_read_id" if user.id == self.buyer_id else "seller_last_read_id"
+
+    def unread_count_field(self, user) -> str:
+        return "buyer_unread_count" if user.id == self.buyer_id else "seller_unread_count"
+
+    def read_by_recipient(self, message) -> bool:
+        """
+        Whether the participant who did not send `message` has seen it.
+        """
+        if message.sender_id == self.buyer_id:
+            return message.id <= self.seller_last_read_id
+        return message.id <= self.buyer_last_read_id
 
     def __str__(self):
         return f"Conversation: Order#{self.order.id} - {self.product.name} ({self.buyer.email} ↔ {self.seller.email})"
@@ -453,8 +689,16 @@ class ProductMessage(models.Model):
         blank=True,
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    # Legacy per-message flag, superseded by the conversation's read pointers
+    # and no longer written. Kept so seed_read_pointers can carry existing
+    # read state over; drop it once that has run.
     is_read = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=["conversation", "id"]),
+        ]
+
     def __str__(self):
         return f"Message {self.id} in conv {self.conversation.id} by {self.sender.email}"
 
@@ -463,14 +707,35 @@ class ProductMessage(models.Model):
 # ------------------------
 class Review(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="reviews")
+    variant = models.ForeignKey(
+        ProductVariant, on_delete=models.CASCADE, related_name="reviews", null=True, blank=True
+    )
     buyer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="reviews")
-    rating = models.PositiveSmallIntegerField(default=5)
+    # 1-5 stars; ProductStats keeps one counter per star.
+    rating = models.PositiveSmallIntegerField(
+        default=5, validators=[MinValueValidator(1), MaxValueValidator(5)]
+    )
     comment = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        unique_together = ("product", "buyer")  # one review per product per buyer
         ordering = ["-created_at"]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(rating__gte=1, rating__lte=5), name="review_rating_1_to_5"
+            ),
+            # one review per purchased variant per buyer
+            models.UniqueConstraint(fields=["product", "variant", "buyer"], name="unique_review_per_variant"),
+            # NULLs never collide above, so product-level reviews need their own
+            models.UniqueConstraint(
+                fields=["product", "buyer"], condition=models.Q(variant__isnull=True),
+                name="unique_review_per_product",
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["product", "-created_at", "-id"]),
+            models.Index(fields=["variant", "-created_at", "-id"]),
+        ]
 
     def __str__(self):
         return f"{self.product.name} - {self.rating}★ by {self.buyer.email}"
@@ -539,11 +804,63 @@ class RecentlyViewed(models.Model):
         on_delete=models.CASCADE,
         related_name="recently_viewed_users"
     )
-    viewed_at = models.DateTimeField(auto_now=True)
+    # Set by the view buffer (utils.recently_viewed) to when the view
+    # happened, not when it was flushed.
+    viewed_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         unique_together = ("user", "product")
         ordering = ["-viewed_at"]
+        indexes = [
+            models.Index(fields=["user", "-viewed_at"]),
+        ]
 
     def __str__(self):
         return f"{self.user.email} viewed {self.product.name}"
+
+
+class ProductStats(models.Model):
+    """
+    Engagement counters per product, written in bulk by utils.product_stats.
+    `popularity` is a forward-decayed score: each event adds
+    weight × 2^((t − epoch) / half-life), so recent events count more and
+    rows never need rewriting as time passes.
+    """
+    product = models.OneToOneField(
+        Product, on_delete=models.CASCADE, primary_key=True, related_name="stats"
+    )
+    views = models.PositiveIntegerField(default=0)
+    cart_adds = models.PositiveIntegerField(default=0)
+    wishlist_adds = models.PositiveIntegerField(default=0)
+    units_sold = models.PositiveIntegerField(default=0)
+    popularity = models.FloatField(default=0)
+    # review count per star, kept in step with Review writes
+    rating_1 = models.PositiveIntegerField(default=0)
+    rating_2 = models.PositiveIntegerField(default=0)
+    rating_3 = models.PositiveIntegerField(default=0)
+    rating_4 = models.PositiveIntegerField(default=0)
+    rating_5 = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-popularity", "-product"]),
+        ]
+
+    def __str__(self):
+        return f"Stats for product {self.product_id}"
+
+    @property
+    def rating_histogram(self):
+        return {str(n): getattr(self, f"rating_{n}") for n in range(1, 6)}
+
+    @property
+    def rating_count(self):
+        return sum(self.rating_histogram.values())
+
+    @property
+    def average_rating(self):
+        count = self.rating_count
+        if not count:
+            return None
+        return round(sum(int(n) * c for n, c in self.rating_histogram.items()) / count, 1)
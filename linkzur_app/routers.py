@@ -0,0 +1,26 @@
+from django.db import connections
+
+from .utils.db import REPLICA_ALIAS, reading_from_replica
+
+
+class ReplicaRouter:
+    """
+    Reads inside views marked @read_from_replica go to the replica; every
+    write, and every read anywhere else, goes to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        # Reads inside a transaction must see that transaction's writes.
+        if reading_from_replica() and not connections["default"].in_atomic_block:
+            return REPLICA_ALIAS
+        return "default"
+
+    def db_for_write(self, model, **hints):
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both aliases.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db != REPLICA_ALIAS
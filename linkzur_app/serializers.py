@@ -1,6 +1,7 @@
+from django.core.files.storage import default_storage
 from rest_framework import serializers
 from .models import (
-    Notification,
+    Notification, NotificationPreference,
     CustomUser,
     Product,
     ProductVariant,
@@ -8,6 +9,7 @@ from .models import (
     WishlistItem,
     Order,
     OrderItem,
+    OrderEvent,
     Quotation,
     ProductConversation,
     ProductMessage,
@@ -15,8 +17,15 @@ from .models import (
     Review,
     Invoice,
     PendingUser,
-    RecentlyViewed
+    RecentlyViewed,
+    ImageImportJob,
+    SellerProfile,
 )
+from .utils.order_state import SELLER_SETTABLE, can_transition
+from .utils.notifications import notify, TEMPLATES
+from .utils.images import FORMATS as IMAGE_FORMATS, RENDITIONS
+from .utils.identifiers import normalize_cas, normalize_hsn
+from .media import signed_media_url
 
 # ==========================================================
 # USER REGISTRATION
@@ -70,21 +79,95 @@ class ProductVariantSerializer(serializers.ModelSerializer):
         fields = ["id", "variant_label", "est_price", "price", "discount", "created_at"]
 
 
+def _media_url(request, name):
+    url = default_storage.url(name)
+    return request.build_absolute_uri(url) if request else url
+
+
+class PrivateFileField(serializers.FileField):
+    """
+    FileField that renders a link signed for the requesting user, so
+    private files open from a plain <a>/<img> without an auth header.
+    """
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        request = self.context.get("request")
+        return signed_media_url(value.name, getattr(request, "user", None), request)
+
+
+def product_image_set(product, request=None):
+    """
+    Rendition URLs plus ready-made srcset strings, or None until the image
+    pipeline (utils.images) has processed the current image.
+    """
+    renditions = product.image_renditions or {}
+    if not product.image or renditions.get("source") != product.image.name:
+        return None
+
+    result = {}
+    srcset = {ext: [] for ext in IMAGE_FORMATS}
+    for name in RENDITIONS:
+        entry = renditions.get(name)
+        if not entry:
+            continue
+        result[name] = {"width": entry["width"], "height": entry["height"]}
+        for ext in IMAGE_FORMATS:
+            url = _media_url(request, entry[ext])
+            result[name][ext] = url
+            srcset[ext].append(f"{url} {entry['width']}w")
+    result["srcset"] = {ext: ", ".join(parts) for ext, parts in srcset.items()}
+    return result
+
+
+def product_thumbnail_url(product, request=None):
+    """
+    Small JPEG rendition when available, else the original upload.
+    """
+    images = product_image_set(product, request)
+    if images and "thumb" in images:
+        return images["thumb"]["jpeg"]
+    if product.image:
+        return _media_url(request, product.image.name)
+    return None
+
+
 class ProductSerializer(serializers.ModelSerializer):
     seller = serializers.StringRelatedField(read_only=True)
     variants = ProductVariantSerializer(many=True, required=False)
     average_rating = serializers.SerializerMethodField()
     total_reviews = serializers.SerializerMethodField()
+    images = serializers.SerializerMethodField()
 
     class Meta:
         model = Product
         fields = [
             "id", "name", "ref_no", "description", "category", "hsn",
-             "brand", "cas_no", "image", "seller", "gst",
+             "brand", "cas_no", "image", "images", "seller", "gst",
             "created_at", "updated_at", "average_rating", "total_reviews", "variants",
         ]
         read_only_fields = ["created_at", "updated_at", "seller"]
 
+    def get_images(self, obj):
+        return product_image_set(obj, self.context.get("request"))
+
+    def validate_cas_no(self, value):
+        if value in (None, ""):
+            return None
+        try:
+            return normalize_cas(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+
+    def validate_hsn(self, value):
+        if value in (None, ""):
+            return None
+        try:
+            return normalize_hsn(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+
     def get_average_rating(self, obj):
         reviews = getattr(obj, "reviews", None)
         if not reviews:
@@ -115,6 +198,16 @@ class ProductSerializer(serializers.ModelSerializer):
         return instance
 
 
+class ImageImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImageImportJob
+        fields = [
+            "id", "original_name", "status",
+            "total_entries", "processed_entries", "attached_count", "failed_count",
+            "report", "error", "created_at", "finished_at",
+        ]
+
+
 # ==========================================================
 # CART & WISHLIST
 # ==========================================================
@@ -155,6 +248,7 @@ class WishlistItemSerializer(serializers.ModelSerializer):
 class InvoiceSerializer(serializers.ModelSerializer):
     buyer_email = serializers.EmailField(source="buyer.email", read_only=True)
     seller_email = serializers.EmailField(source="seller.email", read_only=True)
+    pdf_file = PrivateFileField(required=False, allow_null=True)
 
     class Meta:
         model = Invoice
@@ -197,6 +291,7 @@ class OrderSerializer(serializers.ModelSerializer):
         fields = [
             "id",
             "buyer",
+            "seller",
             "status",
             "total_price",
             "created_at",
@@ -204,7 +299,7 @@ class OrderSerializer(serializers.ModelSerializer):
             "address",
             "invoice",
         ]
-        read_only_fields = ["buyer", "status", "total_price", "created_at"]
+        read_only_fields = ["buyer", "seller", "status", "total_price", "created_at"]
 
 
     def create(self, validated_data):
@@ -232,9 +327,9 @@ class OrderSerializer(serializers.ModelSerializer):
             total_price += price
 
 
-            Notification.objects.create(
-                user=product.seller,
-                message=f"Buyer {buyer.name} purchased {quantity} x {product.name}"
+            notify(
+                product.seller, "item_purchased",
+                buyer_name=buyer.name, quantity=quantity, product_name=product.name,
             )
 
         order.total_price = total_price
@@ -244,10 +339,99 @@ class OrderSerializer(serializers.ModelSerializer):
 
 
 
+class OrderItemSummarySerializer(serializers.ModelSerializer):
+    """
+    Compact item row for order listings (no nested product/variant payloads).
+    """
+    product_name = serializers.CharField(source="product.name", read_only=True)
+    ref_no = serializers.CharField(source="product.ref_no", read_only=True)
+    variant_label = serializers.CharField(
+        source="variant.variant_label", read_only=True, default=None
+    )
+
+    class Meta:
+        model = OrderItem
+        fields = [
+            "id", "product_id", "product_name", "ref_no",
+            "variant_id", "variant_label", "quantity", "price",
+        ]
+
+
+class SellerOrderSerializer(serializers.ModelSerializer):
+    buyer_name = serializers.CharField(source="buyer.name", read_only=True)
+    buyer_email = serializers.EmailField(source="buyer.email", read_only=True)
+    items = OrderItemSummarySerializer(many=True, read_only=True)
+    invoice = InvoiceSerializer(read_only=True)
+
+    class Meta:
+        model = Order
+        fields = [
+            "id",
+            "buyer_name",
+            "buyer_email",
+            "status",
+            "total_price",
+            "created_at",
+            "address",
+            "is_delivered_verified",
+            "items",
+            "invoice",
+        ]
+
+
+class OrderHeaderSerializer(serializers.ModelSerializer):
+    """
+    Order list row for buyers. Expects `item_count` to be annotated and
+    `preview_items` to be prefetched (see view_orders).
+    """
+    seller_name = serializers.CharField(source="seller.name", read_only=True, default=None)
+    item_count = serializers.IntegerField(read_only=True)
+    thumbnails = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Order
+        fields = [
+            "id",
+            "seller_name",
+            "status",
+            "total_price",
+            "created_at",
+            "item_count",
+            "thumbnails",
+        ]
+
+    def get_thumbnails(self, obj):
+        request = self.context.get("request")
+        urls = []
+        for item in getattr(obj, "preview_items", []):
+            url = product_thumbnail_url(item.product, request)
+            if url:
+                urls.append(url)
+        return urls
+
+
+class OrderEventSerializer(serializers.ModelSerializer):
+    actor_name = serializers.CharField(source="actor.name", read_only=True, default=None)
+
+    class Meta:
+        model = OrderEvent
+        fields = ["id", "event_type", "from_status", "to_status", "actor_name", "note", "created_at"]
+
+
 class OrderStatusUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = ["status"]
+        extra_kwargs = {"status": {"required": True}}
+
+    def validate_status(self, value):
+        if value not in SELLER_SETTABLE:
+            raise serializers.ValidationError(f"Sellers cannot set status '{value}'.")
+        if self.instance is not None and not can_transition(self.instance.status, value):
+            raise serializers.ValidationError(
+                f"Cannot change from '{self.instance.status}' to '{value}'."
+            )
+        return value
 
 
 # ==========================================================
@@ -256,7 +440,24 @@ class OrderStatusUpdateSerializer(serializers.ModelSerializer):
 class NotificationSerializer(serializers.ModelSerializer):
     class Meta:
         model = Notification
-        fields = ["id", "message", "is_read", "created_at"]
+        fields = ["id", "kind", "message", "is_read", "created_at"]
+
+
+class NotificationPreferenceSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = NotificationPreference
+        fields = ["in_app_enabled", "email_enabled", "muted_kinds"]
+
+    def validate_muted_kinds(self, value):
+        if not isinstance(value, list):
+            raise serializers.ValidationError("muted_kinds must be a list.")
+        unknown = [k for k in value if k not in TEMPLATES]
+        if unknown:
+            raise serializers.ValidationError(f"Unknown notification kinds: {', '.join(map(str, unknown))}")
+        required = [k for k in value if TEMPLATES[k].get("required")]
+        if required:
+            raise serializers.ValidationError(f"These notifications cannot be muted: {', '.join(required)}")
+        return sorted(set(value))
 
 
 # ==========================================================
@@ -264,6 +465,7 @@ class NotificationSerializer(serializers.ModelSerializer):
 # ==========================================================
 class QuotationSerializer(serializers.ModelSerializer):
     uploaded_by = serializers.StringRelatedField(read_only=True)
+    file = PrivateFileField()
     file_url = serializers.SerializerMethodField()
 
     class Meta:
@@ -276,7 +478,7 @@ class QuotationSerializer(serializers.ModelSerializer):
 
     def get_file_url(self, obj):
         request = self.context.get("request")
-        return request.build_absolute_uri(obj.file.url) if obj.file and request else None
+        return self.fields["file"].to_representation(obj.file) if request else None
 
 class QuotationRequestSerializer(serializers.ModelSerializer):
     buyer = serializers.StringRelatedField(read_only=True)
@@ -306,7 +508,9 @@ class QuotationRequestSerializer(serializers.ModelSerializer):
 # ==========================================================
 class ProductMessageSerializer(serializers.ModelSerializer):
     sender = serializers.StringRelatedField(read_only=True)
+    attachment = PrivateFileField(required=False, allow_null=True)
     attachment_url = serializers.SerializerMethodField()
+    is_read = serializers.SerializerMethodField()
 
     class Meta:
         model = ProductMessage
@@ -318,7 +522,12 @@ class ProductMessageSerializer(serializers.ModelSerializer):
 
     def get_attachment_url(self, obj):
         request = self.context.get("request")
-        return request.build_absolute_uri(obj.attachment.url) if obj.attachment and request else None
+        return self.fields["attachment"].to_representation(obj.attachment) if request else None
+
+    def get_is_read(self, obj):
+        # Pass the conversation in context to avoid a lookup per message.
+        conv = self.context.get("conversation") or obj.conversation
+        return conv.read_by_recipient(obj)
 
 
 class ProductConversationSerializer(serializers.ModelSerializer):
@@ -332,6 +541,110 @@ class ProductConversationSerializer(serializers.ModelSerializer):
         read_only_fields = ["buyer", "seller", "created_at"]
 
 
+class ProductSummarySerializer(serializers.ModelSerializer):
+    """
+    Compact product reference for lists that only need to label a row.
+    """
+    image = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Product
+        fields = ["id", "name", "brand", "ref_no", "image"]
+
+    def get_image(self, obj):
+        return product_thumbnail_url(obj, self.context.get("request"))
+
+
+class SellerBusinessSerializer(serializers.ModelSerializer):
+    """
+    Public business details shown on a product page.
+    """
+    class Meta:
+        model = SellerProfile
+        fields = [
+            "business_name", "entity_type", "gst_number", "city", "state",
+            "website_url", "seller_categories", "is_approved",
+        ]
+
+
+class ReviewSnippetSerializer(serializers.ModelSerializer):
+    buyer_name = serializers.CharField(source="buyer.name", read_only=True)
+
+    class Meta:
+        model = Review
+        fields = ["id", "buyer_name", "rating", "comment", "created_at"]
+
+
+class SimilarProductSerializer(ProductSummarySerializer):
+    """
+    Expects `min_price` to be annotated.
+    """
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+
+    class Meta(ProductSummarySerializer.Meta):
+        fields = ProductSummarySerializer.Meta.fields + ["category", "min_price"]
+
+
+class ProductDetailSerializer(ProductSerializer):
+    """
+    ProductSerializer plus the product page extras. Rating figures come from
+    context["rating"] instead of loading every review.
+    """
+    seller_info = serializers.SerializerMethodField()
+    rating = serializers.SerializerMethodField()
+    top_reviews = serializers.SerializerMethodField()
+    similar_products = serializers.SerializerMethodField()
+
+    class Meta(ProductSerializer.Meta):
+        fields = ProductSerializer.Meta.fields + ["seller_info", "rating", "top_reviews", "similar_products"]
+
+    def get_average_rating(self, obj):
+        return self.context["rating"]["average"]
+
+    def get_total_reviews(self, obj):
+        return self.context["rating"]["count"]
+
+    def get_seller_info(self, obj):
+        profile = getattr(obj.seller, "seller_profile", None)
+        return SellerBusinessSerializer(profile).data if profile else None
+
+    def get_rating(self, obj):
+        return self.context["rating"]
+
+    def get_top_reviews(self, obj):
+        return ReviewSnippetSerializer(self.context["top_reviews"], many=True).data
+
+    def get_similar_products(self, obj):
+        return SimilarProductSerializer(self.context["similar"], many=True, context=self.context).data
+
+
+class ConversationInboxSerializer(serializers.ModelSerializer):
+    """
+    Inbox row from the viewer's side: the other participant and the viewer's
+    own unread count. Expects product, buyer and seller to be select_related.
+    """
+    product = ProductSummarySerializer(read_only=True)
+    counterpart = serializers.SerializerMethodField()
+    unread_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ProductConversation
+        fields = [
+            "id", "order", "product", "counterpart",
+            "last_message_at", "last_message_preview", "unread_count",
+        ]
+
+    def _viewer(self):
+        return self.context["request"].user
+
+    def get_counterpart(self, obj):
+        other = obj.seller if self._viewer().id == obj.buyer_id else obj.buyer
+        return {"id": other.id, "name": other.name}
+
+    def get_unread_count(self, obj):
+        return getattr(obj, obj.unread_count_field(self._viewer()))
+
+
 # ==========================================================
 # REVIEWS (variant-aware)
 # ==========================================================
@@ -0,0 +1,81 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Notification, Product, ProductStats, ProductVariant, Review
+from .utils.db import apply_sqlite_pragmas
+from .utils.facets import bump_catalog_version
+from .utils.images import needs_renditions, schedule_renditions
+from .utils.notification_counts import count_created
+from .utils.product_detail import invalidate_product_detail
+from .utils import product_stats  # also registers the order "completed" hook
+from .utils.realtime import publish_notifications
+from .utils import review_eligibility  # noqa: F401  (registers the order status hook)
+from .utils.suggest import product_deleted, product_saved
+
+
+@receiver(post_save, sender=Notification)
+def push_new_notification(sender, instance, created, **kwargs):
+    # bulk_create() skips post_save; those callers publish explicitly.
+    if created:
+        count_created([instance])
+        publish_notifications([instance])
+
+
+@receiver(post_save, sender=Product)
+def refresh_product_renditions(sender, instance, **kwargs):
+    # Covers every write path (API, admin, imports); the job itself saves
+    # with update(), so it does not re-trigger this.
+    if needs_renditions(instance):
+        schedule_renditions(instance)
+
+
+@receiver(post_save, sender=Product)
+def create_product_stats(sender, instance, created, **kwargs):
+    # New products start with a zeroed row. Products from before ProductStats
+    # may lack one until rebuild_product_stats (or their first flushed event),
+    # which is why popularity orderings left-join with NULLS LAST.
+    if created:
+        ProductStats.objects.get_or_create(product=instance)
+
+
+@receiver(connection_created)
+def tune_sqlite_connection(sender, connection, **kwargs):
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            apply_sqlite_pragmas(cursor)
+
+
+@receiver([post_save, post_delete], sender=Review)
+def refresh_rating_histogram(sender, instance, **kwargs):
+    # Connected before the detail invalidation below, so the recount lands
+    # before cached product pages are retired.
+    product_stats.refresh_ratings_after_commit(instance.product_id)
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=ProductVariant)
+def invalidate_catalog_facets(sender, **kwargs):
+    # After commit, so a concurrent request can't cache pre-commit counts
+    # under the new version.
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=Product)
+def update_suggest_index(sender, instance, **kwargs):
+    transaction.on_commit(lambda: product_saved(instance))
+
+
+@receiver(post_delete, sender=Product)
+def remove_from_suggest_index(sender, instance, **kwargs):
+    product_id = instance.pk  # cleared once the delete finishes
+    transaction.on_commit(lambda: product_deleted(product_id))
+
+
+@receiver([post_save, post_delete], sender=Product)
+@receiver([post_save, post_delete], sender=ProductVariant)
+@receiver([post_save, post_delete], sender=Review)
+def invalidate_cached_product_detail(sender, instance, **kwargs):
+    product_id = instance.pk if sender is Product else instance.product_id
+    transaction.on_commit(lambda: invalidate_product_detail(product_id))
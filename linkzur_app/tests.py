@@ -1,3 +1,677 @@
-from django.test import TestCase
+import hashlib
+import os
+import shutil
+import sqlite3
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from .media import PRIVATE_PREFIXES, signed_media_url
+from .models import (
+    CustomUser, Invoice, Order, OrderEvent, OrderItem, Product, ProductConversation, ProductMessage,
+    Quotation, QuotationRequest, SellerProfile, UploadSession,
+)
+from .utils import suggest
+from .utils.chat import mark_read, post_message, seed_read_pointers
+from .utils.db import REPLICA_ALIAS
+from .utils.identifiers import cas_check_digit, identifier_q, normalize_cas, normalize_hsn
+from .utils.order_state import InvalidTransition, transition, transition_many
+
+
+# ============================================
+# READ REPLICA ROUTING
+# ============================================
+@override_settings(DATABASE_ROUTERS=["linkzur_app.routers.ReplicaRouter"])
+class ReplicaRoutingTests(TransactionTestCase):
+    """
+    Local two-file setup: the test database is the primary and a SQLite
+    file snapshotted from it is the replica. After the snapshot the primary
+    is changed, so each response shows which database the view read from.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.replica_dir = tempfile.mkdtemp()
+        cls.replica_path = os.path.join(cls.replica_dir, "replica.sqlite3")
+        patcher = mock.patch.dict(
+            settings.DATABASES,
+            {REPLICA_ALIAS: {**connections["default"].settings_dict, "NAME": cls.replica_path}},
+        )
+        patcher.start()
+        cls.addClassCleanup(patcher.stop)
+        cls.addClassCleanup(shutil.rmtree, cls.replica_dir, ignore_errors=True)
+        # Set here rather than on the class: the runner checks the declared
+        # aliases against settings before the replica is attached.
+        cls.databases = {"default", REPLICA_ALIAS}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections[REPLICA_ALIAS].close()
+        del connections[REPLICA_ALIAS]
+
+    def setUp(self):
+        cache.clear()  # sticky-after-write markers live in the cache
+
+        self.seller = CustomUser.objects.create_user("seller@example.com", "Seller", "1", "seller", "pw")
+        self.other_seller = CustomUser.objects.create_user("other@example.com", "Other", "2", "seller", "pw")
+        self.product = Product.objects.create(
+            seller=self.seller, name="Acetone", ref_no="A-1", category="chemicals", brand="Merck",
+        )
+        Product.objects.create(
+            seller=self.other_seller, name="Beaker", ref_no="B-1", category="glassware", brand="Borosil",
+        )
+
+        # Snapshot the primary into the replica file, as sync_sqlite_replica does.
+        connections[REPLICA_ALIAS].close()
+        connections["default"].ensure_connection()
+        target = sqlite3.connect(self.replica_path)
+        try:
+            connections["default"].connection.backup(target)
+        finally:
+            target.close()
+
+        # From here on the replica lags behind the primary.
+        Product.objects.filter(pk=self.product.pk).update(name="Acetone (primary)")
+
+    def _names(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        response = client.get("/api/products/")
+        self.assertEqual(response.status_code, 200)
+        return [p["name"] for p in response.json()["results"]]
+
+    def test_replica_views_read_from_replica(self):
+        self.assertEqual(self._names(self.seller), ["Acetone"])
+
+    def test_reads_stick_to_primary_after_a_write(self):
+        client = APIClient()
+        client.force_authenticate(self.seller)
+        response = client.put(f"/api/products/{self.product.pk}/update/", {"brand": "Sigma"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Product.objects.using("default").get(pk=self.product.pk).brand, "Sigma")
+        self.assertEqual(Product.objects.using(REPLICA_ALIAS).get(pk=self.product.pk).brand, "Merck")
+
+        self.assertEqual(self._names(self.seller), ["Acetone (primary)"])
+        # Users who haven't written still read the replica.
+        self.assertEqual(self._names(self.other_seller), ["Beaker"])
+
+
+# ============================================
+# IDENTIFIERS
+# ============================================
+class IdentifierTests(SimpleTestCase):
+    def test_cas_check_digit(self):
+        self.assertEqual(cas_check_digit("6764"), 1)  # acetone, 67-64-1
+        self.assertEqual(cas_check_digit("773218"), 5)  # water, 7732-18-5
+
+    def test_normalize_cas(self):
+        self.assertEqual(normalize_cas("67-64-1"), "67-64-1")
+        self.assertEqual(normalize_cas(" 0067-64-1 "), "67-64-1")
+        self.assertEqual(normalize_cas("67641"), "67-64-1")
+        self.assertEqual(normalize_cas("7732185"), "7732-18-5")
+
+    def test_normalize_cas_rejects_bad_values(self):
+        for value in ("67-64-2", "6-64-1", "67-6-1", "acetone", "", None):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                normalize_cas(value)
+
+    def test_normalize_hsn(self):
+        self.assertEqual(normalize_hsn("2901.10 00"), "29011000")
+        self.assertEqual(normalize_hsn(29011000.0), "29011000")
+        for value in ("2", "123456789", "29a1"):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                normalize_hsn(value)
+
+    def test_identifier_q(self):
+        self.assertIsNone(identifier_q("acetone"))
+        self.assertIn(("cas_no", "67-64-1"), identifier_q("67641").children)
+        self.assertEqual(identifier_q("67-6").children, [("cas_no__startswith", "67-6")])
+        self.assertEqual(identifier_q("2901.10").children, [("hsn__startswith", "290110")])
+
+
+class SearchTests(TestCase):
+    def setUp(self):
+        seller = CustomUser.objects.create_user("seller@example.com", "Seller", "1", "seller", "pw")
+
+        def product(name, ref_no, **fields):
+            return Product.objects.create(
+                seller=seller, name=name, ref_no=ref_no, category="chemicals", brand="Merck", **fields
+            )
+
+        self.acetone = product("Acetone", "A-1", cas_no="67-64-1", hsn="29141100")
+        self.acid = product("Acetic acid", "A-2", cas_no="64-19-7", hsn="29152100")
+        self.tube = product("Falcon tube 50 ml", "FT-1")
+        self.pipette = product("Pipette", "100983")
+
+    def _search(self, q):
+        response = APIClient().get("/api/search/", {"q": q})
+        self.assertEqual(response.status_code, 200)
+        return {p["id"] for p in response.json()["results"]}
+
+    def test_exact_cas(self):
+        self.assertEqual(self._search("67-64-1"), {self.acetone.id})
+
+    def test_bare_digit_cas(self):
+        self.assertEqual(self._search("67641"), {self.acetone.id})
+
+    def test_partial_cas(self):
+        self.assertEqual(self._search("64-1"), {self.acid.id})
+
+    def test_hsn_prefix(self):
+        self.assertEqual(self._search("2914"), {self.acetone.id})
+        self.assertEqual(self._search("2915.21"), {self.acid.id})
+
+    def test_digits_without_identifier_match_fall_back_to_text(self):
+        self.assertEqual(self._search("50"), {self.tube.id})
+        self.assertEqual(self._search("1009"), {self.pipette.id})
+
+    def test_text(self):
+        self.assertEqual(self._search("acet"), {self.acetone.id, self.acid.id})
+
+    def test_query_required(self):
+        self.assertEqual(APIClient().get("/api/search/").status_code, 400)
+
+
+# ============================================
+# SUGGEST
+# ============================================
+class SuggestIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        seller = CustomUser.objects.create_user("seller@example.com", "Seller", "1", "seller", "pw")
+        self.product = Product.objects.create(
+            seller=seller, name="Acetone HPLC", ref_no="A-1", category="chemicals", brand="Merck",
+        )
+        suggest._index.version = None
+        self.addCleanup(setattr, suggest._index, "version", None)
+
+    def _texts(self, q):
+        return [row["text"] for row in suggest.get_index().suggest(q)]
+
+    def test_picks_up_changes_made_by_other_workers(self):
+        self.assertEqual(self._texts("hplc"), ["Acetone HPLC"])
+
+        # Another worker's save: no signal reaches this process, and the
+        # per-process cache never sees its version bump.
+        Product.objects.filter(pk=self.product.pk).update(name="Acetone GR", updated_at=timezone.now())
+        self.assertEqual(self._texts("hplc"), ["Acetone HPLC"])  # until the next check
+
+        suggest._index.checked_at = 0.0
+        self.assertEqual(self._texts("hplc"), [])
+        self.assertEqual(self._texts("acetone g"), ["Acetone GR"])
+
+
+# ============================================
+# ORDER STATE
+# ============================================
+class OrderStateTests(TestCase):
+    def setUp(self):
+        self.seller = CustomUser.objects.create_user("seller@example.com", "Seller", "1", "seller", "pw")
+        self.other_seller = CustomUser.objects.create_user("other@example.com", "Other", "2", "seller", "pw")
+        self.buyer = CustomUser.objects.create_user("buyer@example.com", "Buyer", "3", "buyer", "pw")
+        self.product = Product.objects.create(
+            seller=self.seller, name="Acetone", ref_no="A-1", category="chemicals", brand="Merck",
+        )
+        self.order = Order.objects.create(buyer=self.buyer, seller=self.seller, total_price=10)
+        # Placed before Order.seller existed: only its items name the seller.
+        self.legacy = Order.objects.create(buyer=self.buyer, seller=None, total_price=10)
+        OrderItem.objects.create(order=self.legacy, product=self.product, quantity=1, price=10)
+        self.foreign = Order.objects.create(buyer=self.buyer, seller=self.other_seller, total_price=10)
+
+    def _client(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def _events(self, order):
+        return list(order.events.order_by("id").values_list("event_type", "from_status", "to_status"))
+
+    def test_transitions_write_events(self):
+        transition(self.order, "processing", actor=self.seller)
+        transition(self.order, "delivered", actor=self.seller)
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, "delivered")
+        self.assertEqual(len(self.order.delivery_otp), 6)
+        self.assertFalse(self.order.is_delivered_verified)
+        self.assertEqual(self._events(self.order), [
+            ("status_changed", "pending", "processing"),
+            ("status_changed", "processing", "delivered"),
+            ("otp_sent", "", "delivered"),
+        ])
+
+    def test_rejected_transitions(self):
+        for new_status in ("delivered", "completed", "pending"):
+            with self.subTest(new_status=new_status), self.assertRaises(InvalidTransition):
+                transition(self.order, new_status, actor=self.seller)
+
+        transition(self.order, "cancelled", actor=self.seller)
+        with self.assertRaises(InvalidTransition):
+            transition(self.order, "processing", actor=self.seller)
+
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, "cancelled")
+        self.assertEqual(len(self._events(self.order)), 1)
+
+    def test_stale_transition_is_rejected(self):
+        # Another request cancelled the order after this copy was loaded.
+        Order.objects.filter(pk=self.order.pk).update(status="cancelled")
+
+        with self.assertRaisesMessage(InvalidTransition, "was updated by another request"):
+            transition(self.order, "processing", actor=self.seller)
+        self.assertEqual(Order.objects.get(pk=self.order.pk).status, "cancelled")
+        self.assertFalse(OrderEvent.objects.exists())
+
+    def test_transition_many_reports_each_order(self):
+        Order.objects.filter(pk=self.legacy.pk).update(status="delivered")
+
+        done, failures = transition_many(
+            Order.objects.filter(pk__in=[self.order.pk, self.legacy.pk]), "shipped", actor=self.seller,
+        )
+
+        self.assertEqual([o.pk for o in done], [self.order.pk])
+        self.assertEqual(failures, {self.legacy.pk: "Cannot change from 'delivered' to 'shipped'."})
+        self.assertEqual(Order.objects.get(pk=self.legacy.pk).status, "delivered")
+        self.assertEqual(self._events(self.order), [("status_changed", "pending", "shipped")])
+        self.assertEqual(self._events(self.legacy), [])
+
+    def test_transition_many_gives_each_order_its_own_otp(self):
+        Order.objects.filter(pk__in=[self.order.pk, self.legacy.pk]).update(status="shipped")
+
+        done, failures = transition_many(
+            Order.objects.filter(pk__in=[self.order.pk, self.legacy.pk]), "delivered", actor=self.seller,
+        )
+
+        self.assertEqual((len(done), failures), (2, {}))
+        stored = dict(Order.objects.filter(pk__in=[self.order.pk, self.legacy.pk]).values_list("pk", "delivery_otp"))
+        self.assertEqual(stored, {o.pk: o.delivery_otp for o in done})
+
+    def test_bulk_status_endpoint(self):
+        delivered = Order.objects.create(buyer=self.buyer, seller=self.seller, status="delivered")
+        response = self._client(self.seller).post(
+            "/api/seller/orders/bulk-status/",
+            {"order_ids": [self.order.pk, self.legacy.pk, self.foreign.pk, delivered.pk], "status": "processing"},
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["updated"], 2)
+        results = {r["order_id"]: r for r in response.json()["results"]}
+        self.assertTrue(results[self.order.pk]["success"])
+        self.assertTrue(results[self.legacy.pk]["success"])
+        self.assertEqual(results[self.foreign.pk]["error"], "Order not found")
+        self.assertEqual(results[delivered.pk]["error"], "Cannot change from 'delivered' to 'processing'.")
+        self.assertEqual(Order.objects.get(pk=self.foreign.pk).status, "pending")
+
+    def test_bulk_status_rejects_bad_requests(self):
+        url = "/api/seller/orders/bulk-status/"
+        body = {"order_ids": [self.order.pk], "status": "processing"}
+        self.assertEqual(self._client(self.buyer).post(url, body, format="json").status_code, 403)
+
+        seller = self._client(self.seller)
+        for bad in ({"order_ids": []}, {"order_ids": ["x"]}, {"status": "completed"}):
+            with self.subTest(bad=bad):
+                self.assertEqual(seller.post(url, {**body, **bad}, format="json").status_code, 400)
+        self.assertEqual(Order.objects.get(pk=self.order.pk).status, "pending")
+
+    def test_legacy_orders_belong_to_the_seller_of_their_items(self):
+        response = self._client(self.seller).get("/api/seller/orders/")
+        self.assertEqual({o["id"] for o in response.json()}, {self.order.pk, self.legacy.pk})
+
+        response = self._client(self.other_seller).get("/api/seller/orders/")
+        self.assertEqual({o["id"] for o in response.json()}, {self.foreign.pk})
+
+        for path in (f"/api/orders/{self.legacy.pk}/", f"/api/orders/{self.legacy.pk}/timeline/"):
+            with self.subTest(path=path):
+                self.assertEqual(self._client(self.seller).get(path).status_code, 200)
+                self.assertEqual(self._client(self.other_seller).get(path).status_code, 404)
+
+    def test_legacy_order_status_update_checks_items(self):
+        path = f"/api/orders/{self.legacy.pk}/update-status/"
+        response = self._client(self.other_seller).patch(path, {"status": "processing"}, format="json")
+        self.assertEqual(response.status_code, 403)
+
+        response = self._client(self.seller).patch(path, {"status": "processing"}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Order.objects.get(pk=self.legacy.pk).status, "processing")
+
+    def test_timeline(self):
+        transition(self.order, "processing", actor=self.seller)
+        transition(self.order, "shipped", actor=self.seller)
+
+        response = self._client(self.buyer).get(f"/api/orders/{self.order.pk}/timeline/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(e["from_status"], e["to_status"], e["actor_name"]) for e in response.json()],
+            [("pending", "processing", "Seller"), ("processing", "shipped", "Seller")],
+        )
+
+        self.assertEqual(self._client(self.other_seller).get(f"/api/orders/{self.order.pk}/timeline/").status_code, 404)
+
+
+# ============================================
+# CHAT READ POINTERS
+# ============================================
+class ReadPointerTests(TestCase):
+    def setUp(self):
+        self.seller = CustomUser.objects.create_user("seller@example.com", "Seller", "1", "seller", "pw")
+        self.buyer = CustomUser.objects.create_user("buyer@example.com", "Buyer", "2", "buyer", "pw")
+        self.outsider = CustomUser.objects.create_user("out@example.com", "Outsider", "3", "buyer", "pw")
+        product = Product.objects.create(
+            seller=self.seller, name="Acetone", ref_no="A-1", category="chemicals", brand="Merck",
+        )
+        order = Order.objects.create(buyer=self.buyer, seller=self.seller, total_price=10)
+        self.conv = ProductConversation.objects.create(
+            order=order, product=product, buyer=self.buyer, seller=self.seller,
+        )
+        self.m1 = post_message(self.conv, self.buyer, "Is this in stock?")
+        self.m2 = post_message(self.conv, self.seller, "Yes")
+        self.m3 = post_message(self.conv, self.seller, "Ships Monday")
+
+    def _pointer(self):
+        self.conv.refresh_from_db()
+        return self.conv.buyer_last_read_id, self.conv.buyer_unread_count
+
+    def test_mark_read_advances_and_recounts(self):
+        self.assertEqual(self._pointer(), (0, 2))
+        self.assertTrue(mark_read(self.conv, self.buyer, self.m2.id))
+        self.assertEqual(self._pointer(), (self.m2.id, 1))
+
+    def test_mark_read_never_moves_backwards(self):
+        mark_read(self.conv, self.buyer, self.m3.id)
+        self.assertFalse(mark_read(self.conv, self.buyer, self.m2.id))
+        self.assertEqual(self._pointer(), (self.m3.id, 0))
+
+    def test_mark_read_stops_at_the_newest_message(self):
+        self.assertTrue(mark_read(self.conv, self.buyer, self.m3.id + 1000))
+        self.assertEqual(self._pointer(), (self.m3.id, 0))
+
+        m4 = post_message(self.conv, self.seller, "Tracking number follows")
+        self.assertFalse(self.conv.read_by_recipient(m4))
+        self.assertEqual(self._pointer(), (self.m3.id, 1))
+
+    def test_mark_read_ignores_outsiders(self):
+        self.assertFalse(mark_read(self.conv, self.outsider))
+        self.conv.refresh_from_db()
+        self.assertEqual((self.conv.buyer_last_read_id, self.conv.seller_last_read_id), (0, 0))
+
+    def test_seed_read_pointers(self):
+        ProductMessage.objects.filter(pk__in=[self.m1.pk, self.m2.pk]).update(is_read=True)
+
+        seed_read_pointers([self.conv.pk])
+        self.conv.refresh_from_db()
+        self.assertEqual((self.conv.buyer_last_read_id, self.conv.seller_last_read_id), (self.m2.id, self.m1.id))
+
+        # Reruns never pull a pointer that has since moved on back.
+        mark_read(self.conv, self.buyer, self.m3.id)
+        seed_read_pointers()
+        self.conv.refresh_from_db()
+        self.assertEqual(self.conv.buyer_last_read_id, self.m3.id)
+
+
+# ============================================
+# CHUNKED UPLOADS
+# ============================================
+class ChunkedUploadTests(TestCase):
+    data = b"0123456789abcdefghij"
+
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        overrides = override_settings(
+            MEDIA_ROOT=os.path.join(tmp, "media"), CHUNKED_UPLOAD_DIR=os.path.join(tmp, "parts"),
+        )
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        seller = CustomUser.objects.create_user("seller@example.com", "Seller", "1", "seller", "pw")
+        self.buyer = CustomUser.objects.create_user("buyer@example.com", "Buyer", "2", "buyer", "pw")
+        product = Product.objects.create(
+            seller=seller, name="Acetone", ref_no="A-1", category="chemicals", brand="Merck",
+        )
+        order = Order.objects.create(buyer=self.buyer, seller=seller, total_price=10)
+        self.conv = ProductConversation.objects.create(order=order, product=product, buyer=self.buyer, seller=seller)
+
+        self.client = APIClient()
+        self.client.force_authenticate(self.buyer)
+
+    def _start(self, sha256=None):
+        response = self.client.post("/api/uploads/", {
+            "purpose": "chat_attachment",
+            "target_id": self.conv.pk,
+            "filename": "spec.txt",
+            "total_size": len(self.data),
+            "sha256": sha256 or hashlib.sha256(self.data).hexdigest(),
+        }, format="json")
+        self.assertEqual(response.status_code, 201)
+        return f"/api/uploads/{response.json()['upload_id']}/"
+
+    def _put(self, url, start, end, **headers):
+        chunk = self.data[start:end + 1]
+        return self.client.put(
+            url, chunk, content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes {start}-{end}/{len(self.data)}", **headers,
+        )
+
+    def test_resumed_upload_is_attached(self):
+        url = self._start()
+        self.assertEqual(self._put(url, 0, 9).json()["received_bytes"], 10)
+        self.assertEqual(self.client.get(url).json()["received_bytes"], 10)
+
+        # A retried chunk overwrites from its offset; a gap is refused.
+        self.assertEqual(self._put(url, 5, 9).json()["received_bytes"], 10)
+        response = self._put(url, 15, 19)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()["error"], "Expected offset 10, got 15")
+
+        self.assertEqual(self._put(url, 10, 19).json()["received_bytes"], 20)
+        response = self.client.post(f"{url}complete/", {"text": "Spec sheet"}, format="json")
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["status"], "complete")
+
+        msg = ProductMessage.objects.get(conversation=self.conv, text="Spec sheet")
+        with msg.attachment.open("rb") as fh:
+            self.assertEqual(fh.read(), self.data)
+        self.assertEqual(os.listdir(settings.CHUNKED_UPLOAD_DIR), [])
+
+        # Completing again returns the stored result.
+        self.assertEqual(self.client.post(f"{url}complete/").status_code, 201)
+        self.assertEqual(ProductMessage.objects.filter(conversation=self.conv).count(), 1)
+
+    def test_bad_chunk_is_dropped(self):
+        url = self._start()
+        response = self._put(url, 0, 9, HTTP_X_CHUNK_SHA256="0" * 64)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.get(url).json()["received_bytes"], 0)
+
+    def test_checksum_mismatch_restarts_the_upload(self):
+        url = self._start(sha256=hashlib.sha256(b"something else").hexdigest())
+        self._put(url, 0, 19)
+
+        response = self.client.post(f"{url}complete/")
+        self.assertEqual(response.status_code, 422)
+        state = self.client.get(url).json()
+        self.assertEqual((state["status"], state["received_bytes"]), ("open", 0))
+        self.assertFalse(ProductMessage.objects.exists())
+
+        # The restarted session accepts the file from the beginning again.
+        self.assertEqual(self._put(url, 0, 9).json()["received_bytes"], 10)
+
+    def test_incomplete_upload_cannot_complete(self):
+        url = self._start()
+        self._put(url, 0, 9)
+        response = self.client.post(f"{url}complete/")
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(UploadSession.objects.get().status, "open")
+
+    def test_sessions_are_private(self):
+        url = self._start()
+        outsider = CustomUser.objects.create_user("out@example.com", "Outsider", "3", "buyer", "pw")
+        self.client.force_authenticate(outsider)
+        self.assertEqual(self.client.get(url).status_code, 404)
+        self.assertEqual(self._put(url, 0, 9).status_code, 404)
+        self.assertEqual(self.client.post(f"{url}complete/").status_code, 404)
+
+        response = self.client.post("/api/uploads/", {
+            "purpose": "chat_attachment", "target_id": self.conv.pk, "filename": "x.txt",
+            "total_size": 1, "sha256": hashlib.sha256(b"x").hexdigest(),
+        }, format="json")
+        self.assertEqual(response.status_code, 404)
+
+
+# ============================================
+# MEDIA ACCESS
+# ============================================
+@override_settings(MEDIA_SENDFILE_BACKEND="")
+class MediaAccessTests(TestCase):
+    content = b"0123456789" * 10
+
+    def setUp(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp, ignore_errors=True)
+        overrides = override_settings(MEDIA_ROOT=tmp)
+        overrides.enable()
+        self.addCleanup(overrides.disable)
+
+        self.seller = CustomUser.objects.create_user("seller@example.com", "Seller", "1", "seller", "pw")
+        self.buyer = CustomUser.objects.create_user("buyer@example.com", "Buyer", "2", "buyer", "pw")
+        self.outsider = CustomUser.objects.create_user("out@example.com", "Outsider", "3", "buyer", "pw")
+        product = Product.objects.create(
+            seller=self.seller, name="Acetone", ref_no="A-1", category="chemicals", brand="Merck",
+        )
+        order = Order.objects.create(buyer=self.buyer, seller=self.seller, total_price=10)
+
+        invoice = Invoice.objects.create(
+            order=order, buyer=self.buyer, seller=self.seller, subtotal=10, total_amount=10,
+        )
+        invoice.pdf_file.save("invoice.pdf", ContentFile(self.content))
+
+        qreq = QuotationRequest.objects.create(product=product, buyer=self.buyer, seller=self.seller)
+        quotation = Quotation(request=qreq, uploaded_by=self.seller)
+        quotation.file.save("quote.pdf", ContentFile(self.content))
+
+        conv = ProductConversation.objects.create(order=order, product=product, buyer=self.buyer, seller=self.seller)
+        message = ProductMessage(conversation=conv, sender=self.buyer, text="")
+        message.attachment.save("notes.txt", ContentFile(self.content))
+
+        profile = SellerProfile(
+            user=self.seller, business_name="Lab Supplies", entity_type="proprietorship",
+            gst_number="GST", pan_number="PAN", address_line1="1 Road", city="Pune",
+            state="MH", pincode="411001",
+        )
+        profile.business_document.save("licence.pdf", ContentFile(self.content), save=False)
+        profile.gst_certificate.save("gst.pdf", ContentFile(self.content))
+
+        # name → users allowed besides staff
+        self.files = {
+            invoice.pdf_file.name: {self.buyer, self.seller},
+            quotation.file.name: {self.buyer, self.seller},
+            message.attachment.name: {self.buyer, self.seller},
+            profile.business_document.name: {self.seller},
+            profile.gst_certificate.name: {self.seller},
+        }
+        self.invoice_name = invoice.pdf_file.name
+
+    def _get(self, path, client=None, **headers):
+        response = (client or APIClient()).get(path, **headers)
+        if response.streaming:
+            response.body = b"".join(response.streaming_content)
+            response.close()
+        return response
+
+    def _as(self, user):
+        client = APIClient()
+        client.force_login(user)
+        return client
+
+    def test_every_private_prefix_is_covered(self):
+        prefixes = {next(p for p in PRIVATE_PREFIXES if name.startswith(p)) for name in self.files}
+        self.assertEqual(prefixes, set(PRIVATE_PREFIXES))
+
+    def test_private_files_need_a_party_to_them(self):
+        staff = CustomUser.objects.create_user("staff@example.com", "Staff", "4", "buyer", "pw")
+        CustomUser.objects.filter(pk=staff.pk).update(is_staff=True)
+        staff.refresh_from_db()
+        for name, allowed in self.files.items():
+            path = f"/media/{name}"
+            with self.subTest(name=name):
+                self.assertEqual(self._get(path).status_code, 401)
+                for user in (self.buyer, self.seller, self.outsider, staff):
+                    expected = 200 if user in allowed or user is staff else 404
+                    self.assertEqual(self._get(path, self._as(user)).status_code, expected, user.email)
+
+    def test_private_files_are_not_cached_by_proxies(self):
+        response = self._get(f"/media/{self.invoice_name}", self._as(self.buyer))
+        self.assertEqual(response.body, self.content)
+        self.assertEqual(response["Cache-Control"], "private, no-cache")
+
+    def test_bearer_token(self):
+        path = f"/media/{self.invoice_name}"
+        token = str(AccessToken.for_user(self.buyer))
+        self.assertEqual(self._get(path, HTTP_AUTHORIZATION=f"Bearer {token}").status_code, 200)
+        self.assertEqual(self._get(path, HTTP_AUTHORIZATION="Bearer nonsense").status_code, 401)
+        # Tokens in the query string would end up in logs; only ?sig= is accepted.
+        self.assertEqual(self._get(f"{path}?token={token}").status_code, 401)
+
+    def test_signed_links(self):
+        url = signed_media_url(self.invoice_name, self.buyer)
+        self.assertIn("?sig=", url)
+        self.assertEqual(self._get(url).body, self.content)
+
+        # A signature only opens the file it was issued for ...
+        other = next(n for n in self.files if n.startswith("quotations/"))
+        sig = url.split("?", 1)[1]
+        self.assertEqual(self._get(f"/media/{other}?{sig}").status_code, 401)
+        # ... the access rule still applies to the signed user ...
+        self.assertEqual(self._get(signed_media_url(self.invoice_name, self.outsider)).status_code, 404)
+        # ... and it expires.
+        with override_settings(SIGNED_MEDIA_MAX_AGE=-1):
+            self.assertEqual(self._get(url).status_code, 401)
+
+    def test_public_files_need_no_auth(self):
+        name = default_storage.save("products/acetone.txt", ContentFile(self.content))
+        self.assertEqual(signed_media_url(name, self.buyer), f"/media/{name}")
+        response = self._get(f"/media/{name}")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Cache-Control"].startswith("public"))
+
+    def test_ranges(self):
+        path, client = f"/media/{self.invoice_name}", self._as(self.buyer)
+
+        response = self._get(path, client, HTTP_RANGE="bytes=10-19")
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response.body, b"0123456789")
+        self.assertEqual(response["Content-Range"], "bytes 10-19/100")
+
+        response = self._get(path, client, HTTP_RANGE="bytes=-5")
+        self.assertEqual((response.status_code, response.body), (206, b"56789"))
+
+        response = self._get(path, client, HTTP_RANGE="bytes=100-")
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */100")
+
+        # A stale If-Range gets the whole (changed) file.
+        response = self._get(path, client, HTTP_RANGE="bytes=10-19", HTTP_IF_RANGE='"stale"')
+        self.assertEqual((response.status_code, len(response.body)), (200, 100))
+
+    def test_conditional_get(self):
+        path, client = f"/media/{self.invoice_name}", self._as(self.buyer)
+        etag = self._get(path, client)["ETag"]
+
+        response = self._get(path, client, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(self._get(path, client, HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+        # Authorization is checked before the cache validators.
+        self.assertEqual(self._get(path, self._as(self.outsider), HTTP_IF_NONE_MATCH=etag).status_code, 404)
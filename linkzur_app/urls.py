@@ -7,6 +7,8 @@ from .views import (
     user_profile,
     update_user_profile,
     list_products,
+    product_detail,
+    product_facets,
     add_product,
     update_product,
     delete_product,
@@ -18,26 +20,41 @@ from .views import (
     remove_from_wishlist,
     place_order,
     view_orders,
+    order_detail,
+    order_timeline,
     seller_orders,
     update_order_status,
+    bulk_update_order_status,
     get_notifications,
     mark_notification_read,
+    mark_notifications_read,
+    unread_notification_count,
+    notification_preferences,
+    notification_stream,
     request_quotation_preproduct,
     list_my_quotation_requests,
     upload_quotation_for_request,
     start_or_get_conversation,
     list_conversations_for_user,
     list_messages,
+    mark_conversation_read,
+    start_upload,
+    upload_session,
+    complete_upload,
     send_message,
     list_reviews,
     add_review,
+    review_eligibility,
     search_products,
+    suggest_products,
     seller_dashboard_stats,
     seller_sales_trends,
     seller_product_performance,
     seller_customer_insights,
     clear_from_cart,
     upload_products,
+    import_product_images,
+    image_import_status,
     request_password_reset,
     verify_password_reset,
     verify_delivery_otp,
@@ -72,14 +89,19 @@ urlpatterns = [
     # Products
     # ------------------------
     path("products/", list_products, name="product-list"),
+    path("products/facets/", product_facets, name="product-facets"),
     path("products/add/", add_product, name="product-add"),
     path("products/upload_products/", upload_products, name="upload_products"),
+    path("products/images/import/", import_product_images, name="product-image-import"),
+    path("products/images/import/<int:job_id>/", image_import_status, name="product-image-import-status"),
 
+    path("products/<int:pk>/", product_detail, name="product-detail"),
     path("products/<int:pk>/update/", update_product, name="product-update"),
     path("products/<int:pk>/delete/", delete_product, name="product-delete"),
 
     
     path("search/", search_products, name="search-products"),
+    path("products/suggest/", suggest_products, name="product-suggest"),
 
     # ------------------------
     # Cart
@@ -101,16 +123,23 @@ urlpatterns = [
     # ------------------------
     path("orders/place/", place_order, name="order-place"),
     path("orders/", view_orders, name="order-list"),
+    path("orders/<int:order_id>/", order_detail, name="order-detail"),
+    path("orders/<int:order_id>/timeline/", order_timeline, name="order-timeline"),
     path("orders/<int:order_id>/update-status/", update_order_status, name="order-update-status"),
     path("orders/<int:order_id>/verify-otp/", verify_delivery_otp),
      path("orders/<int:order_id>/upload-invoice/", upload_invoice, name="upload-invoice"),
     path("seller/orders/", seller_orders, name="seller-orders"),
+    path("seller/orders/bulk-status/", bulk_update_order_status, name="seller-orders-bulk-status"),
 
     # ------------------------
     # Notifications
     # ------------------------
     path("notifications/", get_notifications, name="notification-list"),
     path("notifications/<int:pk>/read/", mark_notification_read, name="notification-read"),
+    path("notifications/mark-read/", mark_notifications_read, name="notification-mark-read"),
+    path("notifications/unread-count/", unread_notification_count, name="notification-unread-count"),
+    path("notifications/stream/", notification_stream, name="notification-stream"),
+    path("notifications/preferences/", notification_preferences, name="notification-preferences"),
 
 
     # ------------------------
@@ -127,12 +156,19 @@ urlpatterns = [
     path("conversations/", list_conversations_for_user, name="list-conversations"),
     path("conversations/<int:conversation_id>/messages/", list_messages, name="list-messages"),
     path("conversations/<int:conversation_id>/messages/send/", send_message, name="send-message"),
+    path("conversations/<int:conversation_id>/read/", mark_conversation_read, name="conversation-read"),
+
+    # Chunked uploads
+    path("uploads/", start_upload, name="upload-start"),
+    path("uploads/<uuid:upload_id>/", upload_session, name="upload-session"),
+    path("uploads/<uuid:upload_id>/complete/", complete_upload, name="upload-complete"),
 
     # ------------------------
     # Reviews
     # ------------------------
     path("products/<int:product_id>/reviews/", list_reviews, name="list-reviews"),
     path("products/<int:product_id>/reviews/add/", add_review, name="add-review"),
+    path("reviews/eligibility/", review_eligibility, name="review-eligibility"),
 
     # ------------------------
     # Seller Dashboard
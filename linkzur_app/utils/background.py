@@ -0,0 +1,61 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# In-process worker pool for work that should not hold up the response
+# (outgoing email, image processing). Jobs must be safe to lose on a restart:
+# anything durable is recorded in the database first and re-driven by a
+# management command.
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "BACKGROUND_WORKERS", 2),
+    thread_name_prefix="linkzur-bg",
+)
+
+
+def _run(fn, args, kwargs):
+    close_old_connections()
+    try:
+        fn(*args, **kwargs)
+    except Exception as e:
+        logger.error(f"❌ Background job {fn.__name__} failed: {e}")
+    finally:
+        connections.close_all()
+
+
+def submit(fn, *args, **kwargs):
+    """
+    Run fn(*args, **kwargs) on the background pool, or inline when
+    BACKGROUND_TASKS_EAGER is set (tests, management commands).
+    """
+    if getattr(settings, "BACKGROUND_TASKS_EAGER", False):
+        return fn(*args, **kwargs)
+    return _executor.submit(_run, fn, args, kwargs)
+
+
+def submit_after_commit(fn, *args, **kwargs):
+    """
+    Queue fn once the current transaction commits (immediately when not in one),
+    so the job never sees rows that were rolled back.
+    """
+    transaction.on_commit(lambda: submit(fn, *args, **kwargs))
+
+
+def run_periodically(fn, interval, name):
+    """
+    Start a daemon thread that submits fn to the pool every `interval`
+    seconds. Used to flush per-process write buffers.
+    """
+    def loop():
+        while True:
+            time.sleep(interval)
+            submit(fn)
+
+    thread = threading.Thread(target=loop, name=f"linkzur-{name}", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,193 @@
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+
+from ..media import signed_media_url
+from ..models import ProductConversation, ProductMessage
+from .notifications import notify
+from .pubsub import conversation_channel, get_broker
+
+MAX_MESSAGE_LENGTH = 5000
+PREVIEW_LENGTH = 140
+
+
+# ============================================
+# ACCESS
+# ============================================
+def is_participant(user, conv) -> bool:
+    return user.is_staff or user.id in (conv.buyer_id, conv.seller_id)
+
+
+def get_conversation_for(user, conversation_id):
+    """
+    The conversation if `user` may take part in it, else None.
+    """
+    conv = (
+        ProductConversation.objects.select_related("product", "buyer", "seller")
+        .filter(pk=conversation_id)
+        .first()
+    )
+    if conv is None or not is_participant(user, conv):
+        return None
+    return conv
+
+
+# ============================================
+# PAYLOADS
+# ============================================
+def message_payload(msg, conv=None, viewer=None) -> dict:
+    """
+    Wire shape of a message. The attachment link is signed per user, so
+    payloads built without a viewer (broadcasts) carry only the stored
+    name; for_viewer() fills in the link on delivery.
+    """
+    conv = conv or msg.conversation
+    payload = {
+        "type": "message",
+        "id": msg.id,
+        "conversation": msg.conversation_id,
+        "sender_id": msg.sender_id,
+        "sender": str(msg.sender),
+        "text": msg.text,
+        "attachment": msg.attachment.name if msg.attachment else None,
+        "attachment_url": None,
+        "created_at": msg.created_at.isoformat() if msg.created_at else None,
+        "is_read": conv.read_by_recipient(msg),
+    }
+    return for_viewer(payload, viewer) if viewer else payload
+
+
+def for_viewer(payload: dict, user) -> dict:
+    if payload.get("type") != "message" or not payload.get("attachment"):
+        return payload
+    return {**payload, "attachment_url": signed_media_url(payload["attachment"], user)}
+
+
+def publish(conversation_id, payload: dict):
+    """
+    Broadcast to everyone connected to the conversation once the current
+    transaction commits.
+    """
+    transaction.on_commit(
+        lambda: get_broker().publish(conversation_channel(conversation_id), payload)
+    )
+
+
+# ============================================
+# ACTIONS (shared by REST and WebSocket)
+# ============================================
+def message_preview(msg) -> str:
+    text = " ".join(msg.text.split())
+    if not text and msg.attachment:
+        return "📎 Attachment"
+    if len(text) > PREVIEW_LENGTH:
+        return text[:PREVIEW_LENGTH - 1] + "…"
+    return text
+
+
+def message_sent(conv, msg):
+    """
+    Update the inbox summary, fan a freshly saved message out to live
+    participants and notify the other side.
+    """
+    recipient_unread = (
+        "seller_unread_count" if msg.sender_id == conv.buyer_id else "buyer_unread_count"
+    )
+    ProductConversation.objects.filter(pk=conv.pk).update(**{
+        "last_message_at": msg.created_at,
+        "last_message_preview": message_preview(msg),
+        recipient_unread: F(recipient_unread) + 1,
+    })
+
+    publish(conv.id, message_payload(msg, conv))
+
+    other_user = conv.seller if msg.sender_id == conv.buyer_id else conv.buyer
+    notify(
+        other_user, "new_message",
+        product_name=conv.product.name, sender_name=msg.sender.name,
+    )
+
+
+def post_message(conv, sender, text: str, attachment=None):
+    msg = ProductMessage.objects.create(
+        conversation=conv, sender=sender, text=text, attachment=attachment
+    )
+    message_sent(conv, msg)
+    return msg
+
+
+def mark_read(conv, reader, up_to_id=None) -> bool:
+    """
+    Advance the reader's last-read pointer (never backwards) and emit a read
+    receipt. Without `up_to_id` everything currently in the thread is read.
+    """
+    if reader.id not in (conv.buyer_id, conv.seller_id):
+        return False
+
+    # Never past the newest message, or later ones would arrive already read.
+    latest_id = conv.messages.order_by("-id").values_list("id", flat=True).first()
+    if latest_id is None:
+        return False
+    up_to_id = latest_id if up_to_id is None else min(up_to_id, latest_id)
+
+    # Anything from the other side after the pointer is still unread. Counted
+    # inside the UPDATE so a message arriving meanwhile is not lost.
+    unread = (
+        ProductMessage.objects.filter(conversation=OuterRef("pk"), id__gt=up_to_id)
+        .exclude(sender_id=reader.id)
+        .order_by()
+        .values("conversation")
+        .annotate(n=Count("id"))
+        .values("n")
+    )
+
+    field = conv.last_read_field(reader)
+    updated = ProductConversation.objects.filter(
+        pk=conv.pk, **{f"{field}__lt": up_to_id}
+    ).update(**{
+        field: up_to_id,
+        conv.unread_count_field(reader): Coalesce(Subquery(unread), 0),
+    })
+    if not updated:
+        return False
+
+    setattr(conv, field, up_to_id)
+    publish(conv.id, {
+        "type": "read",
+        "conversation": conv.id,
+        "reader_id": reader.id,
+        "up_to_id": up_to_id,
+    })
+    return True
+
+
+# ============================================
+# LEGACY READ FLAGS
+# ============================================
+def seed_read_pointers(conversation_ids=None) -> int:
+    """
+    Carry the old ProductMessage.is_read flags into the read pointers: each
+    side's pointer becomes at least the newest message from the other side
+    that was flagged read. Pointers never move back, so reruns are harmless.
+    """
+    def newest_read_from(sender_field):
+        return Coalesce(
+            Subquery(
+                ProductMessage.objects.filter(
+                    conversation=OuterRef("pk"), sender_id=OuterRef(sender_field), is_read=True
+                )
+                .order_by()
+                .values("conversation")
+                .annotate(last=Max("id"))
+                .values("last")
+            ),
+            0,
+        )
+
+    convs = ProductConversation.objects.all()
+    if conversation_ids is not None:
+        convs = convs.filter(id__in=conversation_ids)
+    return convs.update(
+        buyer_last_read_id=Greatest("buyer_last_read_id", newest_read_from("seller_id")),
+        seller_last_read_id=Greatest("seller_last_read_id", newest_read_from("buyer_id")),
+    )
@@ -0,0 +1,66 @@
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+def apply_sqlite_pragmas(cursor, pragmas=None):
+    """
+    Run PRAGMA statements on a fresh SQLite connection. journal_mode is
+    stored in the database file; the rest are per-connection.
+    """
+    pragmas = settings.SQLITE_PRAGMAS if pragmas is None else pragmas
+    for name, value in pragmas.items():
+        cursor.execute(f"PRAGMA {name} = {value}")
+
+
+# ============================================
+# READ REPLICA
+# ============================================
+REPLICA_ALIAS = "replica"
+
+_replica_reads = ContextVar("replica_reads", default=False)
+
+
+def replica_configured() -> bool:
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def reading_from_replica() -> bool:
+    return _replica_reads.get()
+
+
+def _sticky_key(user_id):
+    return f"db:sticky:{user_id}"
+
+
+def mark_recent_write(user):
+    """
+    Pin the user's reads to the primary for REPLICA_STICKY_SECONDS, so they
+    see their own writes even if the replica lags.
+    """
+    if replica_configured() and user is not None and user.is_authenticated:
+        cache.set(_sticky_key(user.pk), 1, timeout=settings.REPLICA_STICKY_SECONDS)
+
+
+def has_recent_write(user) -> bool:
+    return user is not None and user.is_authenticated and bool(cache.get(_sticky_key(user.pk)))
+
+
+def read_from_replica(view):
+    """
+    Send the view's reads to the replica. Place it under @permission_classes
+    so request.user is the authenticated (JWT) user.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not replica_configured() or has_recent_write(getattr(request, "user", None)):
+            return view(request, *args, **kwargs)
+        token = _replica_reads.set(True)
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _replica_reads.reset(token)
+
+    return wrapper
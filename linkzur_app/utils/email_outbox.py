@@ -0,0 +1,110 @@
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from ..models import OutgoingEmail
+from .background import submit_after_commit
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+
+
+# ============================================
+# ENQUEUE
+# ============================================
+def enqueue_emails(messages):
+    """
+    Queue (to_email, subject, body) tuples with one INSERT and schedule a
+    send once the surrounding transaction commits.
+    """
+    rows = [
+        OutgoingEmail(to_email=to_email, subject=subject, body=body)
+        for to_email, subject, body in messages
+        if to_email
+    ]
+    if not rows:
+        return []
+
+    rows = OutgoingEmail.objects.bulk_create(rows)
+    submit_after_commit(dispatch_pending)
+    return rows
+
+
+def enqueue_email(to_email: str, subject: str, body: str):
+    return enqueue_emails([(to_email, subject, body)])
+
+
+# ============================================
+# DISPATCH
+# ============================================
+def release(queryset, error=None):
+    """
+    Put claimed rows back in the queue, or mark them failed once they have
+    used up MAX_ATTEMPTS.
+    """
+    fields = {"last_error": error} if error is not None else {}
+    return queryset.update(
+        status=Case(When(attempts__gte=MAX_ATTEMPTS, then=Value("failed")), default=Value("pending")),
+        **fields,
+    )
+
+
+def dispatch_pending(batch_size: int = 100) -> int:
+    """
+    Send queued emails over a single SMTP connection.
+    Returns the number sent. Failed rows are retried up to MAX_ATTEMPTS.
+    """
+    # Claim the batch first so concurrent dispatchers never send a row twice.
+    with transaction.atomic():
+        ids = list(
+            OutgoingEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status="pending", attempts__lt=MAX_ATTEMPTS)
+            .order_by("created_at")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        claimed = OutgoingEmail.objects.filter(id__in=ids, status="pending").update(
+            status="sending", attempts=F("attempts") + 1, claimed_at=timezone.now()
+        )
+    if not claimed:
+        return 0
+
+    batch = list(OutgoingEmail.objects.filter(id__in=ids, status="sending"))
+
+    sent = 0
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as e:
+        logger.error(f"❌ Could not open email connection: {e}")
+        release(OutgoingEmail.objects.filter(id__in=ids, status="sending"), str(e))
+        return 0
+
+    try:
+        for email in batch:
+            message = EmailMessage(
+                email.subject,
+                email.body,
+                settings.DEFAULT_FROM_EMAIL,
+                [email.to_email],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as e:
+                logger.error(f"❌ Failed to send '{email.subject}' to {email.to_email}: {e}")
+                release(OutgoingEmail.objects.filter(id=email.id), str(e))
+                continue
+
+            OutgoingEmail.objects.filter(id=email.id).update(status="sent", sent_at=timezone.now())
+            logger.info(f"📧 Sent '{email.subject}' to {email.to_email}")
+            sent += 1
+    finally:
+        connection.close()
+
+    return sent
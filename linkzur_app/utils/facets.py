@@ -0,0 +1,202 @@
+import hashlib
+import json
+from collections import Counter
+from decimal import Decimal, InvalidOperation
+
+from django.core.cache import cache
+from django.db.models import Case, Count, IntegerField, Min, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
+
+from ..models import CATEGORIES, Product, ProductVariant
+from .shared_cache import cache_is_shared
+
+FACETS_TTL_SECONDS = 10 * 60
+MAX_BRANDS = 50
+
+# (key, lower bound inclusive, upper bound exclusive) on the lowest variant price.
+PRICE_BUCKETS = [
+    ("0-500", 0, 500),
+    ("500-1000", 500, 1000),
+    ("1000-5000", 1000, 5000),
+    ("5000-20000", 5000, 20000),
+    ("20000+", 20000, None),
+]
+NO_PRICE = "none"
+
+CATEGORY_LABELS = dict(CATEGORIES)
+
+
+def catalog_search_q(search):
+    """
+    The free-text filter behind list_products' ?search=.
+    """
+    return (
+        Q(name__icontains=search)
+        | Q(description__icontains=search)
+        | Q(brand__icontains=search)
+        | Q(ref_no__icontains=search)
+    )
+
+
+# ============================================
+# CACHE VERSION
+# ============================================
+# Bumped on any product/variant change; every cached facet set carries the
+# version it was built at, so one increment retires them all. The bump only
+# reaches other workers through a shared cache, so facets are not cached on
+# a per-process backend.
+_VERSION_KEY = "facets:version"
+
+
+def catalog_version() -> int:
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        cache.add(_VERSION_KEY, 1, timeout=None)
+        version = cache.get(_VERSION_KEY, 1)
+    return version
+
+
+def bump_catalog_version():
+    try:
+        cache.incr(_VERSION_KEY)
+    except ValueError:
+        cache.add(_VERSION_KEY, 1, timeout=None)
+
+
+# ============================================
+# FACETS
+# ============================================
+def _decimal(value):
+    try:
+        return Decimal(value) if value not in (None, "") else None
+    except InvalidOperation:
+        return None
+
+
+def _normalize(params, seller_id):
+    return {
+        "category": (params.get("category") or "").strip().lower(),
+        "brand": (params.get("brand") or "").strip().lower(),
+        "min_price": _decimal(params.get("min_price")),
+        "max_price": _decimal(params.get("max_price")),
+        "search": (params.get("search") or "").strip(),
+        "seller": seller_id,
+    }
+
+
+def _per_product(field, expression):
+    """
+    Correlated subquery: `expression` evaluated over the product's lowest
+    variant price (aliased min_price), once per product row.
+    """
+    return Subquery(
+        ProductVariant.objects.filter(product=OuterRef("pk"))
+        .order_by()
+        .values("product")
+        .annotate(min_price=Min("price"))
+        .annotate(**{field: expression})
+        .values(field)
+    )
+
+
+def _grouped_rows(f):
+    """
+    One GROUP BY (category, brand, price bucket) over the products matching
+    the filters every facet shares (search, seller). `total` ignores the
+    price range, `in_price` applies it.
+    """
+    qs = Product.objects.all()
+    if f["seller"]:
+        qs = qs.filter(seller_id=f["seller"])
+    if f["search"]:
+        qs = qs.filter(catalog_search_q(f["search"]))
+
+    bucket = Case(
+        *[
+            When(Q(min_price__gte=low) & (Q(min_price__lt=high) if high is not None else Q()), then=Value(key))
+            for key, low, high in PRICE_BUCKETS
+        ],
+        default=Value(NO_PRICE),
+    )
+    qs = qs.annotate(price_bucket=Coalesce(_per_product("bucket", bucket), Value(NO_PRICE)))
+
+    in_range = Q()
+    if f["min_price"] is not None:
+        in_range &= Q(min_price__gte=f["min_price"])
+    if f["max_price"] is not None:
+        in_range &= Q(min_price__lte=f["max_price"])
+
+    if in_range:
+        flag = Case(When(in_range, then=Value(1)), default=Value(0), output_field=IntegerField())
+        qs = qs.annotate(in_price_flag=Coalesce(_per_product("flag", flag), Value(0)))
+        in_price = Sum("in_price_flag")
+    else:
+        in_price = Count("id")
+
+    return (
+        qs.values("category", "brand", "price_bucket")
+        .annotate(total=Count("id"), in_price=in_price)
+        .order_by()
+    )
+
+
+def _compute(f):
+    rows = list(_grouped_rows(f))
+
+    categories, brands, prices = Counter(), Counter(), Counter()
+    brand_names = {}
+    matching = 0
+
+    for row in rows:
+        category = row["category"]
+        brand_key = (row["brand"] or "").strip().lower()
+        brand_names.setdefault(brand_key, row["brand"])
+
+        category_ok = not f["category"] or category.lower() == f["category"]
+        brand_ok = not f["brand"] or brand_key == f["brand"]
+
+        # Each facet counts under every filter except its own, so the
+        # alternatives stay visible once a value is picked.
+        if brand_ok:
+            categories[category] += row["in_price"]
+        if category_ok:
+            brands[brand_key] += row["in_price"]
+        if category_ok and brand_ok:
+            prices[row["price_bucket"]] += row["total"]
+            matching += row["in_price"]
+
+    return {
+        "total": matching,
+        "category": [
+            {"value": value, "label": CATEGORY_LABELS.get(value, value), "count": categories.get(value, 0)}
+            for value, _ in CATEGORIES
+            if categories.get(value)
+        ],
+        "brand": [
+            {"value": brand_names[key], "count": count}
+            for key, count in sorted(brands.items(), key=lambda kv: (-kv[1], kv[0]))[:MAX_BRANDS]
+            if count and key
+        ],
+        "price": [
+            {"key": key, "min": low, "max": high, "count": prices.get(key, 0)}
+            for key, low, high in PRICE_BUCKETS
+        ],
+    }
+
+
+def product_facets(params, seller_id=None):
+    """
+    Category, brand and price-bucket counts for list_products' filters,
+    cached per filter set until the catalog changes.
+    """
+    f = _normalize(params, seller_id)
+    if not cache_is_shared():
+        return _compute(f)
+    signature = json.dumps(f, sort_keys=True, default=str)
+    key = f"facets:{catalog_version()}:{hashlib.sha1(signature.encode()).hexdigest()}"
+
+    result = cache.get(key)
+    if result is None:
+        result = _compute(f)
+        cache.set(key, result, FACETS_TTL_SECONDS)
+    return result
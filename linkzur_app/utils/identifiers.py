@@ -0,0 +1,101 @@
+import re
+
+from django.db.models import Q
+
+CAS_RE = re.compile(r"^(\d{2,7})-(\d{2})-(\d)$")
+CAS_DIGITS_RE = re.compile(r"^\d{5,10}$")
+# What a partly typed CAS number looks like ("67-6", "67-64-").
+CAS_PARTIAL_RE = re.compile(r"^\d{2,7}-\d{0,2}(-\d?)?$")
+HSN_RE = re.compile(r"^\d{2,8}$")
+
+
+# ============================================
+# CAS REGISTRY NUMBERS
+# ============================================
+def cas_check_digit(body: str) -> int:
+    """
+    Check digit for the digits before it: each digit times its position
+    counted from the right, summed, mod 10.
+    """
+    return sum(i * int(d) for i, d in enumerate(reversed(body), start=1)) % 10
+
+
+def normalize_cas(value) -> str:
+    """
+    Canonical "NNNNNNN-NN-N" form (no leading zeros, dashes restored for
+    bare digits). Raises ValueError if malformed or the check digit is wrong.
+    """
+    raw = re.sub(r"\s+", "", str(value or ""))
+    if CAS_DIGITS_RE.match(raw):
+        raw = f"{raw[:-3]}-{raw[-3:-1]}-{raw[-1]}"
+
+    match = CAS_RE.match(raw)
+    if not match:
+        raise ValueError("CAS number must look like 67-64-1.")
+
+    first, second, check = match.groups()
+    first = first.lstrip("0")
+    if len(first) < 2:
+        raise ValueError("CAS number must look like 67-64-1.")
+    if cas_check_digit(first + second) != int(check):
+        raise ValueError("Invalid CAS number: check digit does not match.")
+    return f"{first}-{second}-{check}"
+
+
+def try_normalize_cas(value):
+    try:
+        return normalize_cas(value)
+    except ValueError:
+        return None
+
+
+# ============================================
+# HSN CODES
+# ============================================
+def normalize_hsn(value) -> str:
+    """
+    Digits only ("2901.10 00" → "29011000"): 2 (chapter) to 8 (tariff line)
+    digits. Raises ValueError otherwise.
+    """
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)  # Excel numeric cells
+    digits = re.sub(r"[\s.]", "", str(value or ""))
+    if not HSN_RE.match(digits):
+        raise ValueError("HSN code must be 2 to 8 digits.")
+    return digits
+
+
+def hsn_prefix_q(prefix):
+    # LIKE 'prefix%'; on Postgres the varchar_pattern_ops index on hsn
+    # serves it under any collation (see Product.Meta).
+    return Q(hsn__startswith=prefix)
+
+
+def cas_prefix_q(prefix):
+    return Q(cas_no__startswith=prefix)
+
+
+def identifier_q(query):
+    """
+    Indexed lookups for a search query that looks like an identifier: the
+    exact CAS number (dashed or bare digits), an HSN prefix, or a partly
+    typed CAS number. None for ordinary text.
+    """
+    query = query.strip()
+    compact = re.sub(r"[\s.]", "", query)
+    lookups = []
+
+    cas_no = try_normalize_cas(query)
+    if cas_no:
+        lookups.append(Q(cas_no=cas_no))
+    if HSN_RE.match(compact):
+        lookups.append(hsn_prefix_q(compact))
+    elif not cas_no and CAS_PARTIAL_RE.match(query):
+        lookups.append(cas_prefix_q(query))
+
+    if not lookups:
+        return None
+    q = lookups[0]
+    for lookup in lookups[1:]:
+        q |= lookup
+    return q
@@ -0,0 +1,169 @@
+import logging
+import os
+import posixpath
+import uuid
+import zipfile
+from io import BytesIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, UnidentifiedImageError
+
+from ..models import ImageImportJob, Product
+from .background import submit_after_commit
+from .images import flatten
+from .notifications import notify
+
+logger = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp"}
+MAX_ENTRY_SIZE = 25 * 1024 * 1024  # uncompressed bytes per image
+MAX_EDGE = 2000
+PROGRESS_EVERY = 25
+
+
+def import_dir() -> Path:
+    return Path(settings.CHUNKED_UPLOAD_DIR) / "imports"
+
+
+# ============================================
+# ENQUEUE
+# ============================================
+def create_job(seller, uploaded_file):
+    """
+    Copy the uploaded archive (already on disk for large uploads) next to
+    other temp uploads and queue processing.
+    """
+    os.makedirs(import_dir(), exist_ok=True)
+    path = import_dir() / f"{uuid.uuid4().hex}.zip"
+    with open(path, "wb") as out:
+        for chunk in uploaded_file.chunks():
+            out.write(chunk)
+
+    if not zipfile.is_zipfile(path):
+        os.remove(path)
+        raise ValueError("Uploaded file is not a ZIP archive.")
+
+    job = ImageImportJob.objects.create(
+        seller=seller,
+        archive_path=str(path),
+        original_name=os.path.basename(uploaded_file.name or ""),
+    )
+    submit_after_commit(run_job, job.id)
+    return job
+
+
+# ============================================
+# PROCESSING
+# ============================================
+def _ref_no_for(entry_name):
+    base = posixpath.basename(entry_name)
+    stem, ext = posixpath.splitext(base)
+    return stem.strip(), ext.lower()
+
+
+def _downscale(data):
+    with Image.open(BytesIO(data)) as img:
+        img = flatten(img)
+        img.thumbnail((MAX_EDGE, MAX_EDGE), Image.LANCZOS)
+        buf = BytesIO()
+        img.save(buf, "JPEG", quality=88, optimize=True)
+        return buf.getvalue()
+
+
+def _process_entry(zf, info, products):
+    ref_no, ext = _ref_no_for(info.filename)
+    row = {"file": info.filename, "ref_no": ref_no}
+
+    product = products.get(ref_no.lower())
+    if product is None:
+        return {**row, "status": "error", "error": "No product with this ref_no"}
+    if info.file_size > MAX_ENTRY_SIZE:
+        return {**row, "status": "error", "error": "Image is larger than 25 MB"}
+
+    # One entry in memory at a time; the archive itself is never extracted.
+    with zf.open(info) as fh:
+        data = fh.read(MAX_ENTRY_SIZE + 1)
+    if len(data) > MAX_ENTRY_SIZE:
+        return {**row, "status": "error", "error": "Image is larger than 25 MB"}
+
+    try:
+        jpeg = _downscale(data)
+    except UnidentifiedImageError:
+        return {**row, "status": "error", "error": "Not a readable image"}
+    except (Image.DecompressionBombError, OSError) as e:
+        return {**row, "status": "error", "error": f"Could not process image: {e}"}
+
+    product.image.save(f"{product.ref_no}.jpg", ContentFile(jpeg), save=False)
+    # post_save queues the rendition pipeline for the new image.
+    product.save(update_fields=["image", "updated_at"])
+    return {**row, "status": "attached", "product_id": product.id}
+
+
+def run_job(job_id):
+    claimed = ImageImportJob.objects.filter(pk=job_id, status="pending").update(status="running")
+    if not claimed:
+        return
+    job = ImageImportJob.objects.select_related("seller").get(pk=job_id)
+
+    products = {
+        p.ref_no.strip().lower(): p
+        for p in Product.objects.filter(seller=job.seller).only("id", "ref_no", "image", "image_renditions")
+    }
+
+    report = []
+    try:
+        with zipfile.ZipFile(job.archive_path) as zf:
+            entries = [
+                info for info in zf.infolist()
+                if not info.is_dir()
+                and not info.filename.startswith("__MACOSX/")
+                and not posixpath.basename(info.filename).startswith(".")
+            ]
+            job.total_entries = len(entries)
+            job.save(update_fields=["total_entries"])
+
+            for info in entries:
+                ref_no, ext = _ref_no_for(info.filename)
+                if ext not in IMAGE_EXTENSIONS:
+                    row = {"file": info.filename, "ref_no": ref_no, "status": "skipped",
+                           "error": "Not an image file"}
+                else:
+                    try:
+                        row = _process_entry(zf, info, products)
+                    except Exception as e:
+                        logger.error(f"❌ Image import {job.id} failed on {info.filename}: {e}")
+                        row = {"file": info.filename, "ref_no": ref_no, "status": "error", "error": str(e)}
+
+                report.append(row)
+                job.processed_entries += 1
+                if row["status"] == "attached":
+                    job.attached_count += 1
+                elif row["status"] == "error":
+                    job.failed_count += 1
+
+                if job.processed_entries % PROGRESS_EVERY == 0:
+                    job.report = report
+                    job.save(update_fields=["processed_entries", "attached_count", "failed_count", "report"])
+
+        job.status = "done"
+    except (zipfile.BadZipFile, OSError) as e:
+        job.status = "failed"
+        job.error = str(e)
+
+    job.report = report
+    job.finished_at = timezone.now()
+    job.save()
+
+    try:
+        os.remove(job.archive_path)
+    except OSError:
+        pass
+
+    notify(
+        job.seller, "image_import_done",
+        job_id=job.id, attached=job.attached_count, failed=job.failed_count,
+    )
+    logger.info(f"🖼️ Image import {job.id}: {job.attached_count} attached, {job.failed_count} failed")
@@ -0,0 +1,136 @@
+import hashlib
+import logging
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from ..models import Product
+from .background import submit_after_commit
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# RENDITIONS
+# ============================================
+# name → longest edge in pixels. Images are never upscaled.
+RENDITIONS = {
+    "thumb": 160,
+    "card": 480,
+    "detail": 1200,
+}
+
+# extension → (Pillow format, save options)
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+RENDITION_DIR = "product_images/renditions"
+
+
+def flatten(img):
+    """
+    Apply EXIF orientation, then drop alpha onto white so both formats
+    render the same. Pillow writes no EXIF/ICC/XMP unless asked to.
+    """
+    img = ImageOps.exif_transpose(img)
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        img = img.convert("RGBA")
+        background = Image.new("RGB", img.size, (255, 255, 255))
+        background.paste(img, mask=img.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def _encode(img, ext):
+    fmt, options = FORMATS[ext]
+    buf = BytesIO()
+    img.save(buf, fmt, **options)
+    return buf.getvalue()
+
+
+def _store(product_id, rendition, ext, data):
+    # Content-hashed names never change, so media serves them as immutable.
+    digest = hashlib.sha256(data).hexdigest()[:20]
+    name = f"{RENDITION_DIR}/{product_id}/{rendition}-{digest}.{ext}"
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(data))
+    return name
+
+
+def build_renditions(product_id, source):
+    """
+    Render every size/format of an opened image. Returns the map stored in
+    Product.image_renditions (minus "source").
+    """
+    base = flatten(source)
+    result = {}
+    for rendition, edge in RENDITIONS.items():
+        img = base.copy()
+        img.thumbnail((edge, edge), Image.LANCZOS)
+        entry = {"width": img.width, "height": img.height}
+        for ext in FORMATS:
+            entry[ext] = _store(product_id, rendition, ext, _encode(img, ext))
+        result[rendition] = entry
+    return result
+
+
+def _rendition_files(renditions):
+    return {
+        entry[ext]
+        for name, entry in (renditions or {}).items()
+        if name in RENDITIONS
+        for ext in FORMATS
+        if entry.get(ext)
+    }
+
+
+# ============================================
+# PRODUCT PIPELINE
+# ============================================
+def needs_renditions(product) -> bool:
+    current = product.image.name if product.image else ""
+    return (product.image_renditions or {}).get("source", "") != current
+
+
+def process_product_image(product_id):
+    """
+    (Re)build renditions for a product's current image. Safe to run twice
+    and safe to race an image change: the result is only stored if the
+    image is still the one that was processed.
+    """
+    product = Product.objects.filter(pk=product_id).only("id", "image", "image_renditions").first()
+    if product is None:
+        return
+
+    old_files = _rendition_files(product.image_renditions)
+    source_name = product.image.name if product.image else ""
+
+    if not source_name:
+        renditions = {}
+    else:
+        try:
+            with product.image.open("rb") as fh, Image.open(fh) as img:
+                renditions = {"source": source_name, **build_renditions(product.id, img)}
+        except (FileNotFoundError, UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+            logger.error(f"❌ Could not process image for product {product.id}: {e}")
+            return
+
+    updated = Product.objects.filter(pk=product.id, image=source_name).update(image_renditions=renditions)
+    if not updated:
+        return
+
+    for name in old_files - _rendition_files(renditions):
+        try:
+            default_storage.delete(name)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not delete old rendition {name}: {e}")
+
+    logger.info(f"🖼️ Renditions ready for product {product.id}")
+
+
+def schedule_renditions(product):
+    submit_after_commit(process_product_image, product.pk)
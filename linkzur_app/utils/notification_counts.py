@@ -0,0 +1,59 @@
+from collections import Counter
+
+from django.core.cache import cache
+from django.db import transaction
+
+from ..models import Notification
+from .shared_cache import cache_is_shared
+
+# The cached value is maintained incrementally; the TTL bounds any drift
+# from races between a recount and a concurrent increment.
+UNREAD_TTL_SECONDS = 60 * 60
+
+
+def _key(user_id) -> str:
+    return f"notifications:unread:{user_id}"
+
+
+def get_unread_count(user_id) -> int:
+    # Only the worker handling a write adjusts the counter, so a per-process
+    # cache would serve other workers stale badges; count directly instead
+    # (an indexed COUNT on user + is_read).
+    if not cache_is_shared():
+        return Notification.objects.filter(user_id=user_id, is_read=False).count()
+    count = cache.get(_key(user_id))
+    if count is None:
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        cache.set(_key(user_id), count, UNREAD_TTL_SECONDS)
+    return count
+
+
+def adjust_unread_count(user_id, delta: int):
+    """
+    Apply delta to a cached counter. A missing key is left alone and
+    recounted on the next read.
+    """
+    if not delta or not cache_is_shared():
+        return
+    try:
+        if delta > 0:
+            cache.incr(_key(user_id), delta)
+        else:
+            cache.decr(_key(user_id), -delta)
+    except ValueError:
+        pass
+
+
+def count_created(notifications):
+    """
+    Increment unread counters for newly saved notifications after commit.
+    """
+    per_user = Counter(n.user_id for n in notifications if not n.is_read)
+    if not per_user:
+        return
+
+    def _apply():
+        for user_id, delta in per_user.items():
+            adjust_unread_count(user_id, delta)
+
+    transaction.on_commit(_apply)
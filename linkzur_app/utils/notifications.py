@@ -0,0 +1,215 @@
+import contextvars
+import logging
+from dataclasses import dataclass, field
+
+from django.db import connection, transaction
+
+from ..models import Notification, NotificationPreference
+from .email_outbox import enqueue_emails
+from .notification_counts import count_created
+from .realtime import publish_notifications
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# TEMPLATES
+# ============================================
+# "message" feeds the in-app inbox, "email" the outgoing email queue.
+# "required" kinds ignore user preferences (e.g. delivery OTPs).
+TEMPLATES = {
+    "new_order": {
+        "message": "You received a new order #{order_id}.",
+        "email": (
+            "New Order Received – Order #{order_id}",
+            "Hello Seller,\n\n"
+            "You have received a new order containing your products.\n"
+            "Order ID: #{order_id}\n"
+            "Buyer: {buyer_email}\n\n"
+            "Please review and process the order.\n\n"
+            "- Linkzur Team",
+        ),
+    },
+    "order_placed": {
+        "message": "Your order #{order_id} has been placed successfully!",
+        "email": (
+            "Order #{order_id} Confirmed – Linkzur",
+            "Hello,\n\n"
+            "Your order #{order_id} has been successfully placed.\n"
+            "Total Amount: ₹{total_price}\n"
+            "Status: {status}\n\n"
+            "Thank you for shopping with Linkzur!\n\n"
+            "Regards,\n"
+            "Linkzur Team",
+        ),
+    },
+    "item_purchased": {
+        "message": "Buyer {buyer_name} purchased {quantity} x {product_name}",
+    },
+    "order_status_changed": {
+        "message": "Your order #{order_id} status updated to '{status}'.",
+    },
+    "order_status_changed_seller": {
+        "message": "Order #{order_id} status updated to '{status}'.",
+    },
+    "order_status_digest": {
+        "email": (
+            "Order {order_refs} Status Updated",
+            "Hello,\n\n"
+            "The status of your order(s) {order_refs} has been updated.\n"
+            "New Status: {status}\n\n"
+            "Thank you for shopping with Linkzur!\n\n"
+            "- Linkzur Team",
+        ),
+    },
+    "delivery_otp_sent": {
+        "message": "Your order #{order_id} is marked delivered. OTP sent.",
+    },
+    "delivery_otp_sent_seller": {
+        "message": "OTP sent to buyer for order #{order_id}.",
+    },
+    "delivery_otp": {
+        "required": True,
+        "email": (
+            "Linkzur – Delivery Confirmation OTP",
+            "Hello,\n\n"
+            "Your delivery confirmation OTP(s) for your Linkzur order(s):\n"
+            "{otp_lines}"
+            "Each OTP is valid for 1 hour.\n\n"
+            "Share these codes only with the delivery agent.\n\n"
+            "If you did not expect a delivery, please contact Linkzur support immediately.\n\n"
+            "Best regards,\n"
+            "Linkzur Team",
+        ),
+    },
+    "order_completed": {
+        "message": "Your order #{order_id} has been successfully delivered!",
+    },
+    "invoice_uploaded": {
+        "message": "Invoice uploaded for Order #{order_id}",
+    },
+    "new_review": {
+        "message": "New review for {product_name} ({variant_label})",
+    },
+    "quotation_requested": {
+        "message": "Buyer {buyer_name} requested a quotation for {product_name}{variant_text} (Qty: {quantity}).",
+    },
+    "quotation_uploaded": {
+        "message": "Seller {seller_name} uploaded a quotation for {product_name}.",
+    },
+    "conversation_started": {
+        "message": "New conversation started on {product_name} by {buyer_name}.",
+    },
+    "new_message": {
+        "message": "New message on {product_name} from {sender_name}.",
+    },
+    "image_import_done": {
+        "message": "Image import #{job_id} finished: {attached} attached, {failed} failed.",
+    },
+}
+
+
+@dataclass
+class _Pending:
+    user: object
+    kind: str
+    context: dict = field(default_factory=dict)
+
+
+# Set by NotificationBatchMiddleware for the duration of a request.
+_batch = contextvars.ContextVar("notification_batch", default=None)
+
+
+# ============================================
+# PUBLIC API
+# ============================================
+def notify(user, kind: str, **context):
+    """
+    Queue a templated notification for `user`.
+
+    Nothing is written until the surrounding transaction commits (so rolled
+    back work never notifies) and, inside a request, until the request ends,
+    when everything queued is flushed with one bulk_create.
+    """
+    if kind not in TEMPLATES:
+        raise ValueError(f"Unknown notification kind '{kind}'")
+
+    pending = _Pending(user=user, kind=kind, context=context)
+    if connection.in_atomic_block:
+        transaction.on_commit(lambda: _enqueue(pending))
+    else:
+        _enqueue(pending)
+
+
+def begin_batch():
+    return _batch.set([])
+
+
+def end_batch(token):
+    pending = _batch.get()
+    _batch.reset(token)
+    if pending:
+        flush(pending)
+
+
+# ============================================
+# FLUSH
+# ============================================
+def _enqueue(pending):
+    batch = _batch.get()
+    if batch is None:
+        flush([pending])
+    else:
+        batch.append(pending)
+
+
+def _preferences_for(user_ids):
+    return {
+        p.user_id: p
+        for p in NotificationPreference.objects.filter(user_id__in=user_ids)
+    }
+
+
+def _allowed(pref, kind, channel):
+    template = TEMPLATES[kind]
+    if template.get("required") or pref is None:
+        return True
+    if kind in pref.muted_kinds:
+        return False
+    return pref.in_app_enabled if channel == "in_app" else pref.email_enabled
+
+
+def flush(pending):
+    """
+    Write queued notifications: one INSERT for in-app rows, one for emails.
+    """
+    prefs = _preferences_for({p.user.pk for p in pending})
+    notifications = []
+    emails = []
+
+    for p in pending:
+        template = TEMPLATES[p.kind]
+        pref = prefs.get(p.user.pk)
+        try:
+            if "message" in template and _allowed(pref, p.kind, "in_app"):
+                notifications.append(Notification(
+                    user_id=p.user.pk,
+                    kind=p.kind,
+                    message=template["message"].format(**p.context),
+                ))
+            if "email" in template and _allowed(pref, p.kind, "email"):
+                subject, body = template["email"]
+                emails.append((
+                    p.user.email,
+                    subject.format(**p.context),
+                    body.format(**p.context),
+                ))
+        except KeyError as e:
+            logger.error(f"❌ Notification '{p.kind}' missing context value {e}")
+
+    if notifications:
+        saved = Notification.objects.bulk_create(notifications)
+        count_created(saved)
+        publish_notifications(saved)
+    if emails:
+        enqueue_emails(emails)
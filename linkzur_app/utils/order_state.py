@@ -0,0 +1,270 @@
+import logging
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Q, When, Value
+
+from ..models import Order, OrderItem, OrderEvent
+from .otp_utils import generate_otp
+from .notifications import notify
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# ALLOWED TRANSITIONS
+# ============================================
+# Every status in Order.STATUS_CHOICES maps to the statuses it may move to.
+# "completed" is only reached through delivery OTP verification.
+TRANSITIONS = {
+    "pending": {"processing", "shipped", "cancelled"},
+    "processing": {"shipped", "delivered", "cancelled"},
+    "shipped": {"delivered", "cancelled"},
+    "delivered": {"completed"},
+    "completed": set(),
+    "cancelled": set(),
+}
+
+SELLER_SETTABLE = {"processing", "shipped", "delivered", "cancelled"}
+
+if set(TRANSITIONS) != {choice[0] for choice in Order.STATUS_CHOICES}:
+    raise RuntimeError("order_state.TRANSITIONS is out of sync with Order.STATUS_CHOICES")
+
+
+class InvalidTransition(Exception):
+    pass
+
+
+def can_transition(current: str, new: str) -> bool:
+    return new in TRANSITIONS.get(current, set())
+
+
+def seller_orders_q(user):
+    """
+    Filter for orders sold by `user`. Orders placed before Order.seller
+    existed (NULL until backfill_order_sellers runs) match through their items.
+    """
+    legacy = OrderItem.objects.filter(product__seller=user).values("order_id")
+    return Q(seller=user) | Q(seller__isnull=True, pk__in=legacy)
+
+
+def is_order_seller(user, order) -> bool:
+    """
+    Seller authorization for an already loaded order. Orders placed before
+    Order.seller existed fall back to an indexed EXISTS over their items.
+    """
+    if order.seller_id is not None:
+        return order.seller_id == user.id
+    return OrderItem.objects.filter(order_id=order.pk, product__seller=user).exists()
+
+
+# ============================================
+# SIDE-EFFECT HOOKS
+# ============================================
+# Hooks run after the transition commits and receive every order that
+# entered the status in that call, so bulk transitions batch their effects.
+_hooks = defaultdict(list)
+
+
+def on_enter(*statuses):
+    def register(fn):
+        for s in statuses:
+            _hooks[s].append(fn)
+        return fn
+    return register
+
+
+def _entry_fields(new_status: str) -> dict:
+    """
+    Extra columns written together with the status change.
+    """
+    if new_status == "delivered":
+        return {"delivery_otp": generate_otp(), "is_delivered_verified": False}
+    if new_status == "completed":
+        return {"delivery_otp": None, "is_delivered_verified": True}
+    return {}
+
+
+# Events written alongside a transition, in addition to "status_changed".
+_EXTRA_EVENTS = {
+    "delivered": "otp_sent",
+    "completed": "otp_verified",
+}
+
+
+def _transition_events(order, previous, new_status, actor):
+    events = [OrderEvent(
+        order_id=order.pk,
+        event_type="status_changed",
+        from_status=previous,
+        to_status=new_status,
+        actor=actor,
+    )]
+    extra = _EXTRA_EVENTS.get(new_status)
+    if extra:
+        events.append(OrderEvent(
+            order_id=order.pk,
+            event_type=extra,
+            to_status=new_status,
+            actor=actor,
+        ))
+    return events
+
+
+def record_event(order, event_type: str, actor=None, note: str = ""):
+    """
+    Append a non-transition event (order placed, invoice uploaded, ...).
+    """
+    return OrderEvent.objects.create(
+        order_id=order.pk,
+        event_type=event_type,
+        to_status=order.status,
+        actor=actor,
+        note=note,
+    )
+
+
+def _run_hooks(new_status, orders, actor):
+    for hook in _hooks[new_status]:
+        try:
+            hook(orders, actor)
+        except Exception as e:
+            logger.error(f"❌ Order hook {hook.__name__} failed for '{new_status}': {e}")
+
+
+# ============================================
+# TRANSITIONS
+# ============================================
+def transition(order, new_status: str, actor=None):
+    """
+    Move a single order to `new_status`.
+
+    The UPDATE is conditional on the status read earlier, so two concurrent
+    requests cannot both apply a transition from the same state.
+    Raises InvalidTransition if the move is not allowed.
+    """
+    previous = order.status
+    if not can_transition(previous, new_status):
+        raise InvalidTransition(
+            f"Cannot change order #{order.id} from '{previous}' to '{new_status}'."
+        )
+
+    fields = _entry_fields(new_status)
+
+    with transaction.atomic():
+        updated = Order.objects.filter(pk=order.pk, status=previous).update(
+            status=new_status, **fields
+        )
+        if not updated:
+            raise InvalidTransition(f"Order #{order.id} was updated by another request.")
+
+        OrderEvent.objects.bulk_create(_transition_events(order, previous, new_status, actor))
+
+        order.status = new_status
+        for name, value in fields.items():
+            setattr(order, name, value)
+
+        transaction.on_commit(lambda: _run_hooks(new_status, [order], actor))
+
+    return order
+
+
+def transition_many(orders, new_status: str, actor=None):
+    """
+    Move many orders to `new_status` with a single UPDATE.
+
+    `orders` is a queryset already restricted to what the actor may change.
+    Returns (transitioned_orders, failures) where failures maps order id to
+    an error message.
+    """
+    failures = {}
+
+    with transaction.atomic():
+        locked = list(
+            orders.select_related("buyer", "seller").select_for_update(of=("self",))
+        )
+
+        eligible = []
+        for order in locked:
+            if can_transition(order.status, new_status):
+                eligible.append(order)
+            else:
+                failures[order.id] = f"Cannot change from '{order.status}' to '{new_status}'."
+
+        if not eligible:
+            return [], failures
+
+        # Per-order values (e.g. a distinct delivery OTP each) go through CASE
+        # so the whole batch is still one statement.
+        per_order = {o.id: _entry_fields(new_status) for o in eligible}
+        columns = {name for fields in per_order.values() for name in fields}
+        updates = {
+            name: Case(
+                *[When(pk=oid, then=Value(fields[name])) for oid, fields in per_order.items()],
+                output_field=Order._meta.get_field(name),
+            )
+            for name in columns
+        }
+        Order.objects.filter(pk__in=per_order).update(status=new_status, **updates)
+
+        OrderEvent.objects.bulk_create([
+            event
+            for order in eligible
+            for event in _transition_events(order, order.status, new_status, actor)
+        ])
+
+        for order in eligible:
+            order.status = new_status
+            for name, value in per_order[order.id].items():
+                setattr(order, name, value)
+
+        transaction.on_commit(lambda: _run_hooks(new_status, eligible, actor))
+
+    return eligible, failures
+
+
+# ============================================
+# DEFAULT HOOKS
+# ============================================
+def _group_by_buyer(orders):
+    grouped = defaultdict(list)
+    for order in orders:
+        grouped[order.buyer].append(order)
+    return grouped
+
+
+def _order_refs(orders):
+    return ", ".join(f"#{o.id}" for o in orders)
+
+
+@on_enter("processing", "shipped", "cancelled")
+def _notify_status_change(orders, actor):
+    for order in orders:
+        notify(order.buyer, "order_status_changed", order_id=order.id, status=order.status)
+        if order.seller_id:
+            notify(order.seller, "order_status_changed_seller", order_id=order.id, status=order.status)
+
+    # One email per buyer, however many of their orders moved.
+    for buyer, buyer_orders in _group_by_buyer(orders).items():
+        notify(
+            buyer, "order_status_digest",
+            order_refs=_order_refs(buyer_orders), status=buyer_orders[0].status,
+        )
+
+
+@on_enter("delivered")
+def _send_delivery_otp(orders, actor):
+    for order in orders:
+        notify(order.buyer, "delivery_otp_sent", order_id=order.id)
+        if order.seller_id:
+            notify(order.seller, "delivery_otp_sent_seller", order_id=order.id)
+
+    for buyer, buyer_orders in _group_by_buyer(orders).items():
+        otp_lines = "".join(f"Order #{o.id}: {o.delivery_otp}\n" for o in buyer_orders)
+        notify(buyer, "delivery_otp", otp_lines=otp_lines)
+
+
+@on_enter("completed")
+def _notify_completed(orders, actor):
+    for order in orders:
+        notify(order.buyer, "order_completed", order_id=order.id)
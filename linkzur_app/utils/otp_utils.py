@@ -163,121 +163,3 @@ def send_password_reset_email(email: str, code: str) -> bool:
     except Exception as e:
         logger.error(f"❌ Could not send reset email: {e}")
         return False
-
-
-def send_delivery_otp_email(email: str, otp: str) -> bool:
-    """
-    Sends a delivery confirmation OTP to the buyer.
-    OTP will be used by the seller to verify delivery.
-    Valid for 1 hour.
-    """
-    subject = "Linkzur – Delivery Confirmation OTP"
-
-    message = (
-        f"Hello,\n\n"
-        f"Your delivery confirmation OTP for your Linkzur order is: {otp}\n"
-        f"This OTP is valid for 1 hour.\n\n"
-        f"Share this code only with the delivery agent.\n\n"
-        f"If you did not expect a delivery, please contact Linkzur support immediately.\n\n"
-        f"Best regards,\n"
-        f"Linkzur Team"
-    )
-
-    try:
-        send_mail(
-            subject,
-            message,
-            settings.DEFAULT_FROM_EMAIL,
-            [email],
-            fail_silently=False,
-        )
-        logger.info(f"📩 Delivery OTP sent to {email}")
-        return True
-
-    except BadHeaderError:
-        logger.error(f"❌ Invalid header sending delivery OTP to {email}")
-        return False
-
-    except Exception as e:
-        logger.error(f"❌ Failed to send delivery OTP to {email}: {e}")
-        return False
-
-import logging
-from django.core.mail import send_mail
-from django.conf import settings
-
-logger = logging.getLogger(__name__)
-
-
-# ------------------------------------------------
-# BUYER ORDER CONFIRMATION EMAIL
-# ------------------------------------------------
-def send_order_confirmation_email(email: str, order):
-   
-    subject = f"Order #{order.id} Confirmed – Linkzur"
-    message = (
-        f"Hello,\n\n"
-        f"Your order #{order.id} has been successfully placed.\n"
-        f"Total Amount: ₹{order.total_price}\n"
-        f"Status: {order.status}\n\n"
-        f"Thank you for shopping with Linkzur!\n\n"
-        f"Regards,\n"
-        f"Linkzur Team"
-    )
-
-    try:
-        send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [email])
-        logger.info(f"📧 Order confirmation email sent to {email}")
-        return True
-    except Exception as e:
-        logger.error(f"❌ Failed to send confirmation email to {email}: {e}")
-        return False
-
-
-
-# ------------------------------------------------
-# SELLER ORDER ALERT EMAIL
-# ------------------------------------------------
-def send_seller_new_order_email(email: str, order):
-    print(order)
-    print(order.buyer.email)
-    subject = f"New Order Received – Order #{order.id}"
-    message = (
-        f"Hello Seller,\n\n"
-        f"You have received a new order containing your products.\n"
-        f"Order ID: #{order.id}\n"
-        f"Buyer: {order.buyer.email}\n\n"
-        f"Please review and process the order.\n\n"
-        f"- Linkzur Team"
-    )
-
-    try:
-        send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [email])
-        logger.info(f"📧 Seller alert email sent to {email}")
-        return True
-    except Exception as e:
-        logger.error(f"❌ Failed to send seller order alert to {email}: {e}")
-        return False
-
-
-
-# ------------------------------------------------
-# BUYER STATUS UPDATE EMAIL
-# ------------------------------------------------
-def send_order_status_update_email(email: str, order):
-    subject = f"Order #{order.id} Status Updated"
-    message = (
-        f"Hello,\n\n"
-        f"The status of your order #{order.id} has been updated.\n"
-        f"New Status: {order.status}\n\n"
-        f"Thank you for shopping with Linkzur!\n\n"
-        f"- Linkzur Team"
-    )
-
-    try:
-        send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [email])
-        logger.info(f"📧 Order status update email sent to {email}")
-        return True
-    except Exception as e:
-        logger.error(f"❌ Failed to send status update email: {e}")
-        return False
@@ -0,0 +1,94 @@
+from django.core.cache import cache
+from django.db.models import F, Min
+
+from ..models import Product, Review
+from ..serializers import ProductDetailSerializer
+from .product_stats import rating_summary
+from .shared_cache import cache_is_shared
+
+DETAIL_TTL_SECONDS = 5 * 60
+TOP_REVIEWS = 5
+SIMILAR_PRODUCTS = 8
+
+
+# ============================================
+# CACHE
+# ============================================
+# Each product has a version counter; bumping it retires the product's
+# cached pages under every Host header at once. The bump only reaches other
+# workers through a shared cache, so on a per-process backend pages are not
+# cached at all. Data from other rows (seller profile, similar products'
+# prices) can lag by up to DETAIL_TTL_SECONDS.
+def _version_key(product_id):
+    return f"product:detail:version:{product_id}"
+
+
+def invalidate_product_detail(product_id):
+    try:
+        cache.incr(_version_key(product_id))
+    except ValueError:
+        pass  # nothing cached under a version yet
+
+
+def _detail_key(product_id, host):
+    version = cache.get(_version_key(product_id))
+    if version is None:
+        cache.add(_version_key(product_id), 1, timeout=None)
+        version = cache.get(_version_key(product_id), 1)
+    return f"product:detail:{product_id}:{version}:{host}"
+
+
+# ============================================
+# BUILD
+# ============================================
+def build_product_detail(product_id, request):
+    """
+    The product page payload in a fixed number of queries:
+    product (+ seller, profile, stats), variants, recent reviews, similar
+    products. None if the product doesn't exist.
+    """
+    product = (
+        Product.objects
+        .select_related("seller", "seller__seller_profile", "stats")
+        .prefetch_related("variants")
+        .filter(pk=product_id)
+        .first()
+    )
+    if product is None:
+        return None
+
+    top_reviews = (
+        Review.objects.filter(product_id=product_id)
+        .exclude(comment__isnull=True).exclude(comment="")
+        .select_related("buyer")
+        .order_by("-created_at")[:TOP_REVIEWS]
+    )
+
+    similar = (
+        Product.objects
+        .filter(category=product.category)
+        .exclude(pk=product.pk)
+        .annotate(min_price=Min("variants__price"))
+        .only("id", "name", "brand", "ref_no", "category", "image", "image_renditions")
+        .order_by(F("stats__popularity").desc(nulls_last=True), "-id")[:SIMILAR_PRODUCTS]
+    )
+
+    context = {
+        "request": request,
+        "rating": rating_summary(getattr(product, "stats", None)),
+        "top_reviews": list(top_reviews),
+        "similar": list(similar),
+    }
+    return ProductDetailSerializer(product, context=context).data
+
+
+def get_product_detail(product_id, request):
+    if not cache_is_shared():
+        return build_product_detail(product_id, request)
+    key = _detail_key(product_id, request.get_host())
+    data = cache.get(key)
+    if data is None:
+        data = build_product_detail(product_id, request)
+        if data is not None:
+            cache.set(key, data, DETAIL_TTL_SECONDS)
+    return data
@@ -0,0 +1,243 @@
+import atexit
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, Count, F, FloatField, IntegerField, Q, Sum, Value, When
+from django.utils import timezone
+
+from ..models import CartItem, OrderItem, Product, ProductStats, Review, WishlistItem
+from .background import run_periodically
+from .order_state import on_enter
+
+logger = logging.getLogger(__name__)
+
+# event → (ProductStats counter, popularity weight)
+EVENTS = {
+    "view": ("views", 1.0),
+    "cart_add": ("cart_adds", 5.0),
+    "wishlist_add": ("wishlist_adds", 3.0),
+    "unit_sold": ("units_sold", 10.0),
+}
+COUNTERS = [counter for counter, _ in EVENTS.values()]
+RATING_FIELDS = [f"rating_{n}" for n in range(1, 6)]
+
+# Forward decay: an event's weight doubles every half-life after the epoch,
+# which ranks the same as halving every older event. Floats hold ~1000
+# doublings, i.e. about 19 years at a 7-day half-life before the epoch has
+# to move forward (and scores be rebuilt).
+POPULARITY_EPOCH = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+HALF_LIFE_DAYS = getattr(settings, "POPULARITY_HALF_LIFE_DAYS", 7)
+
+FLUSH_CHUNK = 500
+
+# Per-process buffer: product_id → {counter: n, "popularity": score}.
+_pending = defaultdict(lambda: defaultdict(float))
+_lock = threading.Lock()
+_flusher = None
+
+
+def decay_weight(when=None) -> float:
+    when = when or timezone.now()
+    age_days = (when - POPULARITY_EPOCH).total_seconds() / 86400
+    return 2 ** (age_days / HALF_LIFE_DAYS)
+
+
+def current_popularity(score, when=None) -> float:
+    """
+    A stored score expressed in today's units (weighted events, halved per
+    half-life of age). Only needed for display; ordering uses the raw score.
+    """
+    return score / decay_weight(when)
+
+
+# ============================================
+# BUFFER
+# ============================================
+def record(event, product_id, amount=1, when=None):
+    counter, weight = EVENTS[event]
+    with _lock:
+        entry = _pending[product_id]
+        entry[counter] += amount
+        entry["popularity"] += weight * amount * decay_weight(when)
+
+    if getattr(settings, "BACKGROUND_TASKS_EAGER", False):
+        flush()
+        return
+    _ensure_flusher()
+
+
+def _ensure_flusher():
+    global _flusher
+    if _flusher is not None:
+        return
+    with _lock:
+        if _flusher is None:
+            _flusher = run_periodically(
+                _flush_if_pending, getattr(settings, "PRODUCT_STATS_FLUSH_SECONDS", 10), "product-stats"
+            )
+
+
+def _flush_if_pending():
+    if _pending:
+        flush()
+
+
+# ============================================
+# FLUSH
+# ============================================
+def _delta(field, batch, output_field):
+    cast = float if isinstance(output_field, FloatField) else int
+    return Case(
+        *[When(product_id=pid, then=Value(cast(entry.get(field, 0)))) for pid, entry in batch],
+        default=Value(cast(0)),
+        output_field=output_field,
+    )
+
+
+def flush():
+    """
+    Add buffered counts to ProductStats: one UPDATE per FLUSH_CHUNK products,
+    each column incremented by a CASE on product_id.
+    """
+    global _pending
+    with _lock:
+        batch, _pending = _pending, defaultdict(lambda: defaultdict(float))
+    if not batch:
+        return
+
+    try:
+        live = set(Product.objects.filter(id__in=batch.keys()).values_list("id", flat=True))
+        items = [(pid, entry) for pid, entry in batch.items() if pid in live]
+
+        with transaction.atomic():
+            ProductStats.objects.bulk_create(
+                [ProductStats(product_id=pid) for pid, _ in items], ignore_conflicts=True
+            )
+            for i in range(0, len(items), FLUSH_CHUNK):
+                chunk = items[i:i + FLUSH_CHUNK]
+                updates = {
+                    counter: F(counter) + _delta(counter, chunk, IntegerField())
+                    for counter in COUNTERS
+                    if any(entry.get(counter) for _, entry in chunk)
+                }
+                ProductStats.objects.filter(product_id__in=[pid for pid, _ in chunk]).update(
+                    popularity=F("popularity") + _delta("popularity", chunk, FloatField()),
+                    updated_at=timezone.now(),
+                    **updates,
+                )
+    except Exception as e:
+        with _lock:
+            for pid, entry in batch.items():
+                for field, value in entry.items():
+                    _pending[pid][field] += value
+        logger.error(f"❌ Product stats flush failed ({len(batch)} products): {e}")
+        return
+
+    logger.debug(f"📈 Flushed stats for {len(items)} products")
+
+
+atexit.register(flush)
+
+
+# ============================================
+# HOOKS
+# ============================================
+@on_enter("completed")
+def _count_units_sold(orders, actor):
+    rows = (
+        OrderItem.objects.filter(order__in=orders)
+        .values("product_id")
+        .annotate(units=Sum("quantity"))
+    )
+    for row in rows:
+        record("unit_sold", row["product_id"], row["units"])
+
+
+# ============================================
+# RATINGS
+# ============================================
+def _rating_counts():
+    return {f"rating_{n}": Count("id", filter=Q(rating=n)) for n in range(1, 6)}
+
+
+def refresh_ratings(product_id):
+    """
+    Recount the star histogram for one product: a single aggregate over its
+    reviews (product index), so edits and deletes stay exact.
+    """
+    counts = Review.objects.filter(product_id=product_id).aggregate(**_rating_counts())
+    updated = ProductStats.objects.filter(product_id=product_id).update(updated_at=timezone.now(), **counts)
+    if not updated and Product.objects.filter(pk=product_id).exists():
+        ProductStats.objects.get_or_create(product_id=product_id, defaults=counts)
+
+
+def refresh_ratings_after_commit(product_id):
+    transaction.on_commit(lambda: refresh_ratings(product_id))
+
+
+def rating_summary(stats):
+    """
+    Average, count and star histogram from a ProductStats row (or None,
+    for a product with no row yet, e.g. before rebuild_product_stats).
+    """
+    if stats is None:
+        return {"average": None, "count": 0, "histogram": {str(n): 0 for n in range(1, 6)}}
+    return {
+        "average": stats.average_rating,
+        "count": stats.rating_count,
+        "histogram": stats.rating_histogram,
+    }
+
+
+def rebuild():
+    """
+    Recompute counters and scores from what the database still records:
+    cart and wishlist rows and completed orders (dated by when they were
+    placed). View counts are kept but no longer add to the score, since
+    their timestamps are not stored. Star histograms are recounted from
+    reviews. Also creates missing rows.
+    """
+    totals = defaultdict(lambda: defaultdict(float))
+
+    for row in Review.objects.order_by().values("product_id").annotate(**_rating_counts()):
+        for field in RATING_FIELDS:
+            totals[row["product_id"]][field] = row[field]
+
+    for row in CartItem.objects.values("product_id", "added_at"):
+        totals[row["product_id"]]["cart_adds"] += 1
+        totals[row["product_id"]]["popularity"] += EVENTS["cart_add"][1] * decay_weight(row["added_at"])
+    for row in WishlistItem.objects.values("product_id", "added_at"):
+        totals[row["product_id"]]["wishlist_adds"] += 1
+        totals[row["product_id"]]["popularity"] += EVENTS["wishlist_add"][1] * decay_weight(row["added_at"])
+    for row in (
+        OrderItem.objects.filter(order__status="completed")
+        .values("product_id", "quantity", "order__created_at")
+    ):
+        totals[row["product_id"]]["units_sold"] += row["quantity"]
+        totals[row["product_id"]]["popularity"] += (
+            EVENTS["unit_sold"][1] * row["quantity"] * decay_weight(row["order__created_at"])
+        )
+
+    rows = [
+        ProductStats(
+            product_id=pid,
+            cart_adds=int(totals[pid]["cart_adds"]),
+            wishlist_adds=int(totals[pid]["wishlist_adds"]),
+            units_sold=int(totals[pid]["units_sold"]),
+            popularity=totals[pid]["popularity"],
+            **{field: int(totals[pid][field]) for field in RATING_FIELDS},
+        )
+        for pid in Product.objects.values_list("id", flat=True).iterator()
+    ]
+    ProductStats.objects.bulk_create(
+        rows,
+        batch_size=FLUSH_CHUNK,
+        update_conflicts=True,
+        unique_fields=["product"],
+        update_fields=["cart_adds", "wishlist_adds", "units_sold", "popularity", "updated_at", *RATING_FIELDS],
+    )
+    return len(rows)
@@ -0,0 +1,182 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================
+# BROKER INTERFACE
+# ============================================
+class Subscription(ABC):
+    """
+    Handle returned by Broker.subscribe(). Must be used from the event loop
+    that created it.
+    """
+
+    @abstractmethod
+    async def get(self, timeout: float = None):
+        """
+        Wait for the next message. Returns None on timeout.
+        """
+
+    @abstractmethod
+    def close(self):
+        ...
+
+
+class Broker(ABC):
+    """
+    Minimal pub/sub contract used for realtime delivery.
+
+    publish() may be called from any thread (sync views, background jobs);
+    subscribe() is called from async code. Implementations are named in
+    settings.REALTIME_BROKER; RedisBroker is the cross-process one.
+    """
+
+    @abstractmethod
+    def publish(self, channel: str, message: dict):
+        ...
+
+    @abstractmethod
+    def subscribe(self, channel: str) -> Subscription:
+        ...
+
+
+# ============================================
+# IN-PROCESS BROKER
+# ============================================
+class _QueueSubscription(Subscription):
+    def __init__(self, broker, channel, loop, maxsize):
+        self._broker = broker
+        self.channel = channel
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=maxsize)
+
+    def deliver(self, message):
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A stalled client must not grow memory without bound; it will
+            # catch up from the database on reconnect.
+            logger.warning(f"⚠️ Dropping realtime message for slow subscriber on {self.channel}")
+
+    async def get(self, timeout: float = None):
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self._broker._remove(self)
+
+
+class InProcessBroker(Broker):
+    """
+    Delivers messages to subscribers in the same process only. Suitable for a
+    single ASGI worker or as a local stand-in for a shared broker.
+    """
+
+    def __init__(self, queue_size: int = 100):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._queue_size = queue_size
+
+    def publish(self, channel, message):
+        with self._lock:
+            targets = list(self._subscribers.get(channel, ()))
+        for sub in targets:
+            try:
+                sub.loop.call_soon_threadsafe(sub.deliver, message)
+            except RuntimeError:
+                # Loop already closed; the subscription is going away.
+                self._remove(sub)
+
+    def subscribe(self, channel):
+        sub = _QueueSubscription(self, channel, asyncio.get_running_loop(), self._queue_size)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(sub)
+        return sub
+
+    def _remove(self, sub):
+        with self._lock:
+            subs = self._subscribers.get(sub.channel)
+            if subs is not None:
+                subs.discard(sub)
+                if not subs:
+                    del self._subscribers[sub.channel]
+
+
+# ============================================
+# REDIS BROKER
+# ============================================
+class RedisBroker(InProcessBroker):
+    """
+    Cross-worker broker: publish() goes through Redis PUBLISH, and one
+    listener thread per process receives every Linkzur channel and hands
+    each message to that process's local subscribers. Subscribing stays a
+    local, synchronous registration, so callers can still subscribe before
+    reading a backlog without missing anything in between.
+
+    Messages published while the listener is reconnecting are lost; clients
+    catch up from the database on reconnect, as with a full queue.
+    """
+
+    PREFIX = "linkzur:"
+    RECONNECT_SECONDS = 2
+
+    def __init__(self, url: str = None, queue_size: int = 100):
+        import redis  # only needed when this broker is configured
+
+        super().__init__(queue_size)
+        self._client = redis.Redis.from_url(url or settings.REDIS_URL)
+        # Subscribed before the constructor returns, so nothing published
+        # after get_broker() is missed.
+        self._pubsub = self._listen()
+        threading.Thread(target=self._run, name="realtime-redis", daemon=True).start()
+
+    def _listen(self):
+        pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(f"{self.PREFIX}*")
+        return pubsub
+
+    def publish(self, channel, message):
+        self._client.publish(f"{self.PREFIX}{channel}", json.dumps(message))
+
+    def _run(self):
+        while True:
+            try:
+                for item in self._pubsub.listen():
+                    if item["type"] != "pmessage":
+                        continue
+                    channel = item["channel"].decode()[len(self.PREFIX):]
+                    super().publish(channel, json.loads(item["data"]))
+            except Exception as e:
+                logger.error(f"❌ Realtime Redis listener failed, reconnecting: {e}")
+                time.sleep(self.RECONNECT_SECONDS)
+                try:
+                    self._pubsub.close()
+                    self._pubsub = self._listen()
+                except Exception as e:
+                    logger.error(f"❌ Realtime Redis reconnect failed: {e}")
+
+
+@lru_cache(maxsize=None)
+def get_broker() -> Broker:
+    path = getattr(settings, "REALTIME_BROKER", "linkzur_app.utils.pubsub.InProcessBroker")
+    return import_string(path)()
+
+
+def user_channel(user_id) -> str:
+    return f"user:{user_id}"
+
+
+def conversation_channel(conversation_id) -> str:
+    return f"conversation:{conversation_id}"
@@ -0,0 +1,48 @@
+from django.db import transaction
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .pubsub import get_broker, user_channel
+
+
+def authenticate_token(raw: str):
+    """
+    Resolve a raw JWT access token to a user, or None. Used by the realtime
+    endpoints, where browsers cannot always send an Authorization header.
+    """
+    if not raw:
+        return None
+    auth = JWTAuthentication()
+    try:
+        return auth.get_user(auth.get_validated_token(raw))
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None
+
+
+def notification_payload(notification) -> dict:
+    return {
+        "type": "notification",
+        "id": notification.id,
+        "kind": notification.kind,
+        "message": notification.message,
+        "is_read": notification.is_read,
+        "created_at": notification.created_at.isoformat() if notification.created_at else None,
+    }
+
+
+def publish_notifications(notifications):
+    """
+    Push saved Notification rows to their users' live streams once the
+    current transaction commits.
+    """
+    notifications = [n for n in notifications if n.pk]
+    if not notifications:
+        return
+
+    def _publish():
+        broker = get_broker()
+        for n in notifications:
+            broker.publish(user_channel(n.user_id), notification_payload(n))
+
+    transaction.on_commit(_publish)
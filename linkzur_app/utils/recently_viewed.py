@@ -0,0 +1,167 @@
+import atexit
+import logging
+import threading
+
+from django.conf import settings
+from django.db.models import F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from ..models import Product, RecentlyViewed
+from .background import run_periodically, submit
+
+logger = logging.getLogger(__name__)
+
+RECENT_LIMIT = 20
+
+# Product page views are buffered per process and written in bulk, instead
+# of an upsert + trim on every view. A restart loses at most one interval of
+# views, which only feed the "recently viewed" strip.
+_pending = {}  # (user_id, product_id) → viewed_at
+_lock = threading.Lock()
+_flusher = None
+
+
+def _flush_interval():
+    return getattr(settings, "RECENT_VIEWS_FLUSH_SECONDS", 5)
+
+
+def _flush_at():
+    return getattr(settings, "RECENT_VIEWS_FLUSH_AT", 500)
+
+
+# ============================================
+# BUFFER
+# ============================================
+def record_view(user_id, product_id):
+    with _lock:
+        _pending[(user_id, product_id)] = timezone.now()
+        size = len(_pending)
+
+    if getattr(settings, "BACKGROUND_TASKS_EAGER", False):
+        flush()
+        return
+
+    _ensure_flusher()
+    if size >= _flush_at():
+        submit(flush)
+
+
+def pending_views(user_id):
+    """
+    {product_id: viewed_at} for this user's views not yet written.
+    """
+    with _lock:
+        return {pid: ts for (uid, pid), ts in _pending.items() if uid == user_id}
+
+
+def _ensure_flusher():
+    global _flusher
+    if _flusher is not None:
+        return
+    with _lock:
+        if _flusher is None:
+            _flusher = run_periodically(_flush_if_pending, _flush_interval(), "recent-views")
+
+
+def _flush_if_pending():
+    if _pending:
+        flush()
+
+
+# ============================================
+# FLUSH
+# ============================================
+def flush():
+    """
+    Write buffered views with one upsert, then trim every touched user back
+    to RECENT_LIMIT rows with one windowed DELETE.
+    """
+    global _pending
+    with _lock:
+        batch, _pending = _pending, {}
+    if not batch:
+        return
+
+    rows = [
+        RecentlyViewed(user_id=user_id, product_id=product_id, viewed_at=viewed_at)
+        for (user_id, product_id), viewed_at in batch.items()
+    ]
+    user_ids = {user_id for user_id, _ in batch}
+
+    try:
+        # Products deleted since the view would fail the FK check.
+        live = set(
+            Product.objects.filter(id__in={pid for _, pid in batch}).values_list("id", flat=True)
+        )
+        RecentlyViewed.objects.bulk_create(
+            [row for row in rows if row.product_id in live],
+            update_conflicts=True,
+            unique_fields=["user", "product"],
+            update_fields=["viewed_at"],
+        )
+
+        overflow = (
+            RecentlyViewed.objects.filter(user_id__in=user_ids)
+            .annotate(rank=Window(
+                RowNumber(),
+                partition_by=[F("user_id")],
+                order_by=[F("viewed_at").desc(), F("id").desc()],
+            ))
+            .filter(rank__gt=RECENT_LIMIT)
+            .values("id")
+        )
+        RecentlyViewed.objects.filter(id__in=overflow).delete()
+    except Exception as e:
+        # Put the views back (newer ones recorded meanwhile win) and retry
+        # on the next flush.
+        with _lock:
+            for key, viewed_at in batch.items():
+                if key not in _pending:
+                    _pending[key] = viewed_at
+        logger.error(f"❌ Recently viewed flush failed ({len(batch)} views): {e}")
+        return
+
+    logger.debug(f"👀 Flushed {len(batch)} recent views for {len(user_ids)} users")
+
+
+atexit.register(flush)
+
+
+# ============================================
+# READ
+# ============================================
+def recent_views_for(user):
+    """
+    The user's latest RECENT_LIMIT views, newest first, with unflushed views
+    merged in. Unflushed entries that have no row yet are unsaved instances.
+    """
+    pending = pending_views(user.id)
+
+    items = list(
+        RecentlyViewed.objects
+        .filter(user=user)
+        .select_related("product", "product__seller", "product__seller__seller_profile")
+        .prefetch_related("product__variants", "product__reviews")
+        .order_by("-viewed_at")[:RECENT_LIMIT]
+    )
+
+    by_product = {item.product_id: item for item in items}
+    for product_id, viewed_at in pending.items():
+        if product_id in by_product:
+            by_product[product_id].viewed_at = max(by_product[product_id].viewed_at, viewed_at)
+
+    missing = [pid for pid in pending if pid not in by_product]
+    if missing:
+        products = (
+            Product.objects.filter(id__in=missing)
+            .select_related("seller", "seller__seller_profile")
+            .prefetch_related("variants", "reviews")
+        )
+        items.extend(
+            RecentlyViewed(user=user, product=product, viewed_at=pending[product.id])
+            for product in products
+        )
+
+    items.sort(key=lambda item: item.viewed_at, reverse=True)
+    return items[:RECENT_LIMIT]
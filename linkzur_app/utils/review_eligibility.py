@@ -0,0 +1,89 @@
+from django.core.cache import cache
+
+from ..models import OrderItem, ProductVariant, Review
+from .order_state import TRANSITIONS, on_enter
+from .shared_cache import cache_is_shared
+
+# Orders past this point count as a purchase for reviewing. "shipped" sits
+# between two eligible statuses, so it is included rather than flickering.
+ELIGIBLE_STATUSES = ("processing", "shipped", "delivered", "completed")
+
+PURCHASED_TTL_SECONDS = 60 * 60
+MAX_PRODUCTS = 100
+
+
+# ============================================
+# PURCHASED SET
+# ============================================
+def _purchased_key(buyer_id):
+    return f"reviews:purchased:{buyer_id}"
+
+
+def purchased_variants(buyer_id, product_ids) -> set:
+    """
+    {(product_id, variant_id)} the buyer has in eligible orders among
+    `product_ids`. On a shared cache the buyer's whole set is loaded with
+    one query and cached until one of their orders changes status; the hook
+    that retires it runs in one worker, so on a per-process cache each call
+    runs one indexed query limited to the products asked about instead.
+    """
+    eligible = OrderItem.objects.filter(order__buyer_id=buyer_id, order__status__in=ELIGIBLE_STATUSES)
+    if not cache_is_shared():
+        return set(
+            eligible.filter(product_id__in=product_ids)
+            .values_list("product_id", "variant_id")
+            .distinct()
+        )
+
+    key = _purchased_key(buyer_id)
+    pairs = cache.get(key)
+    if pairs is None:
+        pairs = list(eligible.values_list("product_id", "variant_id").distinct())
+        cache.set(key, pairs, PURCHASED_TTL_SECONDS)
+    product_ids = set(product_ids)
+    return {tuple(pair) for pair in pairs if pair[0] in product_ids}
+
+
+def has_purchased(buyer_id, product_id, variant_id) -> bool:
+    # No variant: order items placed without one (older orders).
+    variant_id = int(variant_id) if variant_id not in (None, "") else None
+    product_id = int(product_id)
+    return (product_id, variant_id) in purchased_variants(buyer_id, [product_id])
+
+
+@on_enter(*TRANSITIONS)
+def _invalidate_purchased(orders, actor):
+    # Any move can add (processing) or remove (cancelled) a purchase.
+    cache.delete_many({_purchased_key(order.buyer_id) for order in orders})
+
+
+# ============================================
+# BATCHED CHECK
+# ============================================
+def eligibility_for(buyer_id, product_ids):
+    """
+    Per product, per variant: whether the buyer bought it, already reviewed
+    it, and so may review it now.
+    """
+    purchased = purchased_variants(buyer_id, product_ids)
+    reviewed = set(
+        Review.objects.filter(buyer_id=buyer_id, product_id__in=product_ids)
+        .values_list("product_id", "variant_id")
+    )
+
+    result = {product_id: [] for product_id in product_ids}
+    variants = (
+        ProductVariant.objects.filter(product_id__in=product_ids)
+        .order_by("product_id", "id")
+        .values_list("product_id", "id")
+    )
+    for product_id, variant_id in variants:
+        bought = (product_id, variant_id) in purchased
+        done = (product_id, variant_id) in reviewed
+        result[product_id].append({
+            "variant_id": variant_id,
+            "purchased": bought,
+            "reviewed": done,
+            "eligible": bought and not done,
+        })
+    return result
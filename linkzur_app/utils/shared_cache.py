@@ -0,0 +1,16 @@
+from django.conf import settings
+
+# Backends whose entries live in a single process (or nowhere).
+PROCESS_LOCAL_BACKENDS = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def cache_is_shared(alias="default") -> bool:
+    """
+    Whether all workers read and write the same cache. Caches retired by a
+    version bump or delete in one worker are only safe to use if so; on a
+    per-process backend the other workers would keep serving stale entries.
+    """
+    return settings.CACHES[alias]["BACKEND"] not in PROCESS_LOCAL_BACKENDS
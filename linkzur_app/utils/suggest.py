@@ -0,0 +1,221 @@
+import heapq
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from ..models import Product, ProductStats
+from .background import submit
+from .shared_cache import cache_is_shared
+
+logger = logging.getLogger(__name__)
+
+MIN_QUERY = 2
+MAX_LIMIT = 20
+# Upper bound on index entries ranked per query; keeps one-letter-ish
+# prefixes in a huge catalog from scanning everything.
+MAX_SCAN = 2000
+# Popular prefixes repeat across users; results are memoized until the
+# index changes.
+RESULT_CACHE_SIZE = 4096
+
+_WS_RE = re.compile(r"\s+")
+
+# Bumped on product saves and deletes only: the index holds no variant or
+# price data, so those edits (which move the facets' catalog version) must
+# not make every process rebuild it.
+_VERSION_KEY = "suggest:version"
+
+
+def normalize(text) -> str:
+    return _WS_RE.sub(" ", str(text or "")).strip().lower()
+
+
+def index_version():
+    if not cache_is_shared():
+        # Bumps in a per-process cache never reach the other workers, so
+        # derive the version from the products table instead.
+        latest = Product.objects.aggregate(count=Count("id"), updated=Max("updated_at"))
+        return (latest["count"], latest["updated"])
+    version = cache.get(_VERSION_KEY)
+    if version is None:
+        cache.add(_VERSION_KEY, 1, timeout=None)
+        version = cache.get(_VERSION_KEY, 1)
+    return version
+
+
+def bump_index_version():
+    if not cache_is_shared():
+        return None  # the table-derived version moves by itself
+    try:
+        return cache.incr(_VERSION_KEY)
+    except ValueError:
+        cache.add(_VERSION_KEY, 1, timeout=None)
+        return cache.get(_VERSION_KEY, 1)
+
+
+class SuggestIndex:
+    """
+    Prefix index over product names, brands, ref_nos and CAS numbers: a
+    sorted list of (key, kind, display, product_id) searched with bisect.
+    Each word of a name is indexed too, so "hplc" finds "Acetone HPLC".
+    """
+
+    def __init__(self):
+        self._entries = []
+        self._by_product = {}  # product_id → entries, for removal
+        self._popularity = {}
+        self._results = {}
+        self._lock = threading.Lock()
+        self.version = None
+        self.checked_at = 0.0
+
+    # ---------- build / update ----------
+    @staticmethod
+    def _entries_for(product_id, name, brand, ref_no, cas_no):
+        entries = set()
+        words = normalize(name).split(" ")
+        for i in range(len(words)):
+            key = " ".join(words[i:])
+            if key:
+                entries.add((key, "name", name, product_id))
+        for kind, value in (("brand", brand), ("ref_no", ref_no), ("cas_no", cas_no)):
+            key = normalize(value)
+            if key:
+                entries.add((key, kind, value.strip(), product_id))
+        return sorted(entries)
+
+    def build(self):
+        version = index_version()
+        entries, by_product = [], {}
+        rows = Product.objects.values_list("id", "name", "brand", "ref_no", "cas_no").iterator(chunk_size=2000)
+        for product_id, name, brand, ref_no, cas_no in rows:
+            product_entries = self._entries_for(product_id, name, brand, ref_no, cas_no)
+            by_product[product_id] = product_entries
+            entries.extend(product_entries)
+        entries.sort()
+        popularity = dict(ProductStats.objects.values_list("product_id", "popularity"))
+
+        with self._lock:
+            self._entries, self._by_product, self._popularity = entries, by_product, popularity
+            self._results = {}
+            self.version, self.checked_at = version, time.monotonic()
+        logger.info(f"🔎 Suggest index built: {len(entries)} entries for {len(by_product)} products")
+
+    def _remove(self, product_id):
+        self._results = {}
+        for entry in self._by_product.pop(product_id, ()):
+            i = bisect_left(self._entries, entry)
+            if i < len(self._entries) and self._entries[i] == entry:
+                del self._entries[i]
+
+    def _advance(self, version):
+        # Applying the change that produced `version` keeps an index that
+        # was current, current; after missed changes it stays stale.
+        if isinstance(version, int) and version == self.version + 1:
+            self.version = version
+
+    def update_product(self, product, version):
+        entries = self._entries_for(product.id, product.name, product.brand, product.ref_no, product.cas_no)
+        with self._lock:
+            self._remove(product.id)
+            for entry in entries:
+                insort(self._entries, entry)
+            self._results = {}
+            self._by_product[product.id] = entries
+            self._advance(version)
+
+    def remove_product(self, product_id, version):
+        with self._lock:
+            self._remove(product_id)
+            self._popularity.pop(product_id, None)
+            self._advance(version)
+
+    # ---------- query ----------
+    def suggest(self, query, limit=8):
+        prefix = normalize(query)
+        if len(prefix) < MIN_QUERY:
+            return []
+
+        cached = self._results.get((prefix, limit))
+        if cached is not None:
+            return cached
+
+        with self._lock:
+            results = self._results
+            start = bisect_left(self._entries, (prefix,))
+            candidates = []
+            for entry in self._entries[start:start + MAX_SCAN]:
+                if not entry[0].startswith(prefix):
+                    break
+                candidates.append(entry)
+            popularity = self._popularity
+
+        # One row per distinct suggestion; brands shared by many products
+        # rank by their best product.
+        best = {}
+        for key, kind, display, product_id in candidates:
+            score = popularity.get(product_id, 0.0)
+            dedupe = (kind, display.lower()) if kind == "brand" else (kind, product_id)
+            if dedupe not in best or score > best[dedupe][0]:
+                best[dedupe] = (score, kind, display, product_id)
+
+        top = heapq.nlargest(limit, best.values(), key=lambda row: (row[0], -len(row[2])))
+        suggestions = [
+            {"text": display, "kind": kind, "product_id": None if kind == "brand" else product_id}
+            for _, kind, display, product_id in top
+        ]
+
+        # `results` is the dict current when the scan started; if the index
+        # changed since, this lands in a discarded dict.
+        if len(results) >= RESULT_CACHE_SIZE:
+            results.clear()
+        results[(prefix, limit)] = suggestions
+        return suggestions
+
+
+_index = SuggestIndex()
+_build_lock = threading.Lock()
+
+
+def get_index() -> SuggestIndex:
+    """
+    The process-wide index, built on first use (or by warm_index() at
+    startup). Changes saved by other processes show up through the index
+    version, checked at most every SUGGEST_REBUILD_SECONDS.
+    """
+    if _index.version is not None:
+        now = time.monotonic()
+        if now - _index.checked_at < getattr(settings, "SUGGEST_REBUILD_SECONDS", 60):
+            return _index
+        _index.checked_at = now
+    if _index.version is None or _index.version != index_version():
+        with _build_lock:
+            if _index.version is None or _index.version != index_version():
+                _index.build()
+    return _index
+
+
+def warm_index():
+    """
+    Build the index in the background when a server process starts, so the
+    first suggest request doesn't pay for it.
+    """
+    submit(get_index)
+
+
+def product_saved(product):
+    version = bump_index_version()
+    if _index.version is not None:
+        _index.update_product(product, version)
+
+
+def product_deleted(product_id):
+    version = bump_index_version()
+    if _index.version is not None:
+        _index.remove_product(product_id, version)
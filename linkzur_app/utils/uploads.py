@@ -0,0 +1,349 @@
+import hashlib
+import logging
+import os
+import re
+from dataclasses import dataclass
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from ..models import Invoice, Order, Quotation, QuotationRequest, UploadSession
+from ..media import signed_media_url
+from .chat import get_conversation_for, message_payload, post_message
+from .notifications import notify
+from .order_state import is_order_seller, record_event
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 64 * 1024
+# A session left "completing" this long (the worker died mid-attach) can be
+# claimed again.
+COMPLETING_TIMEOUT_SECONDS = 10 * 60
+SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+class UploadError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+# ============================================
+# ATTACH HELPERS (shared with the multipart views)
+# ============================================
+def attach_invoice(order, seller, pdf_file):
+    invoice, _ = Invoice.objects.get_or_create(
+        order=order,
+        defaults={
+            "buyer": order.buyer,
+            "seller": seller,
+            "subtotal": order.total_price,
+            "total_amount": order.total_price,
+            "tax_amount": 0,
+            "address": order.address,
+        }
+    )
+
+    invoice.pdf_file = pdf_file
+    invoice.status = "issued"
+    invoice.save()
+
+    record_event(order, "invoice_uploaded", actor=seller, note=invoice.invoice_number)
+    notify(order.buyer, "invoice_uploaded", order_id=order.id)
+    return invoice
+
+
+def attach_quotation(qreq, seller, file, note=""):
+    quotation = Quotation.objects.create(request=qreq, uploaded_by=seller, file=file, note=note)
+
+    qreq.is_resolved = True
+    qreq.save(update_fields=["is_resolved"])
+
+    notify(
+        qreq.buyer, "quotation_uploaded",
+        seller_name=seller.name, product_name=qreq.product.name,
+    )
+    return quotation
+
+
+# ============================================
+# TARGETS
+# ============================================
+# Each purpose knows how to find (and authorize) its target object and how
+# to attach a finished file to it.
+@dataclass
+class _Target:
+    extensions: tuple
+    load: object
+    attach: object
+
+
+def _load_conversation(user, target_id):
+    conv = get_conversation_for(user, target_id)
+    if conv is None or user.id not in (conv.buyer_id, conv.seller_id):
+        raise UploadError("Conversation not found", status=404)
+    return conv
+
+
+def _attach_chat(user, conv, file, extra):
+    msg = post_message(conv, user, str(extra.get("text") or ""), attachment=file)
+    return {"message": message_payload(msg, conv, user)}
+
+
+def _load_quotation_request(user, target_id):
+    qreq = (
+        QuotationRequest.objects.select_related("product", "buyer")
+        .filter(pk=target_id, seller=user)
+        .first()
+    )
+    if qreq is None:
+        raise UploadError("Quotation request not found", status=404)
+    if qreq.is_resolved:
+        raise UploadError("Quotation already provided for this request.")
+    return qreq
+
+
+def _attach_quotation(user, qreq, file, extra):
+    quotation = attach_quotation(qreq, user, file, str(extra.get("note") or ""))
+    return {"quotation_id": quotation.id, "file_url": signed_media_url(quotation.file.name, user)}
+
+
+def _load_order(user, target_id):
+    order = Order.objects.select_related("buyer", "seller").filter(pk=target_id).first()
+    if order is None:
+        raise UploadError("Order not found", status=404)
+    if user.role != "seller" or not is_order_seller(user, order):
+        raise UploadError("Only the order's seller can upload invoices.", status=403)
+    return order
+
+
+def _attach_invoice(user, order, file, extra):
+    invoice = attach_invoice(order, user, file)
+    return {"invoice_url": signed_media_url(invoice.pdf_file.name, user)}
+
+
+TARGETS = {
+    "chat_attachment": _Target(("pdf", "png", "jpg", "jpeg", "txt"), _load_conversation, _attach_chat),
+    "quotation": _Target(("pdf",), _load_quotation_request, _attach_quotation),
+    "invoice": _Target(("pdf",), _load_order, _attach_invoice),
+}
+
+
+# ============================================
+# SESSIONS
+# ============================================
+def temp_path(session) -> Path:
+    return Path(settings.CHUNKED_UPLOAD_DIR) / f"{session.id}.part"
+
+
+def start_session(user, purpose, target_id, filename, total_size, sha256):
+    target = TARGETS.get(purpose)
+    if target is None:
+        raise UploadError(f"purpose must be one of: {', '.join(TARGETS)}")
+
+    filename = os.path.basename(str(filename or "")).strip()
+    if not filename:
+        raise UploadError("filename is required")
+    ext = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+    if ext not in target.extensions:
+        raise UploadError(f"File type not allowed; expected {', '.join(target.extensions)}")
+
+    try:
+        total_size = int(total_size)
+        target_id = int(target_id)
+    except (TypeError, ValueError):
+        raise UploadError("total_size and target_id must be integers")
+    if not 0 < total_size <= settings.CHUNKED_UPLOAD_MAX_SIZE:
+        raise UploadError(f"total_size must be between 1 and {settings.CHUNKED_UPLOAD_MAX_SIZE} bytes")
+
+    sha256 = str(sha256 or "").lower()
+    if not SHA256_RE.match(sha256):
+        raise UploadError("sha256 must be a hex SHA-256 digest of the whole file")
+
+    # Fail fast on permissions rather than after the last chunk.
+    target.load(user, target_id)
+
+    session = UploadSession.objects.create(
+        user=user,
+        purpose=purpose,
+        target_id=target_id,
+        filename=filename,
+        total_size=total_size,
+        sha256=sha256,
+    )
+    os.makedirs(settings.CHUNKED_UPLOAD_DIR, exist_ok=True)
+    temp_path(session).touch()
+    return session
+
+
+def write_chunk(session_id, user, offset, length, stream, chunk_sha256=None):
+    """
+    Stream `length` bytes from `stream` into the session file at `offset`.
+
+    Chunks must arrive in order; re-sending a chunk at or before the current
+    offset overwrites from there, so a client unsure whether its last request
+    landed can simply retry it. Returns the updated session.
+    """
+    if length <= 0 or length > settings.CHUNKED_UPLOAD_MAX_CHUNK:
+        raise UploadError(f"Chunk size must be between 1 and {settings.CHUNKED_UPLOAD_MAX_CHUNK} bytes")
+
+    # No transaction while reading from the client: a slow chunk must not
+    # hold the session row (or, on SQLite, the database write lock). The
+    # conditional UPDATE below rejects the chunk if the session moved in the
+    # meantime, and complete_session's whole-file checksum catches anything
+    # a racing request left in the part file.
+    session = _open_session(session_id, user)
+    expected = session.received_bytes
+
+    if offset is None:
+        offset = expected
+    if offset > expected:
+        raise UploadError(f"Expected offset {expected}, got {offset}", status=409)
+    if offset + length > session.total_size:
+        raise UploadError("Chunk runs past the declared total_size")
+
+    digest = hashlib.sha256()
+    written = 0
+    error = None
+    with open(temp_path(session), "r+b") as fh:
+        fh.seek(offset)
+        fh.truncate()
+        while written < length:
+            block = stream.read(min(READ_SIZE, length - written))
+            if not block:
+                break
+            fh.write(block)
+            digest.update(block)
+            written += len(block)
+
+        if written != length:
+            error = UploadError("Chunk was shorter than Content-Length")
+        elif chunk_sha256 and digest.hexdigest() != chunk_sha256.lower():
+            error = UploadError("Chunk checksum mismatch")
+
+        if error:
+            # Drop the partial write so the retry starts clean.
+            fh.truncate(offset)
+            written = 0
+
+    received = offset + written
+    updated = UploadSession.objects.filter(
+        pk=session.pk, status="open", received_bytes=expected
+    ).update(received_bytes=received, updated_at=timezone.now())
+    if not updated:
+        raise UploadError("Upload changed while this chunk was sent; fetch its state and resume", status=409)
+    session.received_bytes = received
+
+    if error:
+        raise error
+    return session
+
+
+class _AssembledFile(File):
+    # FileSystemStorage moves files exposing temporary_file_path() instead
+    # of copying them.
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def complete_session(session_id, user, extra=None):
+    """
+    Verify size and checksum, then attach the file to its target. Calling
+    it again on a completed session returns the stored result.
+
+    The session is first claimed with a conditional UPDATE (open →
+    completing), so the whole-file hash runs outside any transaction and
+    never holds the database write lock; only the attach step locks the row.
+    """
+    claimable = Q(status="open") | Q(
+        status="completing", updated_at__lt=timezone.now() - timedelta(seconds=COMPLETING_TIMEOUT_SECONDS)
+    )
+    claimed = UploadSession.objects.filter(
+        claimable, pk=session_id, user=user, received_bytes=F("total_size")
+    ).update(status="completing", updated_at=timezone.now())
+
+    if not claimed:
+        session = UploadSession.objects.filter(pk=session_id, user=user).first()
+        if session is None:
+            raise UploadError("Upload not found", status=404)
+        if session.status == "complete":
+            return session
+        if session.status == "completing":
+            raise UploadError("Upload is already being completed", status=409)
+        if session.status != "open":
+            raise UploadError("Upload was aborted", status=410)
+        raise UploadError(
+            f"Upload incomplete: {session.received_bytes}/{session.total_size} bytes", status=409
+        )
+
+    session = UploadSession.objects.get(pk=session_id)
+    path = temp_path(session)
+    if _file_sha256(path) != session.sha256:
+        # The assembled file is corrupt; start over rather than keep it.
+        with open(path, "wb"):
+            pass
+        UploadSession.objects.filter(pk=session.pk, status="completing").update(
+            status="open", received_bytes=0, updated_at=timezone.now()
+        )
+        raise UploadError("Checksum mismatch; upload restarted", status=422)
+
+    try:
+        with transaction.atomic():
+            session = UploadSession.objects.select_for_update().get(pk=session_id)
+            target = TARGETS[session.purpose]
+            obj = target.load(user, session.target_id)
+            with open(path, "rb") as fh:
+                session.result = target.attach(user, obj, _AssembledFile(fh, name=session.filename), extra or {})
+
+            session.status = "complete"
+            session.save(update_fields=["status", "result", "updated_at"])
+    except Exception:
+        # Let the client call complete again (e.g. after fixing permissions).
+        UploadSession.objects.filter(pk=session_id, status="completing").update(status="open")
+        raise
+
+    _remove_temp(session)
+    return session
+
+
+def abort_session(session_id, user):
+    updated = UploadSession.objects.filter(pk=session_id, user=user, status="open").update(status="aborted")
+    if not updated:
+        raise UploadError("Upload not found", status=404)
+    _remove_temp(UploadSession(pk=session_id))
+
+
+def _open_session(session_id, user, lock=False):
+    sessions = UploadSession.objects.select_for_update() if lock else UploadSession.objects
+    session = sessions.filter(pk=session_id, user=user).first()
+    if session is None:
+        raise UploadError("Upload not found", status=404)
+    if session.status == "completing":
+        raise UploadError("Upload is being completed", status=409)
+    if session.status != "open":
+        raise UploadError(f"Upload is {session.status}", status=410)
+    return session
+
+
+def _file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    if not os.path.exists(path):
+        return ""
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(READ_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _remove_temp(session):
+    try:
+        os.remove(temp_path(session))
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        logger.warning(f"⚠️ Could not remove upload temp file for {session.pk}: {e}")
@@ -12,10 +12,15 @@ import openpyxl
 
 from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from asgiref.sync import sync_to_async
 from django.shortcuts import get_object_or_404, render
-from django.db.models import Count, Sum, Avg, Q, F, Value, DecimalField, Min
+from django.db.models import Count, Sum, Avg, Q, F, Value, DecimalField, Min, Prefetch
 from django.db.models.functions import TruncHour, TruncDay, TruncWeek, TruncMonth, Coalesce
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 
 from rest_framework.decorators import (
     api_view, permission_classes, parser_classes, renderer_classes
@@ -27,9 +32,9 @@ from rest_framework.response import Response
 from rest_framework import status
 
 from .models import (
-    CustomUser, Product, ProductVariant, CartItem, WishlistItem, Order, CATEGORIES, RecentlyViewed,
-    OrderItem, Notification, Payment, Quotation,
-    ProductConversation, ProductMessage, QuotationRequest, 
+    CustomUser, Product, ProductStats, ProductVariant, CartItem, WishlistItem, Order, CATEGORIES, RecentlyViewed,
+    OrderItem, OrderEvent, Notification, NotificationPreference, Payment, Quotation,
+    ProductConversation, ProductMessage, QuotationRequest, UploadSession, ImageImportJob,
     Review, Invoice, PendingUser,BuyerProfile, SellerProfile, PasswordResetToken, ShippingAddress, BillingAddress
 )
 from .serializers import (
@@ -37,13 +42,39 @@ from .serializers import (
     WishlistItemSerializer, OrderSerializer, NotificationSerializer,
     QuotationSerializer, ProductConversationSerializer, ProductMessageSerializer,
     QuotationRequestSerializer, OrderStatusUpdateSerializer, ReviewSerializer,
-    InvoiceSerializer, VerifyOTPSerializer, RecentlyViewedSerializer
+    InvoiceSerializer, VerifyOTPSerializer, RecentlyViewedSerializer,
+    SellerOrderSerializer, OrderHeaderSerializer, OrderEventSerializer,
+    NotificationPreferenceSerializer, ConversationInboxSerializer, ImageImportJobSerializer,
 )
 
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 
 
-from .utils.otp_utils import generate_otp, send_otp_email, send_password_reset_email, send_delivery_otp_email, send_order_confirmation_email, send_order_status_update_email, send_seller_new_order_email
+from .media import signed_media_url
+from .utils.otp_utils import generate_otp, send_otp_email, send_password_reset_email
+from .utils.notifications import notify
+from .utils.order_state import (
+    SELLER_SETTABLE, InvalidTransition, is_order_seller, seller_orders_q, transition, transition_many
+)
+from .utils.pubsub import get_broker, user_channel
+from .utils.chat import is_participant, mark_read, message_sent
+from .utils.db import read_from_replica
+from .utils.identifiers import identifier_q
+from .utils.facets import catalog_search_q, product_facets as compute_product_facets
+from .utils.product_detail import get_product_detail
+from .utils.product_stats import rating_summary, record as record_product_event
+from .utils.suggest import MAX_LIMIT as SUGGEST_MAX_LIMIT, get_index as get_suggest_index
+from .utils.review_eligibility import (
+    MAX_PRODUCTS as REVIEW_ELIGIBILITY_MAX_PRODUCTS, eligibility_for, has_purchased,
+)
+from .utils.recently_viewed import recent_views_for, record_view as record_recent_view
+from .utils.image_import import create_job as create_image_import_job
+from .utils.uploads import (
+    UploadError, abort_session, attach_invoice, attach_quotation,
+    complete_session, start_session, write_chunk,
+)
+from .utils.realtime import authenticate_token, notification_payload
+from .utils.notification_counts import adjust_unread_count, get_unread_count
 from django.contrib.auth import get_user_model
 import openpyxl
 
@@ -599,6 +630,50 @@ class ProductPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class OrderCursorPagination(CursorPagination):
+    """
+    Keyset pagination for order lists: each page is a range scan on
+    created_at instead of an OFFSET over the whole history.
+    """
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+
+MAX_BULK_ORDERS = 200
+
+
+def wants_page(request):
+    """
+    The shipped frontend reads list endpoints as plain arrays, so a
+    {next, previous, results} page is opt-in: only requests carrying
+    ?cursor= or ?page_size= get one.
+    """
+    return "cursor" in request.GET or "page_size" in request.GET
+
+
+class NotificationCursorPagination(CursorPagination):
+    page_size = 30
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+
+class ReviewCursorPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-created_at", "-id")
+
+
+class ConversationCursorPagination(CursorPagination):
+    page_size = 30
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    ordering = ("-last_message_at", "-id")
+
+
 
 from django.db.models import Q, Min
 from django.core.paginator import Paginator
@@ -607,6 +682,7 @@ from rest_framework.response import Response
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@read_from_replica
 def list_products(request):
     products = Product.objects.all().order_by("-created_at")
 
@@ -626,12 +702,7 @@ def list_products(request):
         products = products.filter(brand__iexact=brand)
 
     if search:
-        products = products.filter(
-            Q(name__icontains=search)
-            | Q(description__icontains=search)
-            | Q(brand__icontains=search)
-            | Q(ref_no__icontains=search)
-        )
+        products = products.filter(catalog_search_q(search))
 
     if min_price or max_price:
         products = products.annotate(
@@ -660,7 +731,9 @@ def list_products(request):
         products = products.order_by("-created_at", "-id")
 
     elif sort == "popular":
-        products = products.order_by("-id")
+        # Products without a stats row yet (new, or before
+        # rebuild_product_stats) sort last instead of dropping out.
+        products = products.order_by(F("stats__popularity").desc(nulls_last=True), "-id")
 
     else:
         products = products.order_by("-created_at", "-id")
@@ -677,6 +750,35 @@ def list_products(request):
     return paginator.get_paginated_response(serializer.data)
 
 
+@api_view(["GET"])
+@permission_classes([AllowAny])
+@read_from_replica
+def product_facets(request):
+    """
+    Facet counts for the product grid. Takes the same filters as
+    list_products (category, brand, min_price, max_price, search).
+    """
+    seller_id = None
+    if request.user.is_authenticated and request.user.role == "seller":
+        seller_id = request.user.id
+
+    return Response(compute_product_facets(request.GET, seller_id=seller_id))
+
+
+@api_view(["GET"])
+@permission_classes([AllowAny])
+@read_from_replica
+def product_detail(request, pk):
+    """
+    Everything the product page needs: product and variants, seller business
+    details, rating summary, recent reviews and similar products.
+    """
+    data = get_product_detail(pk, request)
+    if data is None:
+        return Response({"error": "Product not found"}, status=404)
+    return Response(data)
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 @parser_classes([MultiPartParser, FormParser, JSONParser])
@@ -774,6 +876,12 @@ def upload_products(request):
         except InvalidOperation:
             return None
 
+    def to_code(value):
+        # Numeric cells arrive as 29011000.0; identifiers are text.
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)
+        return None if value is None else str(value).strip()
+
     valid_categories = [c[0] for c in CATEGORIES]
 
     product_cache = {}
@@ -825,9 +933,9 @@ def upload_products(request):
                             "ref_no": ref_no,
                             "description": get(row, "description"),
                             "category": category,
-                            "hsn": get(row, "hsn"),
+                            "hsn": to_code(get(row, "hsn")),
                             "brand": get(row, "brand"),
-                            "cas_no": get(row, "cas_no"),
+                            "cas_no": to_code(get(row, "cas_no")),
                             "gst": gst_value,
                         }
 
@@ -897,6 +1005,37 @@ def upload_products(request):
     )
 
 
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser, FormParser])
+def import_product_images(request):
+    """
+    Attach images to many products at once from a ZIP whose file names are
+    ref_nos (e.g. "ACS-500.jpg"). Processing runs in the background; poll
+    the returned job for progress and the per-file report.
+    """
+    if request.user.role != "seller":
+        return Response({"detail": "Only sellers can import product images."}, status=403)
+
+    archive = request.FILES.get("file")
+    if not archive:
+        return Response({"detail": "No file uploaded."}, status=400)
+
+    try:
+        job = create_image_import_job(request.user, archive)
+    except ValueError as e:
+        return Response({"detail": str(e)}, status=400)
+
+    return Response(ImageImportJobSerializer(job).data, status=202)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def image_import_status(request, job_id):
+    job = get_object_or_404(ImageImportJob, pk=job_id, seller=request.user)
+    return Response(ImageImportJobSerializer(job).data)
+
+
 @api_view(["PUT"])
 @permission_classes([IsAuthenticated])
 @parser_classes([MultiPartParser, FormParser, JSONParser])
@@ -950,44 +1089,19 @@ def delete_product(request, pk):
 @permission_classes([IsAuthenticated])
 def add_recent_view(request, product_id):
 
-    user = request.user
-
-    try:
-        product = Product.objects.get(id=product_id)
-    
-    except Product.DoesNotExist:
+    if not Product.objects.filter(id=product_id).exists():
         return Response({"error": "Product not found"}, status=404)
 
-    # Create or update timestamp
-    entry, created = RecentlyViewed.objects.update_or_create(
-        user=user,
-        product=product,
-        defaults={"viewed_at": timezone.now()}
-    )
-
-    # Keep only last 20 items
-    recent_ids = (
-        RecentlyViewed.objects.filter(user=user)
-        .order_by("-viewed_at")
-        .values_list("id", flat=True)[:20]
-    )
-
-    RecentlyViewed.objects.filter(user=user).exclude(id__in=list(recent_ids)).delete()
+    # Buffered; written (and trimmed to the last 20) in bulk shortly after.
+    record_recent_view(request.user.id, product_id)
+    record_product_event("view", product_id)
 
     return Response({"message": "Added to recently viewed"})
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def get_recently_viewed(request):
-    user = request.user
-
-    items = (
-        RecentlyViewed.objects
-        .filter(user=user)
-        .select_related("product", "product__seller", "product__seller__seller_profile")
-        .prefetch_related("product__variants", "product__reviews")
-        .order_by("-viewed_at")
-    )
+    items = recent_views_for(request.user)
 
     paginator = ProductPagination()
     page = paginator.paginate_queryset(items, request)
@@ -1002,6 +1116,7 @@ def get_recently_viewed(request):
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@read_from_replica
 def recommended_products(request):
     qs = (
         Product.objects
@@ -1054,7 +1169,9 @@ def add_to_cart(request):
 
     if not created:
         item.quantity = quantity
-    item.save()
+        item.save()
+    else:
+        record_product_event("cart_add", product.id)
 
     return Response(CartItemSerializer(item).data, status=201)
 
@@ -1103,6 +1220,7 @@ def add_to_wishlist(request):
     obj, created = WishlistItem.objects.get_or_create(user=request.user, product=product)
     if not created:
         return Response({"detail": "Already in wishlist"})
+    record_product_event("wishlist_add", product.id)
     return Response(WishlistItemSerializer(obj).data, status=201)
 
 @api_view(["DELETE"])
@@ -1170,6 +1288,7 @@ def place_order(request):
             # CREATE ORDER (ONE PER SELLER)
             order = Order.objects.create(
                 buyer=buyer,
+                seller=seller,
                 address=address,
                 status="pending",
             )
@@ -1200,21 +1319,21 @@ def place_order(request):
             # ------------------------------------------------
             # 🔔 SELLER NOTIFICATION + EMAIL
             # ------------------------------------------------
-            Notification.objects.create(
-                user=seller,
-                message=f"You received a new order #{order.id}."
-            )
-            send_seller_new_order_email(seller.email, order)
+            notify(seller, "new_order", order_id=order.id, buyer_email=buyer.email)
 
         # ----------------------------------------------------
         # 🔔 BUYER NOTIFICATION + EMAIL (PER ORDER)
         # ----------------------------------------------------
         for order in created_orders:
-            Notification.objects.create(
-                user=buyer,
-                message=f"Your order #{order.id} has been placed successfully!"
+            notify(
+                buyer, "order_placed",
+                order_id=order.id, total_price=order.total_price, status=order.status,
             )
-            send_order_confirmation_email(buyer.email, order)
+
+        OrderEvent.objects.bulk_create([
+            OrderEvent(order=order, event_type="placed", to_status=order.status, actor=buyer)
+            for order in created_orders
+        ])
 
         # ----------------------------------------------------
         # 🧹 CLEAR CART ONCE
@@ -1229,97 +1348,231 @@ def place_order(request):
     )
 
 
+# What OrderSerializer walks: items with product (seller, variants, reviews
+# for the rating fields) and variant.
+FULL_ORDER_PREFETCH = (
+    "items__variant",
+    "items__product__seller",
+    "items__product__variants",
+    "items__product__reviews",
+)
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def view_orders(request):
+    """
+    Buyer order history. A plain list of full orders (items, invoice), or
+    with ?cursor= / ?page_size= one cursor page of order headers with item
+    counts and up to three product thumbnails.
+    """
+    if not wants_page(request):
+        orders = (
+            Order.objects.filter(buyer=request.user)
+            .select_related("invoice__buyer", "invoice__seller")
+            .prefetch_related(*FULL_ORDER_PREFETCH)
+            .order_by("-created_at", "-id")
+        )
+        return Response(OrderSerializer(orders, many=True, context={"request": request}).data)
+
     orders = (
         Order.objects.filter(buyer=request.user)
-        .prefetch_related("items__variant", "items__product")
-        .select_related("invoice")   
+        .select_related("seller")
+        .annotate(item_count=Count("items"))
+        .prefetch_related(
+            Prefetch(
+                "items",
+                queryset=OrderItem.objects.select_related("product")
+                .only("id", "order_id", "product_id", "product__image", "product__image_renditions")
+                .order_by("id")[:3],
+                to_attr="preview_items",
+            )
+        )
     )
-    return Response(OrderSerializer(orders, many=True).data)
+
+    paginator = OrderCursorPagination()
+    page = paginator.paginate_queryset(orders, request)
+    serializer = OrderHeaderSerializer(page, many=True, context={"request": request})
+    return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def order_detail(request, order_id):
+    """
+    Full expansion of a single order (items, products, variants, invoice)
+    for its buyer or seller.
+    """
+    order = get_object_or_404(
+        Order.objects
+        .filter(Q(buyer=request.user) | seller_orders_q(request.user))
+        .select_related("invoice__buyer", "invoice__seller")
+        .prefetch_related(*FULL_ORDER_PREFETCH),
+        pk=order_id,
+    )
+    return Response(OrderSerializer(order, context={"request": request}).data)
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def seller_orders(request):
     """
-    Lists all orders that contain products belonging to the seller.
+    Lists the seller's orders, newest first. A plain list of full orders,
+    or one cursor page of compact rows with ?cursor= / ?page_size=.
+
+    Optional filters:
+    - status=pending,processing   (comma-separated)
+    - from=YYYY-MM-DD / to=YYYY-MM-DD   (inclusive, on created_at)
     """
+    orders = Order.objects.filter(seller_orders_q(request.user))
+
+    statuses = [s for s in request.GET.get("status", "").split(",") if s]
+    if statuses:
+        valid_statuses = {choice[0] for choice in Order.STATUS_CHOICES}
+        invalid = [s for s in statuses if s not in valid_statuses]
+        if invalid:
+            return Response({"error": f"Invalid status: {', '.join(invalid)}"}, status=400)
+        orders = orders.filter(status__in=statuses)
+
+    # Compare created_at against datetime bounds (not __date) so the
+    # (seller, status, -created_at) index can serve the range.
+    for param, lookup, offset in (("from", "created_at__gte", 0), ("to", "created_at__lt", 1)):
+        raw = request.GET.get(param)
+        if not raw:
+            continue
+        try:
+            day = parse_date(raw)
+        except ValueError:
+            day = None
+        if day is None:
+            return Response({"error": f"'{param}' must be a date (YYYY-MM-DD)"}, status=400)
+        bound = datetime.combine(day + timedelta(days=offset), datetime.min.time())
+        orders = orders.filter(**{lookup: timezone.make_aware(bound)})
+
+    if not wants_page(request):
+        orders = (
+            orders
+            .select_related("invoice__buyer", "invoice__seller")
+            .prefetch_related(*FULL_ORDER_PREFETCH)
+            .order_by("-created_at", "-id")
+        )
+        return Response(OrderSerializer(orders, many=True, context={"request": request}).data)
+
     orders = (
-        Order.objects.filter(items__product__seller=request.user)
-        .distinct()
-        .prefetch_related("items__product", "items__variant")
-        .order_by("-created_at")
+        orders
+        .select_related("buyer", "invoice__buyer", "invoice__seller")
+        .prefetch_related(
+            Prefetch(
+                "items",
+                queryset=OrderItem.objects.select_related("product", "variant").only(
+                    "id", "order_id", "product_id", "variant_id", "quantity", "price",
+                    "product__name", "product__ref_no", "variant__variant_label",
+                ),
+            )
+        )
     )
-    return Response(OrderSerializer(orders, many=True).data, status=200)
+
+    paginator = OrderCursorPagination()
+    page = paginator.paginate_queryset(orders, request)
+    serializer = SellerOrderSerializer(page, many=True, context={"request": request})
+    return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def order_timeline(request, order_id):
+    """
+    Chronological event log for an order (buyer or seller only).
+    """
+    visible = Order.objects.filter(
+        Q(buyer=request.user) | seller_orders_q(request.user), pk=order_id
+    ).exists()
+    if not visible:
+        return Response({"error": "Order not found"}, status=404)
+
+    events = (
+        OrderEvent.objects.filter(order_id=order_id)
+        .select_related("actor")
+        .order_by("created_at", "id")
+    )
+    return Response(OrderEventSerializer(events, many=True).data)
 
 
 @api_view(["PATCH"])
 @permission_classes([IsAuthenticated])
 def update_order_status(request, order_id):
     try:
-        order = Order.objects.prefetch_related("items__product__seller").get(id=order_id)
+        order = Order.objects.select_related("buyer", "seller").get(id=order_id)
     except Order.DoesNotExist:
         return Response({"error": "Order not found"}, status=404)
 
-    if request.user not in [i.product.seller for i in order.items.all()]:
+    if not is_order_seller(request.user, order):
         return Response({"error": "Not authorized"}, status=403)
 
-    new_status = request.data.get("status")
-
-    
-    if new_status == "delivered":
-        otp = generate_otp()
-        order.delivery_otp = otp
-        order.is_delivered_verified = False
-        order.status = "delivered"
-        order.save()
-
-        # EMAIL: OTP
-        send_delivery_otp_email(order.buyer.email, otp)
-
-        # IN-APP: Buyer
-        Notification.objects.create(
-            user=order.buyer,
-            message=f"Your order #{order.id} is marked delivered. OTP sent."
-        )
+    serializer = OrderStatusUpdateSerializer(order, data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=400)
 
-        # IN-APP: Seller
-        Notification.objects.create(
-            user=request.user,
-            message=f"OTP sent to buyer for order #{order.id}."
-        )
+    new_status = serializer.validated_data["status"]
+    try:
+        transition(order, new_status, actor=request.user)
+    except InvalidTransition as e:
+        return Response({"error": str(e)}, status=400)
 
+    if new_status == "delivered":
         return Response({
             "message": f"Order #{order.id} marked as delivered. OTP sent."
         }, status=200)
 
+    return Response({"message": f"Order #{order.id} status updated."}, status=200)
 
-    # General status updates
-    serializer = OrderStatusUpdateSerializer(order, data=request.data, partial=True)
-    if serializer.is_valid():
-        serializer.save()
 
-        # IN-APP: Buyer
-        Notification.objects.create(
-            user=order.buyer,
-            message=f"Your order #{order.id} status updated to '{order.status}'."
-        )
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def bulk_update_order_status(request):
+    """
+    Move many of the seller's orders to one status in a single transaction.
 
-        # EMAIL: Buyer
-        send_order_status_update_email(order.buyer.email, order)
+    Body: {"order_ids": [1, 2, 3], "status": "shipped"}
+    Returns a per-order result list.
+    """
+    if request.user.role != "seller":
+        return Response({"error": "Only sellers can update orders."}, status=403)
 
-        # IN-APP: Seller
-        for seller in {i.product.seller for i in order.items.all()}:
-            Notification.objects.create(
-                user=seller,
-                message=f"Order #{order.id} status updated to '{order.status}'."
-            )
+    order_ids = request.data.get("order_ids")
+    if not isinstance(order_ids, list) or not order_ids:
+        return Response({"error": "order_ids must be a non-empty list"}, status=400)
+    if len(order_ids) > MAX_BULK_ORDERS:
+        return Response({"error": f"At most {MAX_BULK_ORDERS} orders per request"}, status=400)
 
-        return Response({"message": f"Order #{order.id} status updated."}, status=200)
+    try:
+        order_ids = [int(i) for i in order_ids]
+    except (TypeError, ValueError):
+        return Response({"error": "order_ids must be integers"}, status=400)
 
-    return Response(serializer.errors, status=400)
+    new_status = request.data.get("status")
+    if new_status not in SELLER_SETTABLE:
+        return Response({"error": f"Sellers cannot set status '{new_status}'."}, status=400)
+
+    done, failures = transition_many(
+        Order.objects.filter(seller_orders_q(request.user), id__in=order_ids),
+        new_status,
+        actor=request.user,
+    )
+    done_ids = {o.id for o in done}
+
+    results = []
+    for oid in dict.fromkeys(order_ids):
+        if oid in done_ids:
+            results.append({"order_id": oid, "success": True, "status": new_status})
+        else:
+            results.append({
+                "order_id": oid,
+                "success": False,
+                "error": failures.get(oid, "Order not found"),
+            })
+
+    return Response({"updated": len(done_ids), "results": results}, status=200)
 
 
 @api_view(["POST"])
@@ -1331,25 +1584,20 @@ def verify_delivery_otp(request, order_id):
     entered_otp = request.data.get("otp")
 
     try:
-        order = Order.objects.get(id=order_id)
+        order = Order.objects.select_related("buyer", "seller").get(id=order_id)
     except Order.DoesNotExist:
         return Response({"error": "Order not found"}, status=404)
 
-    if request.user not in [i.product.seller for i in order.items.all()]:
+    if not is_order_seller(request.user, order):
         return Response({"error": "Not authorized"}, status=403)
 
-    if order.delivery_otp != entered_otp:
+    if not order.delivery_otp or order.delivery_otp != entered_otp:
         return Response({"error": "Invalid OTP"}, status=400)
 
-    order.status = "completed"
-    order.is_delivered_verified = True
-    order.delivery_otp = None
-    order.save()
-
-    Notification.objects.create(
-        user=order.buyer,
-        message=f"Your order #{order.id} has been successfully delivered!"
-    )
+    try:
+        transition(order, "completed", actor=request.user)
+    except InvalidTransition as e:
+        return Response({"error": str(e)}, status=400)
 
     return Response({
         "message": "OTP verified. Order completed.",
@@ -1363,43 +1611,22 @@ def upload_invoice(request, order_id):
     user = request.user
 
     try:
-        order = Order.objects.get(id=order_id)
+        order = Order.objects.select_related("buyer", "seller").get(id=order_id)
     except Order.DoesNotExist:
         return Response({"detail": "Order not found"}, status=404)
 
-    if user.role != "seller":
-        return Response({"detail": "Only sellers can upload invoices."}, status=403)
+    if user.role != "seller" or not is_order_seller(user, order):
+        return Response({"detail": "Only the order's seller can upload invoices."}, status=403)
     
     if not request.FILES.get("pdf"):
         return Response({"detail": "Please attach invoice PDF."}, status=400)
 
-    pdf_file = request.FILES["pdf"]
-
-    invoice, created = Invoice.objects.get_or_create(
-        order=order,
-        defaults={
-            "buyer": order.buyer,
-            "seller": user,
-            "subtotal": order.total_price,
-            "total_amount": order.total_price,
-            "tax_amount": 0,
-            "address": order.address,
-        }
-    )
-
-    invoice.pdf_file = pdf_file
-    invoice.status = "issued"
-    invoice.save()
-
-    Notification.objects.create(
-        user=order.buyer,
-        message=f"Invoice uploaded for Order #{order.id}"
-    )
+    invoice = attach_invoice(order, user, request.FILES["pdf"])
 
     return Response(
         {
             "message": "Invoice uploaded successfully",
-            "invoice_url": invoice.pdf_file.url,
+            "invoice_url": signed_media_url(invoice.pdf_file.name, user, request),
         }
     )
 
@@ -1414,54 +1641,86 @@ def add_review(request, product_id):
     POST → Submit review for a specific product variant.
     """
     product = get_object_or_404(Product, pk=product_id)
-    variant_id = request.data.get("variant_id")
+    variant_id = (request.GET if request.method == "GET" else request.data).get("variant_id")
 
     if request.method == "GET":
-        eligible = OrderItem.objects.filter(
-            order__buyer=request.user,
-            product=product,
-            variant_id=variant_id,
-            order__status__in=["delivered", "processing"]
-        ).exists()
+        try:
+            eligible = has_purchased(request.user.id, product.id, variant_id)
+        except ValueError:
+            return Response({"detail": "variant_id must be a number."}, status=400)
         return Response({"eligible": eligible})
 
 
     variant = get_object_or_404(ProductVariant, pk=variant_id, product=product)
-    has_purchased = OrderItem.objects.filter(
-        order__buyer=request.user,
-        product=product,
-        variant=variant,
-        order__status__in=["delivered", "processing"]
-    ).exists()
-
-    if not has_purchased:
+    if not has_purchased(request.user.id, product.id, variant.id):
         return Response({"detail": "You can only review purchased variants."}, status=403)
 
+    if Review.objects.filter(product=product, variant=variant, buyer=request.user).exists():
+        return Response({"detail": "You have already reviewed this variant."}, status=400)
+
     data = request.data.copy()
     data["product"] = product.id
-    data["variant"] = variant.id
     serializer = ReviewSerializer(data=data, context={"request": request})
     if serializer.is_valid():
-        serializer.save(buyer=request.user)
-        Notification.objects.create(
-            user=product.seller,
-            message=f"New review for {product.name} ({variant.variant_label})"
+        serializer.save(buyer=request.user, variant=variant)
+        notify(
+            product.seller, "new_review",
+            product_name=product.name, variant_label=variant.variant_label,
         )
         return Response(serializer.data, status=201)
     return Response(serializer.errors, status=400)
 
 
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def review_eligibility(request):
+    """
+    Which variants the buyer may review, for one product (?product_id=) or
+    several (?product_ids=1,2,3), in a single call.
+    """
+    raw = request.GET.get("product_ids") or request.GET.get("product_id") or ""
+    try:
+        product_ids = list(dict.fromkeys(int(pid) for pid in raw.split(",") if pid.strip()))
+    except ValueError:
+        return Response({"detail": "product_ids must be a comma-separated list of ids."}, status=400)
+
+    if not product_ids:
+        return Response({"detail": "product_id or product_ids is required."}, status=400)
+    if len(product_ids) > REVIEW_ELIGIBILITY_MAX_PRODUCTS:
+        return Response(
+            {"detail": f"At most {REVIEW_ELIGIBILITY_MAX_PRODUCTS} products per request."}, status=400
+        )
+
+    result = eligibility_for(request.user.id, product_ids)
+    return Response({
+        "products": [{"product_id": pid, "variants": variants} for pid, variants in result.items()]
+    })
+
+
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@read_from_replica
 def list_reviews(request, product_id):
     """
-    Returns all reviews for a product or a specific variant.
+    Reviews for a product (or one variant with ?variant_id=), newest first:
+    a plain list, or one cursor page with ?cursor= / ?page_size=, which
+    also carries the product's star histogram.
     """
+    qs = Review.objects.filter(product_id=product_id).select_related("buyer", "variant")
     variant_id = request.GET.get("variant_id")
-    qs = Review.objects.filter(product_id=product_id)
     if variant_id:
         qs = qs.filter(variant_id=variant_id)
-    return Response(ReviewSerializer(qs, many=True).data)
+
+    if not wants_page(request):
+        qs = qs.order_by("-created_at", "-id")
+        return Response(ReviewSerializer(qs, many=True).data)
+
+    paginator = ReviewCursorPagination()
+    page = paginator.paginate_queryset(qs, request)
+    response = paginator.get_paginated_response(ReviewSerializer(page, many=True).data)
+
+    response.data["rating"] = rating_summary(ProductStats.objects.filter(product_id=product_id).first())
+    return response
 
 
 # ==========================================================
@@ -1471,10 +1730,27 @@ def list_reviews(request, product_id):
 @permission_classes([IsAuthenticated])
 def get_notifications(request):
     """
-    Retrieve all notifications for the logged-in user.
+    Notification inbox for the logged-in user, newest first: a plain list,
+    or one cursor page with ?cursor= / ?page_size=. ?unread=true limits it
+    to unread notifications.
     """
-    notifications = Notification.objects.filter(user=request.user).order_by("-created_at")
-    return Response(NotificationSerializer(notifications, many=True).data)
+    notifications = Notification.objects.filter(user=request.user)
+    if request.GET.get("unread") in ("1", "true"):
+        notifications = notifications.filter(is_read=False)
+
+    if not wants_page(request):
+        notifications = notifications.order_by("-created_at", "-id")
+        return Response(NotificationSerializer(notifications, many=True).data)
+
+    paginator = NotificationCursorPagination()
+    page = paginator.paginate_queryset(notifications, request)
+    return paginator.get_paginated_response(NotificationSerializer(page, many=True).data)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def unread_notification_count(request):
+    return Response({"unread": get_unread_count(request.user.id)})
 
 
 @api_view(["POST"])
@@ -1483,20 +1759,137 @@ def mark_notification_read(request, pk):
     """
     Mark a single notification as read.
     """
-    try:
-        updated = Notification.objects.filter(
-            pk=pk,
-            user=request.user,
-            is_read=False
-        ).update(is_read=True)
+    updated = Notification.objects.filter(
+        pk=pk,
+        user=request.user,
+        is_read=False
+    ).update(is_read=True)
 
-        if updated == 0:
-            return Response({"detail": "Not found or already read"}, status=404)
+    if updated == 0:
+        return Response({"detail": "Not found or already read"}, status=404)
 
-        return Response({"detail": "Notification marked as read"})
+    adjust_unread_count(request.user.id, -updated)
+    return Response({"detail": "Notification marked as read"})
 
-    except Notification.DoesNotExist:
-        return Response({"detail": "Not found"}, status=404)
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def mark_notifications_read(request):
+    """
+    Bulk mark-read with one UPDATE.
+    Body: {"all": true} or {"up_to_id": <id>} (marks that id and everything older).
+    """
+    qs = Notification.objects.filter(user=request.user, is_read=False)
+
+    up_to_id = request.data.get("up_to_id")
+    if up_to_id is not None:
+        try:
+            qs = qs.filter(id__lte=int(up_to_id))
+        except (TypeError, ValueError):
+            return Response({"error": "up_to_id must be an integer"}, status=400)
+    elif request.data.get("all") is not True:
+        return Response({"error": "Provide 'all': true or 'up_to_id'"}, status=400)
+
+    updated = qs.update(is_read=True)
+    adjust_unread_count(request.user.id, -updated)
+    return Response({"updated": updated, "unread": get_unread_count(request.user.id)})
+
+
+@api_view(["GET", "PUT", "PATCH"])
+@permission_classes([IsAuthenticated])
+def notification_preferences(request):
+    """
+    Per-user channel switches and muted notification kinds.
+    """
+    pref, _ = NotificationPreference.objects.get_or_create(user=request.user)
+
+    if request.method == "GET":
+        return Response(NotificationPreferenceSerializer(pref).data)
+
+    serializer = NotificationPreferenceSerializer(
+        pref, data=request.data, partial=request.method == "PATCH"
+    )
+    if serializer.is_valid():
+        serializer.save()
+        return Response(serializer.data)
+    return Response(serializer.errors, status=400)
+
+
+# ==========================================================
+# NOTIFICATIONS — LIVE STREAM (Server-Sent Events)
+# ==========================================================
+# Async view: run under the ASGI app (Linkzur_backend.asgi) so each open
+# stream costs a coroutine rather than a worker. Under WSGI Django would
+# drain the endless iterator before responding and pin the worker, so the
+# stream refuses to start there.
+SSE_HEARTBEAT_SECONDS = 15
+SSE_BACKLOG_LIMIT = 100
+
+
+def _sse_event(payload):
+    return f"id: {payload['id']}\nevent: {payload['type']}\ndata: {json.dumps(payload)}\n\n"
+
+
+async def _stream_user(request):
+    """
+    EventSource cannot send headers, so the JWT may also come as ?token=.
+    """
+    raw = request.GET.get("token")
+    header = request.headers.get("Authorization", "")
+    if not raw and header.startswith("Bearer "):
+        raw = header.split(" ", 1)[1]
+    return await sync_to_async(authenticate_token)(raw)
+
+
+@require_GET
+async def notification_stream(request):
+    """
+    Pushes new notifications as they are created. On reconnect the browser
+    sends Last-Event-ID and anything missed in between is replayed first.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"detail": "Live notifications need the ASGI server (Linkzur_backend.asgi)."}, status=501
+        )
+
+    user = await _stream_user(request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided."}, status=401)
+
+    last_event_id = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    last_seen = int(last_event_id) if last_event_id and last_event_id.isdigit() else None
+
+    async def events():
+        # Subscribe before reading the backlog so nothing falls in between.
+        subscription = get_broker().subscribe(user_channel(user.id))
+        seen = last_seen
+        try:
+            yield "retry: 5000\n\n"
+
+            if seen is not None:
+                backlog = await sync_to_async(list)(
+                    Notification.objects.filter(user=user, id__gt=seen)
+                    .order_by("id")[:SSE_BACKLOG_LIMIT]
+                )
+                for n in backlog:
+                    yield _sse_event(notification_payload(n))
+                    seen = n.id
+
+            while True:
+                message = await subscription.get(timeout=SSE_HEARTBEAT_SECONDS)
+                if message is None:
+                    yield ": ping\n\n"
+                    continue
+                if seen is not None and message["id"] <= seen:
+                    continue
+                yield _sse_event(message)
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
 
 
 # ==========================================================
@@ -1529,9 +1922,10 @@ def request_quotation_preproduct(request, product_id):
 
     if created:
         variant_text = f" (Variant: {variant.variant_label})" if variant else ""
-        Notification.objects.create(
-            user=seller,
-            message=f"Buyer {request.user.name} requested a quotation for {product.name}{variant_text} (Qty: {quantity})."
+        notify(
+            seller, "quotation_requested",
+            buyer_name=request.user.name, product_name=product.name,
+            variant_text=variant_text, quantity=quantity,
         )
 
     serializer = QuotationRequestSerializer(req, context={"request": request})
@@ -1587,14 +1981,10 @@ def upload_quotation_for_request(request, request_id):
         )
 
         if serializer.is_valid():
-            quotation = serializer.save(uploaded_by=request.user)
-
-            qreq.is_resolved = True
-            qreq.save()
-
-            Notification.objects.create(
-                user=qreq.buyer,
-                message=f"Seller {request.user.name} uploaded a quotation for {qreq.product.name}."
+            quotation = attach_quotation(
+                qreq, request.user,
+                serializer.validated_data["file"],
+                serializer.validated_data.get("note", ""),
             )
 
             return Response(
@@ -1642,9 +2032,9 @@ def start_or_get_conversation(request):
     )
 
     if created:
-        Notification.objects.create(
-            user=product.seller,
-            message=f"New conversation started on {product.name} by {order.buyer.name}."
+        notify(
+            product.seller, "conversation_started",
+            product_name=product.name, buyer_name=order.buyer.name,
         )
 
     return Response(ProductConversationSerializer(conv, context={"request": request}).data, status=201 if created else 200)
@@ -1654,33 +2044,116 @@ def start_or_get_conversation(request):
 @permission_classes([IsAuthenticated])
 def list_conversations_for_user(request):
     """
-    Fetch all conversations for a user (buyer or seller).
+    Chat inbox for a user (buyer or seller), most recently active first: a
+    plain list of conversations, or with ?cursor= / ?page_size= one cursor
+    page of compact inbox rows (counterpart, preview, unread count).
     """
     if request.user.role == "buyer":
-        qs = ProductConversation.objects.filter(buyer=request.user).select_related("product", "seller", "order")
+        qs = ProductConversation.objects.filter(buyer=request.user)
     else:
-        qs = ProductConversation.objects.filter(seller=request.user).select_related("product", "buyer", "order")
+        qs = ProductConversation.objects.filter(seller=request.user)
+    qs = qs.select_related("product", "buyer", "seller")
+
+    if not wants_page(request):
+        qs = qs.prefetch_related("product__variants", "product__reviews").order_by("-last_message_at", "-id")
+        return Response(ProductConversationSerializer(qs, many=True, context={"request": request}).data)
+
+    paginator = ConversationCursorPagination()
+    page = paginator.paginate_queryset(qs, request)
+    serializer = ConversationInboxSerializer(page, many=True, context={"request": request})
+    return paginator.get_paginated_response(serializer.data)
+
 
-    return Response(ProductConversationSerializer(qs, many=True, context={"request": request}).data)
+MESSAGE_PAGE_SIZE = 50
+MAX_MESSAGE_PAGE_SIZE = 100
 
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def list_messages(request, conversation_id):
     """
-    Fetch all messages in a specific conversation.
+    Messages of a conversation, oldest first, read via the (conversation, id) index.
+      - default            → the whole thread as a plain list
+      - ?limit=<n>         → the latest n messages as a window
+      - ?since_id=<id>     → messages newer than id (incremental sync)
+      - ?before_id=<id>    → messages older than id (scrolling back)
+    Windows come back as {results, has_more, ...read pointers}. Messages
+    returned count as read by the caller.
     """
     conv = get_object_or_404(ProductConversation, pk=conversation_id)
-    if request.user not in [conv.buyer, conv.seller] and not request.user.is_staff:
+    if not is_participant(request.user, conv):
         return Response({"detail": "Unauthorized"}, status=403)
 
-    messages = conv.messages.all().order_by("created_at")
-    serializer = ProductMessageSerializer(messages, many=True, context={"request": request})
+    # The shipped frontend expects the full list; windows are opt-in.
+    if not any(param in request.GET for param in ("limit", "since_id", "before_id")):
+        messages = list(conv.messages.select_related("sender").order_by("id"))
+        if messages:
+            mark_read(conv, request.user, up_to_id=messages[-1].id)
+        serializer = ProductMessageSerializer(
+            messages, many=True, context={"request": request, "conversation": conv}
+        )
+        return Response(serializer.data)
 
-    # Mark unread messages as read
-    conv.messages.filter(is_read=False).exclude(sender=request.user).update(is_read=True)
+    try:
+        limit = min(int(request.GET.get("limit", MESSAGE_PAGE_SIZE)), MAX_MESSAGE_PAGE_SIZE)
+        since_id = request.GET.get("since_id")
+        before_id = request.GET.get("before_id")
+        since_id = int(since_id) if since_id else None
+        before_id = int(before_id) if before_id else None
+    except ValueError:
+        return Response({"error": "limit, since_id and before_id must be integers"}, status=400)
+    if limit < 1:
+        return Response({"error": "limit must be positive"}, status=400)
+
+    qs = conv.messages.select_related("sender")
+    if since_id is not None:
+        window = list(qs.filter(id__gt=since_id).order_by("id")[:limit + 1])
+        has_more = len(window) > limit
+        window = window[:limit]
+    else:
+        if before_id is not None:
+            qs = qs.filter(id__lt=before_id)
+        window = list(qs.order_by("-id")[:limit + 1])
+        has_more = len(window) > limit
+        window = window[:limit][::-1]
+
+    # The pointer only moves forward, so older pages never un-read anything.
+    if window:
+        mark_read(conv, request.user, up_to_id=window[-1].id)
+
+    serializer = ProductMessageSerializer(
+        window, many=True, context={"request": request, "conversation": conv}
+    )
+    return Response({
+        "results": serializer.data,
+        "has_more": has_more,
+        "buyer_last_read_id": conv.buyer_last_read_id,
+        "seller_last_read_id": conv.seller_last_read_id,
+    })
 
-    return Response(serializer.data)
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def mark_conversation_read(request, conversation_id):
+    """
+    Body (optional): {"up_to_id": <id>}. Defaults to the newest message.
+    """
+    conv = get_object_or_404(ProductConversation, pk=conversation_id)
+    if not is_participant(request.user, conv):
+        return Response({"detail": "Unauthorized"}, status=403)
+
+    up_to_id = request.data.get("up_to_id")
+    if up_to_id is not None:
+        try:
+            up_to_id = int(up_to_id)
+        except (TypeError, ValueError):
+            return Response({"error": "up_to_id must be an integer"}, status=400)
+
+    mark_read(conv, request.user, up_to_id)
+    return Response({
+        "buyer_last_read_id": conv.buyer_last_read_id,
+        "seller_last_read_id": conv.seller_last_read_id,
+    })
 
 
 @api_view(["POST"])
@@ -1690,8 +2163,10 @@ def send_message(request, conversation_id):
     """
     Send a new message within a product conversation.
     """
-    conv = get_object_or_404(ProductConversation, pk=conversation_id)
-    if request.user not in [conv.buyer, conv.seller] and not request.user.is_staff:
+    conv = get_object_or_404(
+        ProductConversation.objects.select_related("product", "buyer", "seller"), pk=conversation_id
+    )
+    if not is_participant(request.user, conv):
         return Response({"detail": "Unauthorized"}, status=403)
 
     data = request.data.copy()
@@ -1700,19 +2175,124 @@ def send_message(request, conversation_id):
 
     if serializer.is_valid():
         msg = serializer.save(sender=request.user)
-        other_user = conv.seller if request.user == conv.buyer else conv.buyer
-        Notification.objects.create(
-            user=other_user,
-            message=f"New message on {conv.product.name} from {request.user.name}."
+        message_sent(conv, msg)
+        return Response(
+            ProductMessageSerializer(msg, context={"request": request, "conversation": conv}).data,
+            status=201,
         )
-        return Response(ProductMessageSerializer(msg, context={"request": request}).data, status=201)
 
     return Response(serializer.errors, status=400)
 
 
+# ==========================================================
+# CHUNKED UPLOADS (chat attachments, quotations, invoices)
+# ==========================================================
+# init → PUT chunks (raw bytes, Content-Range) → complete. The request body
+# is streamed straight to disk, never parsed into memory.
+CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+def _upload_state(session):
+    return {
+        "upload_id": str(session.id),
+        "purpose": session.purpose,
+        "target_id": session.target_id,
+        "filename": session.filename,
+        "total_size": session.total_size,
+        "received_bytes": session.received_bytes,
+        "status": session.status,
+        "result": session.result,
+    }
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def start_upload(request):
+    """
+    Body: {"purpose": "chat_attachment" | "quotation" | "invoice",
+           "target_id": <conversation / quotation request / order id>,
+           "filename": "...", "total_size": <bytes>, "sha256": "<hex>"}
+    """
+    try:
+        session = start_session(
+            request.user,
+            request.data.get("purpose"),
+            request.data.get("target_id"),
+            request.data.get("filename"),
+            request.data.get("total_size"),
+            request.data.get("sha256"),
+        )
+    except UploadError as e:
+        return Response({"error": str(e)}, status=e.status)
+
+    return Response(
+        {**_upload_state(session), "max_chunk_size": settings.CHUNKED_UPLOAD_MAX_CHUNK},
+        status=201,
+    )
+
+
+@api_view(["GET", "PUT", "DELETE"])
+@permission_classes([IsAuthenticated])
+def upload_session(request, upload_id):
+    """
+    GET    → progress (resume from received_bytes)
+    PUT    → one chunk as the raw request body. Optional headers:
+             Content-Range: bytes <start>-<end>/<total>, X-Chunk-SHA256
+    DELETE → abort and discard
+    """
+    try:
+        if request.method == "GET":
+            session = UploadSession.objects.filter(pk=upload_id, user=request.user).first()
+            if session is None:
+                return Response({"error": "Upload not found"}, status=404)
+            return Response(_upload_state(session))
+
+        if request.method == "DELETE":
+            abort_session(upload_id, request.user)
+            return Response(status=204)
+
+        try:
+            length = int(request.META.get("CONTENT_LENGTH") or 0)
+        except ValueError:
+            return Response({"error": "Invalid Content-Length"}, status=400)
+
+        offset = None
+        content_range = request.headers.get("Content-Range")
+        if content_range:
+            match = CONTENT_RANGE_RE.match(content_range.strip())
+            if not match or int(match.group(2)) - int(match.group(1)) + 1 != length:
+                return Response({"error": "Content-Range does not match the body"}, status=400)
+            offset = int(match.group(1))
+
+        session = write_chunk(
+            upload_id, request.user, offset, length,
+            request._request, request.headers.get("X-Chunk-SHA256"),
+        )
+    except UploadError as e:
+        return Response({"error": str(e)}, status=e.status)
+
+    return Response(_upload_state(session))
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def complete_upload(request, upload_id):
+    """
+    Verify the assembled file and attach it. Optional body fields are passed
+    to the target: "text" for chat attachments, "note" for quotations.
+    """
+    try:
+        session = complete_session(upload_id, request.user, dict(request.data.items()))
+    except UploadError as e:
+        return Response({"error": str(e)}, status=e.status)
+
+    return Response(_upload_state(session), status=201)
+
+
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@read_from_replica
 def search_products(request):
     query = request.GET.get("q", "").strip()
     city = request.GET.get("city", "").strip()
@@ -1723,22 +2303,16 @@ def search_products(request):
             status=400
         )
 
-    is_cas_no = bool(re.match(r"^\d{2,7}-\d{2}-\d$", query))
-
-    filters = Q()
+    city_q = Q(seller__seller_profile__city__iexact=city) if city else Q()
 
-    if is_cas_no:
-        filters &= Q(cas_no__icontains=query)
-    else:
-        filters &= (
-            Q(name__icontains=query)
-            | Q(ref_no__icontains=query)
-            | Q(hsn__icontains=query)
-            | Q(cas_no__icontains=query)
-        )
-
-    if city:
-        filters &= Q(seller__seller_profile__city__iexact=city)
+    # Identifiers are stored normalized: an identifier-looking query first
+    # runs as its own indexed equality / prefix query. Only when that finds
+    # nothing (e.g. "50" in a product name) does it fall back to the
+    # icontains scan over name and ref_no.
+    filters = identifier_q(query)
+    if filters is None or not Product.objects.filter(filters, city_q).exists():
+        filters = Q(name__icontains=query) | Q(ref_no__icontains=query)
+    filters &= city_q
 
     products = (
         Product.objects
@@ -1767,11 +2341,29 @@ def search_products(request):
 
 
 
+@api_view(["GET"])
+@permission_classes([AllowAny])
+def suggest_products(request):
+    """
+    Typeahead: ?q=<prefix>&limit=<n>. Matches the start of product names
+    (or any word in them), brands, ref_nos and CAS numbers, most popular
+    first. Served from an in-memory index; no query per keystroke.
+    """
+    query = request.GET.get("q", "")
+    try:
+        limit = min(max(int(request.GET.get("limit", 8)), 1), SUGGEST_MAX_LIMIT)
+    except ValueError:
+        limit = 8
+
+    return Response({"query": query, "results": get_suggest_index().suggest(query, limit)})
+
+
 # ==========================================================
 # SELLER DASHBOARD — STATS
 # ==========================================================
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@read_from_replica
 def seller_dashboard_stats(request):
 
     if request.user.role != "seller":
@@ -1875,6 +2467,7 @@ def seller_dashboard_stats(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@read_from_replica
 def seller_sales_trends(request):
 
     if request.user.role != "seller":
@@ -1946,6 +2539,7 @@ def seller_sales_trends(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@read_from_replica
 def seller_product_performance(request):
 
     if request.user.role != "seller":
@@ -2072,6 +2666,7 @@ def seller_product_performance(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@read_from_replica
 def seller_customer_insights(request):
 
     if request.user.role != "seller":
@@ -2129,6 +2724,7 @@ from rest_framework.permissions import AllowAny
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@read_from_replica
 def top_discount_products(request):
     qs = (
         Product.objects
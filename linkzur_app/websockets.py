@@ -0,0 +1,206 @@
+"""
+WebSocket endpoints served by the ASGI app (see Linkzur_backend/asgi.py).
+
+    ws[s]://<host>/ws/conversations/<conversation_id>/?token=<jwt>[&last_id=<id>]
+
+Authorization is checked once, at connect time. After that the socket carries
+JSON frames in both directions:
+
+    client -> server
+        {"type": "message", "text": "...", "client_id": "..."}
+        {"type": "typing"}
+        {"type": "read", "up_to_id": 123}      (up_to_id optional)
+        {"type": "ping"}
+
+    server -> client
+        {"type": "ready", ...}                  once, after accept
+        {"type": "message", ...}                same shape as utils.chat.message_payload
+        {"type": "ack", "client_id": ..., "id": ...}
+        {"type": "typing", "user_id": ...}
+        {"type": "read", "reader_id": ..., "up_to_id": ...}
+        {"type": "pong"} / {"type": "error", "error": "..."}
+
+The REST endpoints under api/conversations/ stay the fallback: messages sent
+there are pushed to connected sockets too.
+
+Frames reach the other participant through utils.pubsub. Their socket may be
+held by another worker, so running more than one worker needs REDIS_URL
+(RedisBroker); the in-process broker only serves a single worker.
+"""
+import asyncio
+import json
+import logging
+import re
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+
+from .utils.chat import (
+    MAX_MESSAGE_LENGTH, for_viewer, get_conversation_for, mark_read, message_payload, post_message,
+)
+from .utils.pubsub import conversation_channel, get_broker
+from .utils.realtime import authenticate_token
+
+logger = logging.getLogger(__name__)
+
+CONVERSATION_PATH = re.compile(r"^/ws/conversations/(?P<conversation_id>\d+)/?$")
+BACKLOG_LIMIT = 100
+
+# Close codes in the 4000-4999 range are application defined.
+CLOSE_NOT_FOUND = 4404
+CLOSE_UNAUTHORIZED = 4401
+CLOSE_FORBIDDEN = 4403
+
+
+def _db(fn):
+    """
+    Run ORM work off the event loop. Sockets outlive requests, so stale
+    connections are recycled the way request_started/finished would.
+    """
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            close_old_connections()
+    return sync_to_async(run)
+
+
+def _backlog(conv, after_id, viewer):
+    return [
+        message_payload(m, conv, viewer)
+        for m in conv.messages.select_related("sender")
+        .filter(id__gt=after_id)
+        .order_by("id")[:BACKLOG_LIMIT]
+    ]
+
+
+# ============================================
+# CONVERSATION SOCKET
+# ============================================
+class ConversationSocket:
+    def __init__(self, send, user, conv):
+        self.send = send
+        self.user = user
+        self.conv = conv
+        self.seen_id = None  # last message id already sent from the backlog
+
+    async def send_json(self, payload):
+        await self.send({"type": "websocket.send", "text": json.dumps(payload)})
+
+    async def forward(self, subscription):
+        """
+        Broker -> client. Typing events are not echoed to their author.
+        """
+        while True:
+            payload = await subscription.get()
+            if payload is None:
+                continue
+            if payload.get("type") == "typing" and payload.get("user_id") == self.user.id:
+                continue
+            if payload.get("type") == "message" and self.seen_id and payload["id"] <= self.seen_id:
+                continue
+            await self.send_json(for_viewer(payload, self.user))
+
+    async def handle(self, text):
+        try:
+            frame = json.loads(text)
+        except (TypeError, ValueError):
+            return await self.send_json({"type": "error", "error": "Invalid JSON"})
+        if not isinstance(frame, dict):
+            return await self.send_json({"type": "error", "error": "Frames must be JSON objects"})
+
+        kind = frame.get("type")
+
+        if kind == "message":
+            body = str(frame.get("text") or "").strip()
+            if not body:
+                return await self.send_json({"type": "error", "error": "text is required"})
+            if len(body) > MAX_MESSAGE_LENGTH:
+                return await self.send_json(
+                    {"type": "error", "error": f"text must be at most {MAX_MESSAGE_LENGTH} characters"}
+                )
+            msg = await _db(post_message)(self.conv, self.user, body)
+            return await self.send_json({"type": "ack", "client_id": frame.get("client_id"), "id": msg.id})
+
+        if kind == "typing":
+            # A shared broker publishes over the network; keep it off the loop.
+            publish = sync_to_async(get_broker().publish, thread_sensitive=False)
+            await publish(conversation_channel(self.conv.id), {
+                "type": "typing",
+                "conversation": self.conv.id,
+                "user_id": self.user.id,
+            })
+            return
+
+        if kind == "read":
+            up_to_id = frame.get("up_to_id")
+            if up_to_id is not None and not isinstance(up_to_id, int):
+                return await self.send_json({"type": "error", "error": "up_to_id must be an integer"})
+            await _db(mark_read)(self.conv, self.user, up_to_id)
+            return
+
+        if kind == "ping":
+            return await self.send_json({"type": "pong"})
+
+        await self.send_json({"type": "error", "error": f"Unknown frame type '{kind}'"})
+
+
+async def conversation_socket(scope, receive, send, conversation_id):
+    params = parse_qs(scope.get("query_string", b"").decode())
+    token = params.get("token", [None])[0]
+    last_id = params.get("last_id", [""])[0]
+
+    user = await _db(authenticate_token)(token)
+    if user is None:
+        return await send({"type": "websocket.close", "code": CLOSE_UNAUTHORIZED})
+
+    conv = await _db(get_conversation_for)(user, conversation_id)
+    if conv is None:
+        return await send({"type": "websocket.close", "code": CLOSE_FORBIDDEN})
+
+    # Subscribe before reading the backlog so nothing falls in between.
+    subscription = get_broker().subscribe(conversation_channel(conv.id))
+    socket = ConversationSocket(send, user, conv)
+    forwarder = None
+    try:
+        await send({"type": "websocket.accept"})
+        await socket.send_json({"type": "ready", "conversation": conv.id, "user_id": user.id})
+
+        if last_id.isdigit():
+            for payload in await _db(_backlog)(conv, int(last_id), user):
+                await socket.send_json(payload)
+                socket.seen_id = payload["id"]
+
+        forwarder = asyncio.create_task(socket.forward(subscription))
+
+        while True:
+            event = await receive()
+            if event["type"] == "websocket.disconnect":
+                break
+            if event["type"] == "websocket.receive":
+                try:
+                    await socket.handle(event.get("text"))
+                except Exception as e:
+                    logger.error(f"❌ Chat frame failed on conversation {conv.id}: {e}")
+                    await socket.send_json({"type": "error", "error": "Could not process frame"})
+    finally:
+        if forwarder is not None:
+            forwarder.cancel()
+        subscription.close()
+
+
+# ============================================
+# ASGI ENTRY POINT
+# ============================================
+async def websocket_application(scope, receive, send):
+    event = await receive()
+    if event["type"] != "websocket.connect":
+        return
+
+    match = CONVERSATION_PATH.match(scope["path"])
+    if match is None:
+        return await send({"type": "websocket.close", "code": CLOSE_NOT_FOUND})
+
+    await conversation_socket(scope, receive, send, int(match.group("conversation_id")))